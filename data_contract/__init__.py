@@ -0,0 +1 @@
+"""Read-only input contract: snapshot loading, verification and validation."""
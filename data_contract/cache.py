@@ -0,0 +1,370 @@
+"""Local, size-bounded LRU cache of CDK snapshots.
+
+Snapshots are materialised under ``ORDERFLOW_SNAPSHOT_CACHE`` by hard-linking the
+files from ``CDK_DATA_ROOT`` (falling back to a copy across filesystems) into a
+temporary directory that is renamed into place once complete. A per-snapshot
+``fcntl`` lock keeps concurrent workers from fetching the same snapshot twice, and
+a SQLite index records sizes, last access and hit/miss counters for LRU eviction.
+When ``ORDERFLOW_SNAPSHOT_CACHE`` is set, ``loader.resolve_paths`` goes through it.
+
+Readers hold a shared ``fcntl`` lock on the snapshot while they use it and eviction
+takes that lock exclusively without waiting, so a snapshot is never removed under
+a reader in any process. ``fetch`` keeps the snapshot pinned until ``release`` or
+``close``; ``with cache.snapshot(symbol, date) as path:`` pins it for one block.
+``ensure`` (what ``loader.resolve_paths`` uses) only pins while fetching, so plain
+path lookups never hold space past the size bound.
+Each thread and each forked process opens its own SQLite connection.
+"""
+from __future__ import annotations
+
+import argparse
+import fcntl
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from .loader import cdk_root
+
+CACHE_ENV = "ORDERFLOW_SNAPSHOT_CACHE"
+MAX_BYTES_ENV = "ORDERFLOW_SNAPSHOT_CACHE_BYTES"
+DEFAULT_MAX_BYTES = 20 * 2**30
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    entries: int
+    total_bytes: int
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class SnapshotCache:
+    """LRU cache of ``snapshots/{symbol}/{date}`` directories on local disk."""
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        source_root: Optional[Path] = None,
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self.source_root = Path(source_root) if source_root else cdk_root()
+        (self.root / ".locks").mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._guard = threading.Lock()
+        self._conns: List[Tuple[int, sqlite3.Connection]] = []
+        # key -> (open handle holding LOCK_SH, pin count) for this process
+        self._pins: Dict[str, Tuple[IO[str], int]] = {}
+        self._pins_pid = os.getpid()
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, bytes INTEGER NOT NULL, "
+                "last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                "name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """SQLite connection of the calling thread, reopened after a fork."""
+
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            conn = sqlite3.connect(
+                str(self.root / "index.sqlite"), timeout=60.0, check_same_thread=False
+            )
+            self._local.conn, self._local.pid = conn, pid
+            with self._guard:
+                self._conns.append((pid, conn))
+        return self._local.conn
+
+    @staticmethod
+    def _key(symbol: str, date: str) -> str:
+        return f"{symbol}/{date}"
+
+    def path_for(self, symbol: str, date: str) -> Path:
+        return self.root / "snapshots" / symbol / date
+
+    def _lock_path(self, key: str, suffix: str) -> Path:
+        return self.root / ".locks" / (key.replace("/", "__") + suffix)
+
+    @contextmanager
+    def _lock(
+        self, key: str, blocking: bool = True, suffix: str = ".lock"
+    ) -> Iterator[bool]:
+        with open(self._lock_path(key, suffix), "a") as handle:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            try:
+                fcntl.flock(handle, flags)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _pin(self, key: str) -> None:
+        """Take (or re-count) this process's shared use lock on ``key``."""
+
+        with self._guard:
+            if self._pins_pid != os.getpid():
+                # handles inherited over fork belong to the parent's pins
+                self._pins, self._pins_pid = {}, os.getpid()
+            handle, count = self._pins.get(key, (None, 0))
+            if handle is None:
+                handle = open(self._lock_path(key, ".use"), "a")
+                try:
+                    # waits while an evictor holds the exclusive lock
+                    fcntl.flock(handle, fcntl.LOCK_SH)
+                except BaseException:
+                    handle.close()
+                    raise
+            self._pins[key] = (handle, count + 1)
+
+    def _unpin(self, key: str) -> None:
+        with self._guard:
+            if self._pins_pid != os.getpid() or key not in self._pins:
+                return
+            handle, count = self._pins[key]
+            if count > 1:
+                self._pins[key] = (handle, count - 1)
+                return
+            del self._pins[key]
+            handle.close()  # closing the last descriptor drops the flock
+
+    def _bump(self, counter: str) -> None:
+        self._conn.execute(
+            "INSERT INTO counters VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (counter,),
+        )
+
+    def _touch(self, key: str, size: Optional[int] = None) -> None:
+        if size is None:
+            self._conn.execute(
+                "UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+        else:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                (key, size, time.time()),
+            )
+
+    def _is_cached(self, key: str, target: Path) -> bool:
+        row = self._conn.execute(
+            "SELECT 1 FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None and target.is_dir()
+
+    def fetch(self, symbol: str, date: str) -> Path:
+        """Local directory of the snapshot, fetching it from the CDK root on a miss.
+
+        The snapshot stays pinned (never evicted) until :meth:`release` or
+        :meth:`close`; use :meth:`snapshot` to pin it for one block only.
+        """
+
+        key = self._key(symbol, date)
+        self._pin(key)
+        try:
+            return self._resolve(key, symbol, date)
+        except BaseException:
+            self._unpin(key)
+            raise
+
+    def ensure(self, symbol: str, date: str) -> Path:
+        """Like :meth:`fetch`, but the snapshot is only pinned while it is fetched.
+
+        The returned path may be evicted once the cache needs the space; hold
+        :meth:`snapshot` for the duration of a read that must not lose it.
+        """
+
+        path = self.fetch(symbol, date)
+        self.release(symbol, date)
+        return path
+
+    def release(self, symbol: str, date: str) -> None:
+        """Undo one :meth:`fetch` pin; the snapshot becomes evictable at zero."""
+
+        self._unpin(self._key(symbol, date))
+
+    @contextmanager
+    def snapshot(self, symbol: str, date: str) -> Iterator[Path]:
+        """Fetch the snapshot and keep it pinned while the block runs."""
+
+        path = self.fetch(symbol, date)
+        try:
+            yield path
+        finally:
+            self.release(symbol, date)
+
+    def _resolve(self, key: str, symbol: str, date: str) -> Path:
+        target = self.path_for(symbol, date)
+        if self._is_cached(key, target):
+            with self._conn:
+                self._bump("hits")
+                self._touch(key)
+            return target
+
+        with self._lock(key):
+            # another worker may have finished the fetch while we waited
+            if self._is_cached(key, target):
+                with self._conn:
+                    self._bump("hits")
+                    self._touch(key)
+                return target
+            source = self.source_root / "snapshots" / symbol / date
+            if not source.is_dir():
+                raise FileNotFoundError(source)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            staging = Path(tempfile.mkdtemp(prefix=f".{date}.", dir=target.parent))
+            try:
+                size = 0
+                for src in sorted(source.iterdir()):
+                    if src.is_file():
+                        _link_or_copy(src, staging / src.name)
+                        size += src.stat().st_size
+                if target.exists():
+                    shutil.rmtree(target)
+                os.replace(staging, target)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+            with self._conn:
+                self._bump("misses")
+                self._touch(key, size)
+        self.evict(keep=key)
+        return target
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Drop least recently used snapshots until under ``max_bytes``.
+
+        Snapshots in use or being fetched anywhere (their shared use lock is held)
+        are skipped. Returns the bytes freed.
+        """
+
+        freed = 0
+        total = self.stats().total_bytes
+        rows = self._conn.execute(
+            "SELECT key, bytes FROM entries ORDER BY last_access ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            with self._lock(key, blocking=False, suffix=".use") as acquired:
+                if not acquired:
+                    continue
+                symbol, date = key.split("/", 1)
+                shutil.rmtree(self.path_for(symbol, date), ignore_errors=True)
+                with self._conn:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            freed += size
+        return freed
+
+    def clear(self) -> None:
+        self.max_bytes, limit = 0, self.max_bytes
+        try:
+            self.evict()
+        finally:
+            self.max_bytes = limit
+
+    def stats(self) -> CacheStats:
+        counters = dict(self._conn.execute("SELECT name, value FROM counters"))
+        entries, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries"
+        ).fetchone()
+        return CacheStats(
+            hits=counters.get("hits", 0),
+            misses=counters.get("misses", 0),
+            entries=entries,
+            total_bytes=total,
+            max_bytes=self.max_bytes,
+        )
+
+    def close(self) -> None:
+        """Drop this process's pins and close its SQLite connections."""
+
+        pid = os.getpid()
+        with self._guard:
+            if self._pins_pid == pid:
+                for handle, _ in self._pins.values():
+                    handle.close()
+                self._pins = {}
+            conns, self._conns = self._conns, []
+        for owner, conn in conns:
+            if owner == pid:
+                conn.close()
+        self._local = threading.local()
+
+
+_DEFAULT: Optional[SnapshotCache] = None
+
+
+def default_cache() -> Optional[SnapshotCache]:
+    """Process-wide cache configured from the environment, or ``None`` if unset."""
+
+    global _DEFAULT
+    root = os.getenv(CACHE_ENV)
+    if not root:
+        return None
+    if _DEFAULT is None or _DEFAULT.root != Path(root):
+        _DEFAULT = SnapshotCache(
+            Path(root), int(os.getenv(MAX_BYTES_ENV, DEFAULT_MAX_BYTES))
+        )
+    return _DEFAULT
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["stats", "warm", "evict", "clear"])
+    parser.add_argument("snapshots", nargs="*", help="SYMBOL/DATE to warm")
+    args = parser.parse_args()
+
+    cache = default_cache()
+    if cache is None:
+        parser.error(f"{CACHE_ENV} is not set")
+    if args.command == "warm":
+        for item in args.snapshots:
+            symbol, date = item.split("/", 1)
+            print(f"[cache] {item} -> {cache.ensure(symbol, date)}")
+    elif args.command == "evict":
+        print(f"[cache] freed {cache.evict()} bytes")
+    elif args.command == "clear":
+        cache.clear()
+    stats = cache.stats()
+    print(
+        f"[cache] entries={stats.entries} "
+        f"size={stats.total_bytes / 2**30:.2f}/{stats.max_bytes / 2**30:.2f} GiB "
+        f"hits={stats.hits} misses={stats.misses} hit_rate={stats.hit_rate:.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Dtype compaction for contract frames at load time.
+
+Feature columns are downcast from float64 to float32 when the rounding error stays
+within ``budget`` times the column's standard deviation, state/label columns become
+categoricals (int8 codes for fewer than 128 categories) and the integer flag
+columns of ``SCHEMA_features.json`` become int8. ``CompactionReport`` records the
+per-column memory before and after. ``feature_matrix`` is how model code turns a
+(possibly compacted) frame into an array without upcasting float32 back to float64.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .loader import TIME_COLUMN, read_snapshot, resolve_paths
+
+LABEL_COLUMNS = ("state", "label", "next_state")
+FLAG_COLUMNS = ("vpo_bias", "absorb_flag", "absorb_side")
+DEFAULT_BUDGET = 1e-5
+
+
+@dataclass
+class ColumnCompaction:
+    column: str
+    dtype_before: str
+    dtype_after: str
+    bytes_before: int
+    bytes_after: int
+    max_abs_error: float = 0.0
+    note: str = ""
+
+
+@dataclass
+class CompactionReport:
+    columns: List[ColumnCompaction] = field(default_factory=list)
+
+    @property
+    def bytes_before(self) -> int:
+        return sum(c.bytes_before for c in self.columns)
+
+    @property
+    def bytes_after(self) -> int:
+        return sum(c.bytes_after for c in self.columns)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame([vars(c) for c in self.columns])
+
+    def format(self) -> str:
+        lines = [
+            f"{'column':<24} {'before':>10} {'after':>10} {'KiB before':>11} "
+            f"{'KiB after':>10} {'max_err':>10}  note"
+        ]
+        for c in self.columns:
+            lines.append(
+                f"{c.column:<24} {c.dtype_before:>10} {c.dtype_after:>10} "
+                f"{c.bytes_before / 1024:>11.1f} {c.bytes_after / 1024:>10.1f} "
+                f"{c.max_abs_error:>10.3g}  {c.note}"
+            )
+        saved = 1 - self.bytes_after / self.bytes_before if self.bytes_before else 0
+        lines.append(
+            f"total {self.bytes_before / 2**20:.2f} MiB -> "
+            f"{self.bytes_after / 2**20:.2f} MiB ({saved:.0%} saved)"
+        )
+        return "\n".join(lines)
+
+
+def _downcast_float(
+    series: pd.Series, budget: float
+) -> Tuple[Optional[pd.Series], float, str]:
+    values = series.to_numpy()
+    compact = values.astype(np.float32)
+    finite = np.isfinite(values)
+    if not finite.any():
+        return pd.Series(compact, index=series.index, name=series.name), 0.0, ""
+    error = float(np.max(np.abs(compact[finite].astype(np.float64) - values[finite])))
+    # float32 overflow turns finite values into inf
+    if not np.isfinite(compact[finite]).all():
+        return None, float("inf"), "exceeds float32 range"
+    scale = float(np.std(values[finite])) or float(np.max(np.abs(values[finite])))
+    if scale and error > budget * scale:
+        return None, error, f"error above budget ({error / scale:.1e} of std)"
+    return pd.Series(compact, index=series.index, name=series.name), error, ""
+
+
+def _to_int8(series: pd.Series) -> Tuple[Optional[pd.Series], str]:
+    values = series.to_numpy()
+    if pd.isna(series).any():
+        return None, "contains missing values"
+    if not np.all(np.equal(np.mod(values.astype(np.float64), 1), 0)):
+        return None, "non-integer values"
+    if values.size and (values.min() < -128 or values.max() > 127):
+        return None, "outside int8 range"
+    return series.astype(np.int8), ""
+
+
+def compact_frame(
+    frame: pd.DataFrame,
+    budget: float = DEFAULT_BUDGET,
+    label_columns: Sequence[str] = LABEL_COLUMNS,
+    flag_columns: Sequence[str] = FLAG_COLUMNS,
+    exclude: Sequence[str] = (TIME_COLUMN,),
+) -> Tuple[pd.DataFrame, CompactionReport]:
+    """Compact ``frame`` column by column; returns the new frame and its report.
+
+    Args:
+        frame: Contract frame as loaded (float64 features, object labels).
+        budget: Largest float32 rounding error allowed, as a fraction of the
+            column's standard deviation.
+        label_columns: Columns converted to categoricals.
+        flag_columns: Integer flag columns converted to int8.
+        exclude: Columns left untouched (timestamps).
+
+    Returns:
+        The compacted frame (the input is not modified) and a
+        :class:`CompactionReport` covering every column.
+    """
+
+    report = CompactionReport()
+    out = {}
+    for name in frame.columns:
+        series = frame[name]
+        before = int(series.memory_usage(index=False, deep=True))
+        compact, error, note = None, 0.0, ""
+        if name in exclude:
+            note = "excluded"
+        elif name in label_columns:
+            compact = series.astype("category")
+        elif name in flag_columns:
+            compact, note = _to_int8(series)
+        elif pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+            compact, error, note = _downcast_float(series, budget)
+        result = series if compact is None else compact
+        out[name] = result
+        report.columns.append(
+            ColumnCompaction(
+                column=str(name),
+                dtype_before=str(series.dtype),
+                dtype_after=str(result.dtype),
+                bytes_before=before,
+                bytes_after=int(result.memory_usage(index=False, deep=True)),
+                max_abs_error=error,
+                note=note,
+            )
+        )
+    return pd.DataFrame(out, index=frame.index), report
+
+
+def load_compact(
+    symbol: str,
+    date: str,
+    columns: Optional[Sequence[str]] = None,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    part: str = "x_train",
+    budget: float = DEFAULT_BUDGET,
+) -> Tuple[pd.DataFrame, CompactionReport]:
+    """Read a snapshot part and compact it in one step."""
+
+    table = read_snapshot(resolve_paths(symbol, date)[part], columns, start, end)
+    return compact_frame(table.to_pandas(), budget)
+
+
+def feature_matrix(frame: pd.DataFrame, columns: Sequence[str]) -> np.ndarray:
+    """Feature columns as one array, float32 when every column fits in float32.
+
+    float32 and small-integer columns (e.g. the int8 flags) stay float32; any wider
+    column, or any pandas extension dtype (nullable, categorical), makes the whole
+    matrix float64, as ``to_numpy(dtype=float)`` did.
+    """
+
+    if not columns:
+        raise ValueError("feature_columns must not be empty")
+    dtypes = [frame[c].dtype for c in columns]
+    dtype: type = np.float64
+    if all(isinstance(d, np.dtype) for d in dtypes):
+        common = np.result_type(*dtypes)
+        if (common.kind == "f" and common.itemsize <= 4) or (
+            common.kind in "iub" and common.itemsize <= 2
+        ):
+            dtype = np.float32
+    return frame[list(columns)].to_numpy(dtype=dtype)
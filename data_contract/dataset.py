@@ -0,0 +1,147 @@
+"""Lazy multi-day, multi-symbol view over CDK snapshots.
+
+``SnapshotDataset`` spans ``snapshots/{symbol}/{date}`` directories as one Arrow
+dataset without reading them: symbol and date filters select files, a time range
+becomes a dataset filter (row groups are pruned from their statistics), and
+``to_batches`` streams projected record batches file by file in
+``(symbol, date)`` order so a training range is never materialised at once.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from .loader import TIME_COLUMN, cdk_root, resolve_paths
+
+KEY_COLUMNS = ("symbol", "date")
+
+
+def discover_snapshots(
+    symbols: Optional[Sequence[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> List[Tuple[str, str]]:
+    """``(symbol, date)`` pairs under the CDK root, dates inclusive, sorted."""
+
+    root = cdk_root() / "snapshots"
+    wanted = set(symbols) if symbols is not None else None
+    pairs = []
+    for symbol_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        if wanted is not None and symbol_dir.name not in wanted:
+            continue
+        for date_dir in sorted(p for p in symbol_dir.iterdir() if p.is_dir()):
+            date = date_dir.name
+            if start_date is not None and date < start_date:
+                continue
+            if end_date is not None and date > end_date:
+                continue
+            pairs.append((symbol_dir.name, date))
+    return pairs
+
+
+class SnapshotDataset:
+    """One logical dataset over the ``part`` file of many snapshots.
+
+    Args:
+        symbols: Symbols to include; all symbols under the CDK root when ``None``.
+        start_date: First date (``YYYY-MM-DD``, inclusive).
+        end_date: Last date (inclusive).
+        start: Lower bound on ``time_column`` (inclusive).
+        end: Upper bound on ``time_column`` (exclusive).
+        columns: Columns to project; all when ``None``.
+        part: ``"x_train"`` or ``"y_train"``.
+        time_column: Column the ``start``/``end`` bounds apply to.
+        with_keys: Append ``symbol`` and ``date`` columns to every batch.
+    """
+
+    def __init__(
+        self,
+        symbols: Optional[Sequence[str]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+        part: str = "x_train",
+        time_column: str = TIME_COLUMN,
+        with_keys: bool = False,
+    ) -> None:
+        self.snapshots = discover_snapshots(symbols, start_date, end_date)
+        if not self.snapshots:
+            raise FileNotFoundError(
+                f"no snapshots under {cdk_root() / 'snapshots'} match "
+                f"symbols={symbols} dates=[{start_date}, {end_date}]"
+            )
+        self.paths: List[Path] = [
+            resolve_paths(symbol, date)[part] for symbol, date in self.snapshots
+        ]
+        self.dataset = ds.dataset([str(p) for p in self.paths], format="parquet")
+        self.columns = list(columns) if columns is not None else None
+        self.with_keys = with_keys
+        self.filter = None
+        if start is not None or end is not None:
+            if time_column not in self.dataset.schema.names:
+                raise KeyError(f"snapshots have no time column {time_column!r}")
+            field = ds.field(time_column)
+            if start is not None:
+                self.filter = field >= start
+            if end is not None:
+                upper = field < end
+                self.filter = upper if self.filter is None else self.filter & upper
+        if self.columns is not None:
+            missing = [c for c in self.columns if c not in self.dataset.schema.names]
+            if missing:
+                raise KeyError(f"snapshots are missing columns {missing}")
+
+    @property
+    def schema(self) -> pa.Schema:
+        names = self.columns or self.dataset.schema.names
+        schema = pa.schema([self.dataset.schema.field(n) for n in names])
+        if self.with_keys:
+            schema = schema.append(pa.field("symbol", pa.string()))
+            schema = schema.append(pa.field("date", pa.string()))
+        return schema
+
+    def __len__(self) -> int:
+        return len(self.snapshots)
+
+    def count_rows(self) -> int:
+        return self.dataset.count_rows(filter=self.filter)
+
+    def to_batches(self, batch_size: int = 65_536) -> Iterator[pa.RecordBatch]:
+        """Record batches in ``(symbol, date)`` and file order."""
+
+        # Fragments are scanned one at a time: a dataset-wide scan may interleave files.
+        fragments = self.dataset.get_fragments()
+        for (symbol, date), fragment in zip(self.snapshots, fragments):
+            for batch in fragment.to_batches(
+                schema=self.dataset.schema,
+                columns=self.columns,
+                filter=self.filter,
+                batch_size=batch_size,
+            ):
+                if not batch.num_rows:
+                    continue
+                if self.with_keys:
+                    batch = pa.RecordBatch.from_arrays(
+                        batch.columns
+                        + [
+                            pa.array([symbol] * batch.num_rows, pa.string()),
+                            pa.array([date] * batch.num_rows, pa.string()),
+                        ],
+                        schema=self.schema,
+                    )
+                yield batch
+
+    def iter_frames(self, batch_size: int = 65_536) -> Iterator[pd.DataFrame]:
+        for batch in self.to_batches(batch_size):
+            yield batch.to_pandas()
+
+    def to_table(self) -> pa.Table:
+        """Materialise the filtered, projected range; prefer ``to_batches``."""
+
+        return pa.Table.from_batches(list(self.to_batches()), schema=self.schema)
@@ -3,14 +3,37 @@ from __future__ import annotations
 import json
 import os
 from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+TIME_COLUMN = "open_time_ms"
 
 
 def cdk_root() -> Path:
     return Path(os.getenv("CDK_DATA_ROOT", "/mnt/cdk"))
 
 
+def snapshot_dir(symbol: str, date: str) -> Path:
+    """Snapshot directory, served from the local cache when one is configured.
+
+    The cached copy is not pinned; wrap reads that must not race eviction in
+    ``default_cache().snapshot(symbol, date)``.
+    """
+
+    from .cache import default_cache
+
+    cache = default_cache()
+    if cache is not None:
+        return cache.ensure(symbol, date)
+    return cdk_root() / "snapshots" / symbol / date
+
+
 def resolve_paths(symbol: str, date: str) -> dict:
-    base = cdk_root() / "snapshots" / symbol / date
+    base = snapshot_dir(symbol, date)
     return {
         "manifest": base / "manifest.json",
         "x_train": base / "X_train.parquet",
@@ -23,3 +46,121 @@ def load_manifest(path: str | Path) -> dict:
     if not p.exists():
         raise FileNotFoundError(p)
     return json.loads(p.read_text(encoding="utf-8"))
+
+
+def _leaf_column_index(metadata: pq.FileMetaData, name: str) -> Optional[int]:
+    """Parquet leaf column index of a top-level column.
+
+    Arrow field positions differ from leaf positions once a nested column precedes
+    it, so statistics must be looked up by the leaf path.
+    """
+
+    for i in range(metadata.num_columns):
+        if metadata.schema.column(i).path == name:
+            return i
+    return None
+
+
+def _overlapping_row_groups(
+    metadata: pq.FileMetaData,
+    column_index: Optional[int],
+    start: Optional[int],
+    end: Optional[int],
+) -> List[int]:
+    """Row groups whose [min, max] statistics may intersect [start, end).
+
+    Without a leaf ``column_index`` every row group is kept.
+    """
+
+    if column_index is None:
+        return list(range(metadata.num_row_groups))
+    keep = []
+    for i in range(metadata.num_row_groups):
+        stats = metadata.row_group(i).column(column_index).statistics
+        if stats is None or not stats.has_min_max:
+            keep.append(i)
+            continue
+        if start is not None and stats.max < start:
+            continue
+        if end is not None and stats.min >= end:
+            continue
+        keep.append(i)
+    return keep
+
+
+def read_snapshot(
+    path: str | Path,
+    columns: Optional[Sequence[str]] = None,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    time_column: str = TIME_COLUMN,
+) -> pa.Table:
+    """Read a snapshot parquet file through an Arrow memory map.
+
+    Only ``columns`` are decoded (all when ``None``). With ``start``/``end`` (same
+    units as ``time_column``, half-open ``[start, end)``) row groups are skipped
+    from their min/max statistics before any data is read, then the remaining rows
+    are filtered exactly.
+    """
+
+    source = pa.memory_map(str(path), "r")
+    parquet = pq.ParquetFile(source)
+    schema = parquet.schema_arrow
+    wanted = list(columns) if columns is not None else list(schema.names)
+    missing = [c for c in wanted if c not in schema.names]
+    if missing:
+        raise KeyError(f"{path} is missing columns {missing}")
+
+    if start is None and end is None:
+        return parquet.read(columns=wanted, use_threads=True)
+    if time_column not in schema.names:
+        raise KeyError(f"{path} has no time column {time_column!r}")
+
+    read_columns = wanted if time_column in wanted else wanted + [time_column]
+    metadata = parquet.metadata
+    groups = _overlapping_row_groups(
+        metadata, _leaf_column_index(metadata, time_column), start, end
+    )
+    if not groups:
+        return schema.empty_table().select(wanted)
+    table = parquet.read_row_groups(groups, columns=read_columns, use_threads=True)
+    times = table.column(time_column)
+    mask = None
+    if start is not None:
+        mask = pc.greater_equal(times, pa.scalar(start, times.type))
+    if end is not None:
+        upper = pc.less(times, pa.scalar(end, times.type))
+        mask = upper if mask is None else pc.and_(mask, upper)
+    return table.filter(mask).select(wanted)
+
+
+def table_to_numpy(table: pa.Table) -> Dict[str, np.ndarray]:
+    """Column arrays without a pandas round trip.
+
+    Single-chunk numeric columns without nulls are returned as zero-copy, read-only
+    views of the Arrow buffers; other columns are materialised once.
+    """
+
+    arrays: Dict[str, np.ndarray] = {}
+    for name, column in zip(table.column_names, table.columns):
+        if column.num_chunks == 1 and column.null_count == 0:
+            try:
+                arrays[name] = column.chunk(0).to_numpy(zero_copy_only=True)
+                continue
+            except pa.ArrowInvalid:
+                pass
+        arrays[name] = column.to_numpy()
+    return arrays
+
+
+def load_snapshot(
+    symbol: str,
+    date: str,
+    columns: Optional[Sequence[str]] = None,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    part: str = "x_train",
+) -> pa.Table:
+    """``read_snapshot`` on the ``x_train``/``y_train`` file of one snapshot."""
+
+    return read_snapshot(resolve_paths(symbol, date)[part], columns, start, end)
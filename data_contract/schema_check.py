@@ -0,0 +1,385 @@
+"""Compiled, vectorised validation of frames and manifests against governance schemas.
+
+A schema file is compiled once into column checks (presence, dtype family,
+NaN/inf ratios, ``enum``/``minimum``/``maximum`` ranges) and cached by the SHA-256
+of its bytes, so repeated calls only pay for the NumPy reductions. Column specs are
+read from a top-level ``columns`` list (``SCHEMA_data.json``) or from
+``micro_features.columns`` (``SCHEMA_features.json``); a top-level ``required``
+list (``SCHEMA_input_contract.json``) is compiled into a ``jsonschema`` validator
+for manifests.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import jsonschema
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+FEATURES_SCHEMA = PROJECT_ROOT / "governance" / "SCHEMA_features.json"
+DATA_SCHEMA = PROJECT_ROOT / "governance" / "SCHEMA_data.json"
+INPUT_CONTRACT_SCHEMA = (
+    Path(__file__).resolve().parent / "schema" / "SCHEMA_input_contract.json"
+)
+
+_FLOAT_KINDS = "fiub"
+_INT_KINDS = "iub"
+_CACHE: Dict[str, "CompiledSchema"] = {}
+
+
+@dataclass(frozen=True)
+class ColumnCheck:
+    name: str
+    kind: str
+    required: bool = True
+    max_nan_ratio: float = 0.0
+    max_inf_ratio: float = 0.0
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    enum: Optional[Tuple[float, ...]] = None
+
+
+@dataclass
+class ColumnResult:
+    column: str
+    status: str  # pass | fail | missing | absent (optional and not present)
+    dtype: str = ""
+    nan_ratio: float = 0.0
+    inf_ratio: float = 0.0
+    out_of_range: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ValidationReport:
+    schema: str
+    schema_hash: str
+    rows: int
+    columns: List[ColumnResult] = field(default_factory=list)
+    unexpected: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return all(c.status in ("pass", "absent") for c in self.columns)
+
+    def failures(self) -> List[ColumnResult]:
+        return [c for c in self.columns if c.status in ("fail", "missing")]
+
+    def to_dict(self) -> dict:
+        payload = asdict(self)
+        payload["ok"] = self.ok
+        return payload
+
+    def format(self) -> str:
+        lines = [
+            f"schema={self.schema} sha256={self.schema_hash[:12]} rows={self.rows} "
+            f"status={'ok' if self.ok else 'FAIL'}"
+        ]
+        for c in self.columns:
+            if c.status == "absent":
+                continue
+            detail = "; ".join(c.errors)
+            lines.append(
+                f"  {c.status:<7} {c.column:<22} {c.dtype:<10} "
+                f"nan={c.nan_ratio:.4f} inf={c.inf_ratio:.4f} "
+                f"out_of_range={c.out_of_range} {detail}".rstrip()
+            )
+        if self.unexpected:
+            lines.append(f"  unexpected columns: {self.unexpected}")
+        return "\n".join(lines)
+
+
+def _kind(declared: str) -> str:
+    declared = declared.lower()
+    if declared.startswith("float"):
+        return "float"
+    if declared.startswith("int"):
+        return "int"
+    if declared == "bool":
+        return "bool"
+    return "string"
+
+
+def _column_specs(schema: dict) -> List[dict]:
+    if isinstance(schema.get("columns"), list):
+        return schema["columns"]
+    return schema.get("micro_features", {}).get("columns", [])
+
+
+def _compile_column(spec: dict) -> ColumnCheck:
+    required = bool(spec.get("required", True))
+    enum = spec.get("enum")
+    return ColumnCheck(
+        name=spec["name"],
+        kind=_kind(spec.get("type", "float")),
+        required=required,
+        max_nan_ratio=float(spec.get("max_nan_ratio", 0.0 if required else 1.0)),
+        max_inf_ratio=float(spec.get("max_inf_ratio", 0.0)),
+        minimum=spec.get("minimum"),
+        maximum=spec.get("maximum"),
+        enum=tuple(float(v) for v in enum) if enum is not None else None,
+    )
+
+
+def _check_numeric(check: ColumnCheck, values: np.ndarray, result: ColumnResult):
+    n = values.shape[0]
+    if values.dtype.kind == "b":
+        values = values.view(np.uint8)
+    if values.dtype.kind == "f":
+        finite = np.isfinite(values)
+        bad = n - int(np.count_nonzero(finite))
+        if bad:
+            nan = int(np.count_nonzero(np.isnan(values)))
+            result.nan_ratio = nan / n
+            result.inf_ratio = (bad - nan) / n
+            values = values[finite]
+    if result.nan_ratio > check.max_nan_ratio:
+        result.errors.append(
+            f"NaN ratio {result.nan_ratio:.3g} > {check.max_nan_ratio:.3g}"
+        )
+    if result.inf_ratio > check.max_inf_ratio:
+        result.errors.append(
+            f"inf ratio {result.inf_ratio:.3g} > {check.max_inf_ratio:.3g}"
+        )
+    if not values.size:
+        return
+
+    if check.kind == "int" and values.dtype.kind == "f":
+        fractional = int(np.count_nonzero(values != np.trunc(values)))
+        if fractional:
+            result.errors.append(f"{fractional} non-integer values")
+
+    lo, hi = check.minimum, check.maximum
+    enum = check.enum
+    if enum is not None:
+        ordered = sorted(enum)
+        contiguous = all(float(v).is_integer() for v in ordered) and ordered == list(
+            np.arange(ordered[0], ordered[-1] + 1)
+        )
+        if contiguous:
+            # an integer run is a range check; integrality was checked above
+            lo, hi = ordered[0], ordered[-1]
+        else:
+            outside = int(np.count_nonzero(~np.isin(values, np.asarray(ordered))))
+            if outside:
+                result.out_of_range += outside
+                result.errors.append(f"{outside} values outside {list(enum)}")
+    if lo is not None or hi is not None:
+        vmin, vmax = values.min(), values.max()
+        if (lo is not None and vmin < lo) or (hi is not None and vmax > hi):
+            below = int(np.count_nonzero(values < lo)) if lo is not None else 0
+            above = int(np.count_nonzero(values > hi)) if hi is not None else 0
+            result.out_of_range += below + above
+            result.errors.append(
+                f"{below + above} values outside [{lo}, {hi}] (min={vmin}, max={vmax})"
+            )
+
+
+def _check_column(check: ColumnCheck, series: pd.Series) -> ColumnResult:
+    result = ColumnResult(check.name, "pass", dtype=str(series.dtype))
+    dtype = series.dtype
+    kind = getattr(dtype, "kind", "O")
+    if check.kind in ("float", "int", "bool"):
+        allowed = {"float": _FLOAT_KINDS, "int": _INT_KINDS + "f", "bool": "b"}
+        if kind not in allowed[check.kind] or isinstance(dtype, pd.CategoricalDtype):
+            if check.kind == "bool" and kind == "O":
+                # nullable booleans arrive as object columns of True/False/None
+                result.nan_ratio = float(series.isna().mean())
+                if result.nan_ratio > check.max_nan_ratio:
+                    result.errors.append(f"null ratio {result.nan_ratio:.3g}")
+            else:
+                result.errors.append(f"dtype {dtype} is not {check.kind}")
+        else:
+            _check_numeric(check, np.ascontiguousarray(series.to_numpy()), result)
+    else:
+        if kind not in "OSU" and not isinstance(
+            dtype, (pd.CategoricalDtype, pd.StringDtype)
+        ):
+            result.errors.append(f"dtype {dtype} is not string")
+        elif check.max_nan_ratio < 1.0:
+            result.nan_ratio = float(series.isna().mean()) if len(series) else 0.0
+            if result.nan_ratio > check.max_nan_ratio:
+                result.errors.append(f"null ratio {result.nan_ratio:.3g}")
+    if result.errors:
+        result.status = "fail"
+    return result
+
+
+def _fast_bounds(check: ColumnCheck) -> Optional[Tuple[float, float]]:
+    """Range a clean column must lie in, or ``None`` if min/max cannot decide it."""
+
+    if check.kind != "float":
+        return None  # integrality needs the per-column pass
+    lo = -np.inf if check.minimum is None else check.minimum
+    hi = np.inf if check.maximum is None else check.maximum
+    if check.enum is not None:
+        return None
+    return lo, hi
+
+
+def _axis0_bounds(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Column-wise min/max of a 2-D array.
+
+    A C-ordered ``(n, k)`` array with small ``k`` reduces slowly along axis 0, so
+    ``fold`` consecutive rows are viewed as one wide row first and the partial
+    results folded back.
+    """
+
+    n, k = values.shape
+    fold = 64
+    rows = (n // fold) * fold
+    if values.flags.f_contiguous or not values.flags.c_contiguous or not rows:
+        return values.min(axis=0), values.max(axis=0)
+    wide = values[:rows].reshape(-1, k * fold)
+    mins = wide.min(axis=0).reshape(fold, k).min(axis=0)
+    maxs = wide.max(axis=0).reshape(fold, k).max(axis=0)
+    if rows < n:
+        mins = np.minimum(mins, values[rows:].min(axis=0))
+        maxs = np.maximum(maxs, values[rows:].max(axis=0))
+    return mins, maxs
+
+
+def _column_bounds(
+    frame: pd.DataFrame, names: List[str]
+) -> Dict[str, Tuple[float, float]]:
+    homogeneous = frame.columns.is_unique and frame.dtypes.nunique() == 1
+    if homogeneous:
+        # one array for the whole frame; a view when pandas holds a single block
+        mins, maxs = _axis0_bounds(frame.to_numpy())
+        position = {name: i for i, name in enumerate(frame.columns)}
+        return {n: (mins[position[n]], maxs[position[n]]) for n in names}
+    bounds = {}
+    for name in names:
+        values = frame[name].to_numpy()
+        bounds[name] = (values.min(), values.max())
+    return bounds
+
+
+def _clean_float_columns(
+    frame: pd.DataFrame, checks: List[ColumnCheck]
+) -> Dict[str, ColumnResult]:
+    """Results for float columns that pass on column-wise min/max alone.
+
+    NaN and inf propagate into min/max, so finite bounds inside the allowed range
+    prove a column clean in one reduction; every other column is left to the exact
+    per-column check.
+    """
+
+    candidates = {}
+    for check in checks:
+        bounds = _fast_bounds(check)
+        if bounds is None or check.name not in frame.columns:
+            continue
+        if getattr(frame[check.name].dtype, "kind", "O") == "f":
+            candidates[check.name] = bounds
+
+    results: Dict[str, ColumnResult] = {}
+    if not candidates:
+        return results
+    with np.errstate(invalid="ignore"):
+        observed = _column_bounds(frame, list(candidates))
+    for name, (lo, hi) in candidates.items():
+        vmin, vmax = observed[name]
+        if np.isfinite(vmin) and np.isfinite(vmax) and lo <= vmin and vmax <= hi:
+            results[name] = ColumnResult(name, "pass", dtype=str(frame[name].dtype))
+    return results
+
+
+class CompiledSchema:
+    """Column checks and manifest validator compiled from one schema file."""
+
+    def __init__(self, name: str, schema: dict, digest: str) -> None:
+        self.name = name
+        self.schema_hash = digest
+        self.checks = [_compile_column(spec) for spec in _column_specs(schema)]
+        self._manifest_validator = None
+        if "required" in schema:
+            self._manifest_validator = jsonschema.Draft202012Validator(
+                {"type": "object", **schema}
+            )
+
+    def validate(
+        self, frame: pd.DataFrame, allow_extra: bool = True
+    ) -> ValidationReport:
+        """Run every column check on ``frame`` and return the report."""
+
+        report = ValidationReport(self.name, self.schema_hash, len(frame))
+        fast = _clean_float_columns(frame, self.checks) if len(frame) else {}
+        for check in self.checks:
+            if check.name not in frame.columns:
+                status = "missing" if check.required else "absent"
+                errors = ["required column missing"] if check.required else []
+                report.columns.append(ColumnResult(check.name, status, errors=errors))
+            elif check.name in fast:
+                report.columns.append(fast[check.name])
+            else:
+                report.columns.append(_check_column(check, frame[check.name]))
+        if not allow_extra:
+            known = {c.name for c in self.checks}
+            report.unexpected = [str(c) for c in frame.columns if c not in known]
+        return report
+
+    def validate_manifest(self, manifest: dict) -> List[str]:
+        """Messages for every way ``manifest`` violates the schema."""
+
+        if self._manifest_validator is None:
+            raise ValueError(f"{self.name} does not describe a manifest")
+        return [
+            error.message for error in self._manifest_validator.iter_errors(manifest)
+        ]
+
+
+def compile_schema(path: Path = FEATURES_SCHEMA) -> CompiledSchema:
+    """Compile a schema file, reusing the compiled form while its hash matches."""
+
+    raw = Path(path).read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    compiled = _CACHE.get(digest)
+    if compiled is None:
+        compiled = CompiledSchema(Path(path).name, json.loads(raw), digest)
+        _CACHE[digest] = compiled
+    return compiled
+
+
+def validate_frame(
+    frame: pd.DataFrame, schema_path: Path = FEATURES_SCHEMA
+) -> ValidationReport:
+    return compile_schema(schema_path).validate(frame)
+
+
+def validate_manifest(
+    manifest: dict, schema_path: Path = INPUT_CONTRACT_SCHEMA
+) -> List[str]:
+    return compile_schema(schema_path).validate_manifest(manifest)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="parquet file, or manifest.json with --manifest")
+    parser.add_argument("--schema", type=Path, default=None)
+    parser.add_argument("--manifest", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print the JSON report")
+    args = parser.parse_args()
+
+    if args.manifest:
+        manifest = json.loads(Path(args.path).read_text(encoding="utf-8"))
+        errors = validate_manifest(manifest, args.schema or INPUT_CONTRACT_SCHEMA)
+        for error in errors:
+            print(f"  - {error}")
+        print(f"[schema] manifest {'FAIL' if errors else 'ok'}")
+        sys.exit(1 if errors else 0)
+
+    report = validate_frame(pd.read_parquet(args.path), args.schema or FEATURES_SCHEMA)
+    print(json.dumps(report.to_dict(), indent=2) if args.json else report.format())
+    sys.exit(0 if report.ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""Verify CDK snapshots against their manifest before training.
+
+Snapshot files are hashed with large ``readinto`` buffers on a thread pool (hashlib
+releases the GIL while digesting), and digests are remembered in a local SQLite
+index keyed by ``(path, size, mtime_ns)`` so unchanged snapshots verify without
+re-reading. The snapshot digest compared with ``manifest["hash"]`` is the SHA-256
+of the sorted ``"<file name>:<sha256>"`` lines of every file except the manifest.
+Snapshot producers write the manifest with ``write_manifest`` (or take ``hash`` from
+``build_manifest``) so both sides share this definition; ``--self-test`` round-trips
+a manifest built that way through ``verify_snapshot``.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .loader import load_manifest, resolve_paths
+from .schema_check import compile_schema
+
+SCHEMA_PATH = Path(__file__).resolve().parent / "schema" / "SCHEMA_input_contract.json"
+DEFAULT_DIGEST_CACHE = Path(
+    os.getenv(
+        "ORDERFLOW_DIGEST_CACHE",
+        str(Path.home() / ".cache" / "orderflow" / "snapshot_digests.sqlite"),
+    )
+)
+BUFFER_SIZE = 8 * 2**20
+MANIFEST_NAME = "manifest.json"
+
+
+class SnapshotVerificationError(RuntimeError):
+    pass
+
+
+def validate_manifest(manifest: dict, schema_path: Path = SCHEMA_PATH) -> List[str]:
+    """Problems with the manifest fields; empty when it satisfies the contract."""
+
+    errors = compile_schema(schema_path).validate_manifest(manifest)
+    if "row_count" in manifest and (
+        not isinstance(manifest["row_count"], int) or manifest["row_count"] < 0
+    ):
+        errors.append("row_count must be a non-negative integer")
+    if "feature_set" in manifest and not isinstance(manifest["feature_set"], list):
+        errors.append("feature_set must be a list")
+    if "hash" in manifest and not isinstance(manifest["hash"], str):
+        errors.append("hash must be a string")
+    return errors
+
+
+def sha256_file(path: Path, buffer_size: int = BUFFER_SIZE) -> str:
+    digest = hashlib.sha256()
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as handle:
+        while True:
+            read = handle.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+class DigestCache:
+    """SQLite index of file digests keyed by (path, size, mtime_ns)."""
+
+    def __init__(self, path: Path = DEFAULT_DIGEST_CACHE) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30.0)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS digests ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, sha256 TEXT NOT NULL)"
+        )
+
+    def get(self, path: Path, stat: os.stat_result) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT sha256 FROM digests WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (str(path), stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_many(self, entries: Iterable[tuple]) -> None:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?)", entries
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "DigestCache":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+@dataclass
+class HashStats:
+    hashed: int = 0
+    cached: int = 0
+    bytes_hashed: int = 0
+
+
+def hash_files(
+    paths: Iterable[Path],
+    workers: int = 4,
+    cache: Optional[DigestCache] = None,
+    stats: Optional[HashStats] = None,
+) -> Dict[Path, str]:
+    """SHA-256 of each file, hashing cache misses on ``workers`` threads."""
+
+    stats = stats if stats is not None else HashStats()
+    digests: Dict[Path, str] = {}
+    todo = []
+    for path in (Path(p).resolve() for p in paths):
+        stat = path.stat()
+        cached = cache.get(path, stat) if cache is not None else None
+        if cached is not None:
+            digests[path] = cached
+            stats.cached += 1
+        else:
+            todo.append((path, stat))
+    if todo:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(todo)))) as pool:
+            results = list(pool.map(lambda item: sha256_file(item[0]), todo))
+        for (path, stat), digest in zip(todo, results):
+            digests[path] = digest
+            stats.hashed += 1
+            stats.bytes_hashed += stat.st_size
+        if cache is not None:
+            cache.put_many(
+                (str(path), stat.st_size, stat.st_mtime_ns, digest)
+                for (path, stat), digest in zip(todo, results)
+            )
+    return digests
+
+
+def _data_files(snapshot_dir: Path) -> List[Path]:
+    return sorted(
+        p for p in snapshot_dir.iterdir() if p.is_file() and p.name != MANIFEST_NAME
+    )
+
+
+def snapshot_digest(file_digests: Dict[str, str]) -> str:
+    lines = "".join(
+        f"{name}:{digest}\n" for name, digest in sorted(file_digests.items())
+    )
+    return hashlib.sha256(lines.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class VerificationResult:
+    snapshot_dir: Path
+    ok: bool
+    expected: Optional[str]
+    actual: Optional[str]
+    files: Dict[str, str] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+    stats: HashStats = field(default_factory=HashStats)
+
+
+def verify_snapshot(
+    snapshot_dir: Path, workers: int = 4, cache: Optional[DigestCache] = None
+) -> VerificationResult:
+    """Check manifest fields and that the snapshot digest matches ``hash``."""
+
+    snapshot_dir = Path(snapshot_dir)
+    result = VerificationResult(snapshot_dir, False, None, None)
+    try:
+        manifest = load_manifest(snapshot_dir / MANIFEST_NAME)
+    except (FileNotFoundError, json.JSONDecodeError) as exc:
+        result.errors.append(f"unreadable manifest: {exc}")
+        return result
+    result.errors.extend(validate_manifest(manifest))
+    result.expected = manifest.get("hash")
+
+    data_files = _data_files(snapshot_dir)
+    if not data_files:
+        result.errors.append("snapshot has no data files")
+        return result
+    digests = hash_files(data_files, workers, cache, result.stats)
+    result.files = {p.name: digests[p.resolve()] for p in data_files}
+    result.actual = snapshot_digest(result.files)
+    if result.expected is not None and result.actual != result.expected:
+        result.errors.append(
+            f"hash mismatch: manifest {result.expected} != computed {result.actual}"
+        )
+    result.ok = not result.errors
+    return result
+
+
+def build_manifest(
+    snapshot_dir: Path, fields: Dict[str, Any], workers: int = 4
+) -> Dict[str, Any]:
+    """``fields`` plus the ``hash`` that ``verify_snapshot`` will recompute.
+
+    Hashes every file of ``snapshot_dir`` except the manifest, so the data files
+    must be final before the manifest is built.
+    """
+
+    snapshot_dir = Path(snapshot_dir)
+    data_files = _data_files(snapshot_dir)
+    if not data_files:
+        raise SnapshotVerificationError(f"{snapshot_dir}: snapshot has no data files")
+    digests = hash_files(data_files, workers)
+    manifest = dict(fields)
+    manifest["hash"] = snapshot_digest(
+        {p.name: digests[p.resolve()] for p in data_files}
+    )
+    return manifest
+
+
+def write_manifest(
+    snapshot_dir: Path, fields: Dict[str, Any], workers: int = 4
+) -> Path:
+    """Build the manifest and write it as ``manifest.json`` in ``snapshot_dir``."""
+
+    path = Path(snapshot_dir) / MANIFEST_NAME
+    manifest = build_manifest(snapshot_dir, fields, workers)
+    path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    return path
+
+
+def ensure_verified(
+    symbol: str, date: str, workers: int = 4, cache_path: Optional[Path] = None
+) -> VerificationResult:
+    """Verify ``snapshots/{symbol}/{date}``; raise if it does not match its manifest."""
+
+    with DigestCache(cache_path or DEFAULT_DIGEST_CACHE) as cache:
+        result = verify_snapshot(
+            resolve_paths(symbol, date)["manifest"].parent, workers, cache
+        )
+    if not result.ok:
+        raise SnapshotVerificationError(f"{symbol}/{date}: " + "; ".join(result.errors))
+    return result
+
+
+def _self_test() -> None:
+    """Round-trip: a manifest from ``write_manifest`` verifies, tampering does not."""
+
+    fields = {
+        "schema_version": "1",
+        "snapshot_id": "BTCUSDT-2025-10-24",
+        "symbol": "BTCUSDT",
+        "tz": "UTC",
+        "row_count": 3,
+        "start_ts_utc": "2025-10-24T00:00:00Z",
+        "end_ts_utc": "2025-10-24T00:02:00Z",
+        "feature_set": ["ret_1m"],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = Path(tmp)
+        (snapshot / "X_train.parquet").write_bytes(os.urandom(4096))
+        (snapshot / "y_train.parquet").write_bytes(os.urandom(1024))
+        write_manifest(snapshot, fields)
+        result = verify_snapshot(snapshot)
+        assert result.ok, result.errors
+        print(f"[verify] self-test round trip ok hash={result.actual}")
+
+        with open(snapshot / "y_train.parquet", "ab") as handle:
+            handle.write(b"\0")
+        result = verify_snapshot(snapshot)
+        assert not result.ok and "hash mismatch" in result.errors[0], result.errors
+        print("[verify] self-test tampered snapshot rejected")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("snapshots", nargs="*", help="snapshot dirs or SYMBOL/DATE")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--cache", default=str(DEFAULT_DIGEST_CACHE))
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument(
+        "--self-test", action="store_true", help="round-trip write_manifest/verify"
+    )
+    args = parser.parse_args()
+    if args.self_test:
+        _self_test()
+        return
+    if not args.snapshots:
+        parser.error("give at least one snapshot dir or SYMBOL/DATE")
+
+    failed = 0
+    cache = None if args.no_cache else DigestCache(Path(args.cache))
+    try:
+        for item in args.snapshots:
+            path = Path(item)
+            if not path.is_dir():
+                symbol, date = item.split("/", 1)
+                path = resolve_paths(symbol, date)["manifest"].parent
+            result = verify_snapshot(path, args.workers, cache)
+            status = "ok" if result.ok else "FAIL"
+            print(
+                f"[verify] {status} {path} hashed={result.stats.hashed} "
+                f"cached={result.stats.cached}"
+            )
+            for error in result.errors:
+                print(f"  - {error}")
+            failed += not result.ok
+    finally:
+        if cache is not None:
+            cache.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
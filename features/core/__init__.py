@@ -1,6 +1,22 @@
 """Core feature implementations used by V7 trainers."""
 from __future__ import annotations
 
-from .macro_factor import MacroFactorConfig, build
+from .macro_factor import (
+    IncrementalMacroFactor,
+    MacroFactorConfig,
+    build,
+    build_multi,
+)
+from .micro_features import FEATURE_COLUMNS, MicroFeatureConfig, MicroFeatureStream
+from .micro_features import build as build_micro_features
 
-__all__ = ["MacroFactorConfig", "build"]
+__all__ = [
+    "FEATURE_COLUMNS",
+    "IncrementalMacroFactor",
+    "MacroFactorConfig",
+    "MicroFeatureConfig",
+    "MicroFeatureStream",
+    "build",
+    "build_micro_features",
+    "build_multi",
+]
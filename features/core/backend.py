@@ -0,0 +1,144 @@
+"""Optional Polars lazy backend for feature building and dataset preparation.
+WHY: ``polars`` is declared in the ``analytics`` extra; large inputs benefit from
+lazy, streamed query plans while pandas stays the reference implementation.
+
+The backend is chosen per call (``backend=``) or through ``ORDERFLOW_BACKEND``:
+``pandas`` (default), ``polars``, or ``auto`` (polars when installed). Every
+polars path returns the same pandas object the pandas path would, so callers
+never see which engine ran. Sources may be pandas frames or parquet paths; paths
+are scanned lazily so only the needed columns and rows are read. In-memory frames
+must first be converted to Arrow, so the polars backend pays off mainly for
+parquet sources; ``tools/bench_backends.py`` compares both.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, Sequence, Union
+
+import pandas as pd
+
+pl: Any
+try:  # optional dependency (pyproject extra "analytics")
+    import polars as pl
+except ImportError:  # pragma: no cover - exercised when polars is absent
+    pl = None
+
+BACKEND_ENV = "ORDERFLOW_BACKEND"
+BACKENDS = ("pandas", "polars", "auto")
+
+Source = Union[pd.DataFrame, str, Path]
+
+
+def polars_available() -> bool:
+    return pl is not None
+
+
+def resolve_backend(backend: str | None = None) -> str:
+    """Concrete backend name for ``backend`` or the environment setting.
+
+    Raises
+    ------
+    ValueError
+        If the name is unknown.
+    ImportError
+        If ``polars`` is requested explicitly but not installed.
+    """
+
+    name = (backend or os.getenv(BACKEND_ENV) or "pandas").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'; expected one of {BACKENDS}")
+    if name == "auto":
+        return "polars" if polars_available() else "pandas"
+    if name == "polars" and not polars_available():
+        raise ImportError("polars backend requested but polars is not installed")
+    return name
+
+
+def to_pandas(source: Source, columns: Sequence[str] | None = None) -> pd.DataFrame:
+    """Materialise a pandas source (a frame or parquet path)."""
+
+    if isinstance(source, pd.DataFrame):
+        return source
+    return pd.read_parquet(source, columns=list(columns) if columns else None)
+
+
+def _lazy(source: Source, columns: Sequence[str] | None = None) -> "pl.LazyFrame":
+    """Lazy frame over ``columns`` of the source (all when ``None``)."""
+
+    if isinstance(source, pd.DataFrame):
+        # convert only what the plan reads; pandas -> arrow copies object columns
+        subset = source if columns is None else source[list(columns)]
+        frame = pl.from_pandas(subset, nan_to_null=True).lazy()
+    else:
+        frame = pl.scan_parquet(str(source))
+        if columns is not None:
+            frame = frame.select(columns)
+    # pandas treats NaN as missing in rolling windows and dropna; polars uses null
+    return frame.with_columns(pl.col(pl.Float32, pl.Float64).fill_nan(None))
+
+
+def _collect(query: "pl.LazyFrame") -> pd.DataFrame:
+    return query.collect(streaming=True).to_pandas()
+
+
+def _columns(source: Source) -> list[str]:
+    if isinstance(source, pd.DataFrame):
+        return list(source.columns)
+    return list(pl.scan_parquet(str(source)).columns)
+
+
+def macro_factor(source: Source, window: int, column: str, min_periods: int):
+    """``MA_ratio``/``macro_factor_used`` as a lazy rolling-mean plan."""
+
+    if column not in _columns(source):
+        raise KeyError(f"Required column '{column}' not found in dataframe")
+    price = pl.col(column).cast(pl.Float64)
+    query = _lazy(source, [column]).select(
+        (price / price.rolling_mean(window, min_periods=min_periods))
+        .fill_null(float("nan"))
+        .alias("MA_ratio"),
+        pl.lit(True).alias("macro_factor_used"),
+    )
+    out = _collect(query)
+    if isinstance(source, pd.DataFrame):
+        out.index = source.index
+    return out
+
+
+def prepare_transitions(
+    source: Source, label_column: str, feature_columns: Sequence[str]
+) -> pd.DataFrame:
+    """Label plus features with ``next_state`` = label shifted by -1, nulls dropped."""
+
+    columns = [label_column] + list(feature_columns)
+    missing = [col for col in columns if col not in _columns(source)]
+    if missing:
+        raise KeyError(f"Missing required columns: {missing}")
+    frame = _lazy(source, columns)
+    next_state = pl.col(label_column).shift(-1)
+    if frame.schema[label_column].is_integer():
+        # pandas upcasts a shifted integer column to float64 (NaN fill)
+        next_state = next_state.cast(pl.Float64)
+    query = frame.with_columns(next_state.alias("next_state")).drop_nulls()
+    return _collect(query)
+
+
+def tail_window(
+    source: Source, feature_columns: Sequence[str], window_size: int
+) -> pd.DataFrame:
+    """Last ``window_size`` rows with a fresh ``RangeIndex``."""
+
+    columns = _columns(source)
+    if not columns:
+        raise ValueError("Feature dataset is empty; cannot fit clusterer")
+    missing = [col for col in feature_columns if col not in columns]
+    if missing:
+        raise KeyError(f"Missing required feature columns: {missing}")
+    if isinstance(source, pd.DataFrame):
+        # a frame is already in memory: slicing before conversion is the plan
+        source = source.tail(window_size)
+    out = _collect(_lazy(source).tail(window_size))
+    if out.empty:
+        raise ValueError("Feature dataset is empty; cannot fit clusterer")
+    return out
@@ -4,9 +4,13 @@ WHY: Provide stable drivers for TVTP, aligning code with README claims.
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Sequence
 
+import numpy as np
 import pandas as pd
 
+from . import backend as _backend
+
 
 @dataclass
 class MacroFactorConfig:
@@ -15,6 +19,11 @@ class MacroFactorConfig:
     window: int = 200
     column: str = "close"
     min_periods: int | None = None
+    backend: str | None = None
+
+
+def _min_periods(window: int, min_periods: int | None) -> int:
+    return min_periods or max(1, window // 2)
 
 
 def build(df: pd.DataFrame, cfg: MacroFactorConfig | None = None) -> pd.DataFrame:
@@ -23,9 +32,11 @@ def build(df: pd.DataFrame, cfg: MacroFactorConfig | None = None) -> pd.DataFram
     Parameters
     ----------
     df:
-        Input dataframe containing OHLCV style columns.
+        Input dataframe containing OHLCV style columns, or a parquet path.
     cfg:
         Optional configuration. Defaults to :class:`MacroFactorConfig`.
+        ``cfg.backend`` selects pandas or the polars lazy plan (see
+        :mod:`features.core.backend`); both return the same frame.
 
     Returns
     -------
@@ -39,13 +50,203 @@ def build(df: pd.DataFrame, cfg: MacroFactorConfig | None = None) -> pd.DataFram
     """
 
     cfg = cfg or MacroFactorConfig()
+    min_periods = _min_periods(cfg.window, cfg.min_periods)
+    if _backend.resolve_backend(cfg.backend) == "polars":
+        return _backend.macro_factor(df, cfg.window, cfg.column, min_periods)
+
+    df = _backend.to_pandas(df)
     if cfg.column not in df.columns:
         raise KeyError(f"Required column '{cfg.column}' not found in dataframe")
 
-    min_periods = cfg.min_periods or max(1, cfg.window // 2)
     rolling_mean = df[cfg.column].rolling(cfg.window, min_periods=min_periods).mean()
 
     out = pd.DataFrame(index=df.index)
     out["MA_ratio"] = df[cfg.column] / rolling_mean
     out["macro_factor_used"] = True
     return out
+
+
+class IncrementalMacroFactor:
+    """O(1)-per-bar ``MA_ratio`` for live mode.
+
+    Keeps the last ``window`` values in a ring buffer with a compensated running
+    sum and a count of non-NaN entries, so each :meth:`update` matches the last row
+    of :func:`build` on the full history, including ``min_periods`` handling of
+    NaN inputs. :meth:`state_dict`/:meth:`from_state` round-trip through JSON.
+    """
+
+    def __init__(self, cfg: MacroFactorConfig | None = None) -> None:
+        self.cfg = cfg or MacroFactorConfig()
+        self.min_periods = _min_periods(self.cfg.window, self.cfg.min_periods)
+        self._buffer = np.full(self.cfg.window, np.nan)
+        self._pos = 0
+        self._seen = 0
+        self._count = 0
+        self._sum = 0.0
+        self._comp = 0.0
+        # run of identical trailing values; pandas returns that value exactly
+        self._last = np.nan
+        self._same = 0
+
+    def _add(self, value: float) -> None:
+        y = value - self._comp
+        t = self._sum + y
+        self._comp = (t - self._sum) - y
+        self._sum = t
+        self._count += 1
+
+    def _remove(self, value: float) -> None:
+        y = -value - self._comp
+        t = self._sum + y
+        self._comp = (t - self._sum) - y
+        self._sum = t
+        self._count -= 1
+        if self._count == 0:
+            self._sum = self._comp = 0.0
+
+    def mean(self) -> float:
+        """Rolling mean of the current window, NaN below ``min_periods``."""
+
+        if self._count < self.min_periods:
+            return float("nan")
+        if self._same >= self._count:
+            return float(self._last)
+        return self._sum / self._count
+
+    def update(self, value: float) -> float:
+        """Push one bar's ``column`` value and return its ``MA_ratio``."""
+
+        value = float(value)
+        if self._seen >= self.cfg.window:
+            old = self._buffer[self._pos]
+            if not np.isnan(old):
+                self._remove(old)
+        self._buffer[self._pos] = value
+        self._pos = (self._pos + 1) % self.cfg.window
+        self._seen += 1
+        if not np.isnan(value):
+            self._add(value)
+            self._same = self._same + 1 if value == self._last else 1
+            self._last = value
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return float(np.float64(value) / self.mean())
+
+    def update_many(self, values: Sequence[float]) -> np.ndarray:
+        return np.array([self.update(v) for v in values], dtype=float)
+
+    def state_dict(self) -> dict:
+        """JSON-serialisable state; NaN buffer slots are stored as ``None``."""
+
+        return {
+            "window": self.cfg.window,
+            "column": self.cfg.column,
+            "min_periods": self.cfg.min_periods,
+            "buffer": [None if np.isnan(v) else float(v) for v in self._buffer],
+            "pos": self._pos,
+            "seen": self._seen,
+            "count": self._count,
+            "sum": self._sum,
+            "comp": self._comp,
+            "last": None if np.isnan(self._last) else float(self._last),
+            "same": self._same,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "IncrementalMacroFactor":
+        engine = cls(
+            MacroFactorConfig(
+                window=state["window"],
+                column=state["column"],
+                min_periods=state["min_periods"],
+            )
+        )
+        engine._buffer = np.array(
+            [np.nan if v is None else v for v in state["buffer"]], dtype=float
+        )
+        engine._pos = state["pos"]
+        engine._seen = state["seen"]
+        engine._count = state["count"]
+        engine._sum = state["sum"]
+        engine._comp = state["comp"]
+        engine._last = np.nan if state["last"] is None else state["last"]
+        engine._same = state["same"]
+        return engine
+
+
+def build_multi(
+    df: pd.DataFrame,
+    windows: Sequence[int] = (50, 100, 200),
+    column: str = "close",
+    min_periods: int | None = None,
+    group_column: str | None = "symbol",
+) -> pd.DataFrame:
+    """``MA_ratio`` for several windows and symbols from one cumulative-sum pass.
+
+    Parameters
+    ----------
+    df:
+        Input dataframe, rows in time order within each symbol.
+    windows:
+        Rolling windows; column ``MA_ratio_{window}`` is produced for each.
+    column:
+        Price column the ratio is computed on.
+    min_periods:
+        Applied to every window; defaults per window as in :func:`build`.
+    group_column:
+        Column identifying the symbol. Ignored when ``None`` or absent, in which
+        case the frame is treated as a single series.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Frame aligned with ``df.index`` holding one ratio column per window and
+        ``macro_factor_used``. Values match :func:`build` per symbol up to
+        floating-point rounding of the prefix sums.
+
+    Raises
+    ------
+    KeyError
+        If the configured column does not exist in the input frame.
+    """
+
+    if column not in df.columns:
+        raise KeyError(f"Required column '{column}' not found in dataframe")
+
+    values = df[column].to_numpy(dtype=float)
+    n = len(values)
+    if group_column is not None and group_column in df.columns:
+        codes = pd.factorize(df[group_column])[0]
+        order = np.argsort(codes, kind="stable")
+        codes = codes[order]
+    else:
+        order = np.arange(n)
+        codes = np.zeros(n, dtype=np.int64)
+    x = values[order]
+    valid = ~np.isnan(x)
+    # centre before summing so prefix-sum differences keep their precision
+    centre = float(np.mean(x[valid])) if valid.any() else 0.0
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, x - centre, 0.0))))
+    ccount = np.concatenate(([0], np.cumsum(valid)))
+    position = np.arange(n)
+    group_start = np.zeros(n, dtype=np.int64)
+    if n:
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        starts = np.concatenate(([0], boundaries))
+        group_start = np.repeat(starts, np.diff(np.concatenate((starts, [n]))))
+
+    out = pd.DataFrame(index=df.index)
+    for window in windows:
+        lo = np.maximum(position + 1 - window, group_start)
+        count = ccount[position + 1] - ccount[lo]
+        total = csum[position + 1] - csum[lo]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(
+                count >= _min_periods(window, min_periods),
+                total / count + centre,
+                np.nan,
+            )
+            ratio = np.empty(n)
+            ratio[order] = x / mean
+        out[f"MA_ratio_{window}"] = ratio
+    out["macro_factor_used"] = True
+    return out
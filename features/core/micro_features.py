@@ -0,0 +1,309 @@
+"""Micro feature engine for the ``governance/SCHEMA_features.json`` column set.
+WHY: The clusterer consumes these 16 columns; computing them here keeps batch
+training and live bars on one definition.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+SCHEMA_PATH = (
+    Path(__file__).resolve().parents[2] / "governance" / "SCHEMA_features.json"
+)
+
+
+def _schema_columns(path: Path = SCHEMA_PATH) -> list[str]:
+    schema = json.loads(path.read_text(encoding="utf-8"))
+    return [c["name"] for c in schema["micro_features"]["columns"]]
+
+
+FEATURE_COLUMNS: list[str] = _schema_columns()
+
+_SIDE = {"bull": 1, "buy": 1, "bear": -1, "sell": -1}
+
+
+@dataclass
+class MicroFeatureConfig:
+    """Configuration for micro feature construction.
+
+    ``poc``/``vah``/``val`` input columns are used when present; otherwise they are
+    approximated from a rolling volume profile over ``profile_window`` bars (POC as
+    the volume-weighted mean of the VPO price, value area as POC ± ``value_area_z``
+    volume-weighted standard deviations, ≈70% of volume under normality).
+    """
+
+    fast_span: int = 20
+    slow_span: int = 50
+    cvd_span: int = 60
+    rv_window: int = 5
+    profile_window: int = 60
+    value_area_z: float = 1.04
+
+
+def _alpha(span: int) -> float:
+    return 2.0 / (span + 1.0)
+
+
+def _ema(x: np.ndarray, span: int) -> np.ndarray:
+    """``pd.Series(x).ewm(span=span, adjust=False).mean()`` as a linear filter."""
+
+    if not len(x):
+        return x.astype(float)
+    a = _alpha(span)
+    y, _ = lfilter([a], [1.0, a - 1.0], x, zi=[(1.0 - a) * x[0]])
+    return y
+
+
+def _rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """Sum of the last ``window`` values (fewer at the start)."""
+
+    c = np.concatenate(([0.0], np.cumsum(x)))
+    lo = np.maximum(np.arange(1, len(x) + 1) - window, 0)
+    return c[1:] - c[lo]
+
+
+def _side(values: pd.Series) -> np.ndarray:
+    return (
+        values.astype("string")
+        .str.lower()
+        .map(_SIDE)
+        .fillna(0)
+        .to_numpy(dtype=np.float64)
+    )
+
+
+def _column(df: pd.DataFrame, name: str, default: float) -> np.ndarray:
+    if name not in df.columns:
+        return np.full(len(df), default)
+    return df[name].to_numpy(dtype=float, na_value=np.nan)
+
+
+def build(df: pd.DataFrame, cfg: MicroFeatureConfig | None = None) -> np.ndarray:
+    """Construct the micro feature matrix used by the clusterer.
+
+    Parameters
+    ----------
+    df:
+        1m bars with ``open``/``high``/``low``/``close``/``volume``/``cvd`` and the
+        optional ATAS columns from ``governance/SCHEMA_data.json``.
+    cfg:
+        Optional configuration. Defaults to :class:`MicroFeatureConfig`.
+
+    Returns
+    -------
+    numpy.ndarray
+        C-contiguous ``float32`` array of shape ``(len(df), 16)`` in
+        :data:`FEATURE_COLUMNS` order.
+
+    Raises
+    ------
+    KeyError
+        If a required OHLCV/CVD column is missing.
+    ValueError
+        If a required column contains non-finite values.
+    """
+
+    cfg = cfg or MicroFeatureConfig()
+    required = ["open", "high", "low", "close", "volume", "cvd"]
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        raise KeyError(f"Required columns {missing} not found in dataframe")
+    o, h, low, c, v, cvd = (df[col].to_numpy(dtype=float) for col in required)
+    if not all(np.isfinite(x).all() for x in (o, h, low, c, v, cvd)):
+        raise ValueError("OHLCV/CVD columns must be finite; fill gaps upstream")
+
+    n = len(df)
+    out = np.empty((n, len(FEATURE_COLUMNS)), dtype=np.float32)
+    cols = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[:, cols["ret_1m"]] = c / o - 1.0
+        out[:, cols["hl_range"]] = (h - low) / ((h + low) / 2.0)
+        out[:, cols["vol_1m"]] = np.log1p(v)
+
+        dcvd = np.diff(cvd, prepend=cvd[:1])
+        cvd_rms = np.sqrt(_ema(dcvd**2, cfg.cvd_span))
+        out[:, cols["cvd_norm"]] = np.where(cvd_rms > 0, dcvd / cvd_rms, 0.0)
+
+        out[:, cols["vpo_loc"]] = np.nan_to_num(
+            _column(df, "bar_vpo_loc", 0.5), nan=0.5
+        )
+        out[:, cols["vpo_bias"]] = (
+            _side(df["bar_vpo_side"]) if "bar_vpo_side" in df.columns else 0.0
+        )
+        vpo_vol = np.nan_to_num(_column(df, "bar_vpo_vol", 0.0))
+        out[:, cols["vpo_intensity"]] = np.where(v > 0, vpo_vol / v, 0.0)
+        out[:, cols["spread_proxy"]] = (h - low) / c
+
+        detected = _column(df, "absorption_detected", 0.0)
+        out[:, cols["absorb_flag"]] = np.nan_to_num(detected) != 0
+        out[:, cols["absorb_side"]] = (
+            _side(df["absorption_side"]) if "absorption_side" in df.columns else 0.0
+        )
+        out[:, cols["absorb_strength"]] = np.nan_to_num(
+            _column(df, "absorption_strength", 0.0)
+        )
+
+        poc, vah, val = _value_area(df, c, v, cfg)
+        out[:, cols["poc_gap"]] = poc - c
+        out[:, cols["vah_gap"]] = vah - c
+        out[:, cols["val_gap"]] = val - c
+
+        ema_fast = _ema(c, cfg.fast_span)
+        ema_slow = _ema(c, cfg.slow_span)
+        out[:, cols["trend_proxy"]] = (ema_fast - ema_slow) / c
+
+        log_ret = np.diff(np.log(c), prepend=np.log(c[:1]))
+        out[:, cols["rv_5m"]] = np.sqrt(_rolling_sum(log_ret**2, cfg.rv_window))
+    return out
+
+
+def _vpo_price(df: pd.DataFrame, close: np.ndarray) -> np.ndarray:
+    price = _column(df, "bar_vpo_price", np.nan)
+    # SCHEMA_data.quality: bar_vpo_price is forward-filled, then falls back to close
+    price = pd.Series(price).ffill().to_numpy()
+    return np.where(np.isnan(price), close, price)
+
+
+def _value_area(
+    df: pd.DataFrame, close: np.ndarray, volume: np.ndarray, cfg: MicroFeatureConfig
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if {"poc", "vah", "val"} <= set(df.columns):
+        return tuple(df[c].to_numpy(dtype=float) for c in ("poc", "vah", "val"))
+    price = _vpo_price(df, close)
+    # moments of prices centred on the first one, so E[p^2] - E[p]^2 keeps precision
+    ref = price[0] if len(price) else 0.0
+    dev = price - ref
+    w = _rolling_sum(volume, cfg.profile_window)
+    wp = _rolling_sum(volume * dev, cfg.profile_window)
+    wp2 = _rolling_sum(volume * dev**2, cfg.profile_window)
+    mean = np.where(w > 0, wp / w, dev)
+    std = np.sqrt(np.maximum(np.where(w > 0, wp2 / w, dev**2) - mean**2, 0.0))
+    poc = mean + ref
+    return poc, poc + cfg.value_area_z * std, poc - cfg.value_area_z * std
+
+
+def to_frame(features: np.ndarray, index: pd.Index | None = None) -> pd.DataFrame:
+    """Label a feature matrix with :data:`FEATURE_COLUMNS`."""
+
+    return pd.DataFrame(features, columns=FEATURE_COLUMNS, index=index)
+
+
+class _Window:
+    """Fixed-size ring buffer with a running sum."""
+
+    def __init__(self, size: int) -> None:
+        self.values = np.zeros(size)
+        self.pos = 0
+        self.total = 0.0
+
+    def push(self, value: float) -> float:
+        self.total += value - self.values[self.pos]
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % len(self.values)
+        return self.total
+
+
+class MicroFeatureStream:
+    """Per-bar counterpart of :func:`build` for live mode.
+
+    Holds the EMA, CVD, realised-volatility and volume-profile state so each
+    :meth:`update` is O(1) and returns the same row :func:`build` would produce for
+    that bar given the full history (up to float32 rounding).
+    """
+
+    def __init__(self, cfg: MicroFeatureConfig | None = None) -> None:
+        self.cfg = cfg or MicroFeatureConfig()
+        self._ema_fast: float | None = None
+        self._ema_slow: float | None = None
+        self._cvd_ms: float | None = None
+        self._prev_close: float | None = None
+        self._prev_cvd: float | None = None
+        self._vpo_price: float | None = None
+        self._ref: float | None = None
+        self._rv = _Window(self.cfg.rv_window)
+        self._w = _Window(self.cfg.profile_window)
+        self._wp = _Window(self.cfg.profile_window)
+        self._wp2 = _Window(self.cfg.profile_window)
+
+    @staticmethod
+    def _ema_step(prev: float | None, value: float, span: int) -> float:
+        if prev is None:
+            return value
+        a = _alpha(span)
+        return a * value + (1.0 - a) * prev
+
+    def update(self, bar: Mapping[str, Any]) -> np.ndarray:
+        """Push one bar (a mapping of input columns) and return its feature row."""
+
+        cfg = self.cfg
+        o, h, low, c, v, cvd = (
+            float(bar[k]) for k in ("open", "high", "low", "close", "volume", "cvd")
+        )
+        row = dict.fromkeys(FEATURE_COLUMNS, 0.0)
+        row["ret_1m"] = c / o - 1.0
+        row["hl_range"] = (h - low) / ((h + low) / 2.0)
+        row["vol_1m"] = float(np.log1p(v))
+
+        dcvd = 0.0 if self._prev_cvd is None else cvd - self._prev_cvd
+        self._prev_cvd = cvd
+        self._cvd_ms = self._ema_step(self._cvd_ms, dcvd * dcvd, cfg.cvd_span)
+        rms = np.sqrt(self._cvd_ms)
+        row["cvd_norm"] = dcvd / rms if rms > 0 else 0.0
+
+        loc = _optional(bar, "bar_vpo_loc")
+        row["vpo_loc"] = 0.5 if loc is None else loc
+        row["vpo_bias"] = _SIDE.get(str(bar.get("bar_vpo_side", "")).lower(), 0)
+        vpo_vol = _optional(bar, "bar_vpo_vol") or 0.0
+        row["vpo_intensity"] = vpo_vol / v if v > 0 else 0.0
+        row["spread_proxy"] = (h - low) / c
+        row["absorb_flag"] = float(bool(_optional(bar, "absorption_detected")))
+        row["absorb_side"] = _SIDE.get(str(bar.get("absorption_side", "")).lower(), 0)
+        row["absorb_strength"] = _optional(bar, "absorption_strength") or 0.0
+
+        if all(_optional(bar, k) is not None for k in ("poc", "vah", "val")):
+            poc, vah, val = (float(bar[k]) for k in ("poc", "vah", "val"))
+        else:
+            price = _optional(bar, "bar_vpo_price")
+            if price is not None:
+                self._vpo_price = price
+            price = self._vpo_price if self._vpo_price is not None else c
+            if self._ref is None:
+                self._ref = price
+            dev = price - self._ref
+            w = self._w.push(v)
+            wp = self._wp.push(v * dev)
+            wp2 = self._wp2.push(v * dev * dev)
+            mean = wp / w if w > 0 else dev
+            mean_sq = wp2 / w if w > 0 else dev * dev
+            std = float(np.sqrt(max(mean_sq - mean * mean, 0.0)))
+            poc = mean + self._ref
+            vah, val = poc + cfg.value_area_z * std, poc - cfg.value_area_z * std
+        row["poc_gap"] = poc - c
+        row["vah_gap"] = vah - c
+        row["val_gap"] = val - c
+
+        self._ema_fast = self._ema_step(self._ema_fast, c, cfg.fast_span)
+        self._ema_slow = self._ema_step(self._ema_slow, c, cfg.slow_span)
+        row["trend_proxy"] = (self._ema_fast - self._ema_slow) / c
+
+        log_ret = (
+            0.0 if self._prev_close is None else float(np.log(c / self._prev_close))
+        )
+        self._prev_close = c
+        row["rv_5m"] = float(np.sqrt(max(self._rv.push(log_ret * log_ret), 0.0)))
+        return np.array([row[k] for k in FEATURE_COLUMNS], dtype=np.float32)
+
+
+def _optional(bar: Mapping[str, Any], key: str) -> float | None:
+    value = bar.get(key)
+    if value is None or value is pd.NA:
+        return None
+    number = float(value)
+    return None if np.isnan(number) else number
@@ -11,6 +11,10 @@ from typing import Dict, Iterable, List, Sequence, Tuple
 import numpy as np
 import pandas as pd
 
+import perf
+from data_contract.compaction import feature_matrix
+from features.core import backend as frame_backend
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -26,11 +30,18 @@ class ClustererConfig:
     artifacts_path: Path = Path("model/clusterer_dynamic/cluster_artifacts.json")
     labels_output: Path = Path("output/clusterer_dynamic/labels_wt.parquet")
     alignment_report: Path = Path("output/clusterer_dynamic/label_alignment_report.md")
+    backend: str | None = None
 
 
 def _load_window(
-    dataset: pd.DataFrame, feature_columns: Sequence[str], window_size: int
+    dataset: pd.DataFrame,
+    feature_columns: Sequence[str],
+    window_size: int,
+    backend: str | None = None,
 ) -> pd.DataFrame:
+    if frame_backend.resolve_backend(backend) == "polars":
+        return frame_backend.tail_window(dataset, feature_columns, window_size)
+
     if dataset.empty:
         raise ValueError("Feature dataset is empty; cannot fit clusterer")
 
@@ -146,6 +157,7 @@ def _write_alignment_report(
     path.write_text("\n".join(lines))
 
 
+@perf.timed("writer.cluster_labels")
 def _export_labels(
     dataset: pd.DataFrame, labels: np.ndarray, weights: np.ndarray, output_path: Path
 ) -> None:
@@ -172,30 +184,41 @@ def _save_artifacts(centroids: np.ndarray, drift: float, path: Path) -> None:
     path.write_text(json.dumps(payload, indent=2, sort_keys=True))
 
 
+@perf.timed("clusterer.run")
 def run(dataset: pd.DataFrame, config: ClustererConfig) -> Dict[str, float]:
     """Fit the online clusterer and persist artifacts."""
 
-    window = _load_window(dataset, config.feature_columns, config.window_size)
-    data = window[config.feature_columns].to_numpy(dtype=float)
+    with perf.timer("clusterer.load_window"):
+        window = _load_window(
+            dataset, config.feature_columns, config.window_size, config.backend
+        )
+        data = feature_matrix(window, config.feature_columns)
+    perf.count("clusterer.rows", data.shape[0])
 
-    centroids = _initialise_centroids(data, config.k)
-    centroids = _online_update(data, centroids, config.online_decay)
+    with perf.timer("clusterer.online_update"):
+        centroids = _initialise_centroids(data, config.k)
+        centroids = _online_update(data, centroids, config.online_decay)
 
-    previous = _load_previous_artifacts(config.artifacts_path)
+    with perf.timer("clusterer.load_artifacts"):
+        previous = _load_previous_artifacts(config.artifacts_path)
     centroids_aligned, swapped = _compute_alignment(previous, centroids)
     drift_value = _prototype_drift(previous, centroids_aligned)
 
-    labels, weights = _assign_labels(data, centroids_aligned)
+    with perf.timer("clusterer.assign_labels"):
+        labels, weights = _assign_labels(data, centroids_aligned)
 
     _export_labels(
         window.assign(timestamp=window.index), labels, weights, config.labels_output
     )
-    _save_artifacts(centroids_aligned, drift_value, config.artifacts_path)
-    _write_alignment_log(config.alignment_log, swapped, drift_value, config.window_size)
-    window_identifier = _resolve_window_id(window)
-    _write_alignment_report(
-        config.alignment_report, window_identifier, swapped, drift_value
-    )
+    with perf.timer("clusterer.write_artifacts"):
+        _save_artifacts(centroids_aligned, drift_value, config.artifacts_path)
+        _write_alignment_log(
+            config.alignment_log, swapped, drift_value, config.window_size
+        )
+        window_identifier = _resolve_window_id(window)
+        _write_alignment_report(
+            config.alignment_report, window_identifier, swapped, drift_value
+        )
 
     LOGGER.info(
         "clusterer_dynamic fit complete: drift=%.4f swapped=%s", drift_value, swapped
@@ -0,0 +1,234 @@
+"""Fused per-bar cluster assignment + TVTP + clarity inference.
+
+Loads the clusterer centroids and TVTP coefficients once and scores a feature row or
+batch in a single pass, producing the payload described by
+``governance/SCHEMA_decision.json``.
+"""
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .state_inference import (
+    REASON_CODES,
+    REASON_LABELS,
+    _clarity_from_probs,
+    _load_artifacts,
+    _sigmoid,
+)
+
+
+@dataclass
+class FusedConfig:
+    cluster_columns: Sequence[str]
+    tvtp_columns: Sequence[str]
+    transition_gate: float = 0.65
+    min_clarity: float = 0.4
+    state_from: str = "balance"
+    state_to: str = "trend"
+    cluster_labels: Sequence[str] = ("balance", "trend")
+    clarity_buckets: int = 5
+    macro_factor: str = "MA_ratio"
+    cluster_artifacts: Path = Path("model/clusterer_dynamic/cluster_artifacts.json")
+    tvtp_artifacts: Path = Path("model/hmm_tvtp_adaptive/artifacts/model_params.json")
+
+
+@dataclass
+class FusedBatch:
+    """Columnar fused output; ``payload(i)`` renders one decision record."""
+
+    label: np.ndarray
+    label_weight: np.ndarray
+    transition_prob: np.ndarray
+    clarity: np.ndarray
+    abstain: np.ndarray
+    reason: np.ndarray
+    config: FusedConfig
+
+    def __len__(self) -> int:
+        return int(self.label.shape[0])
+
+    def payload(self, index: int) -> Dict[str, Any]:
+        cfg = self.config
+        score = float(self.clarity[index])
+        if math.isfinite(score):
+            bucket = min(int(score * cfg.clarity_buckets), cfg.clarity_buckets - 1)
+            clarity = {"score": score, "bucket": f"scale_{max(bucket, 0)}"}
+        else:
+            # non-finite features; such rows are always flagged as abstain
+            clarity = {"score": None, "bucket": "abstain"}
+        return {
+            "trigger": {
+                "type": "transition",
+                "from": cfg.state_from,
+                "to": cfg.state_to,
+                "prob": float(self.transition_prob[index]),
+                "threshold": float(cfg.transition_gate),
+                "reason": "tvtp_transition_gate",
+            },
+            "directional_classifier": {
+                "label": cfg.cluster_labels[int(self.label[index])],
+                "confidence": float(self.label_weight[index]),
+                "inputs": list(cfg.cluster_columns),
+            },
+            "clarity": clarity,
+            "abstain": {"flag": bool(self.abstain[index]), "rule": "low_confidence"},
+            "reason": REASON_LABELS[int(self.reason[index])],
+            "macro_factor_used": cfg.macro_factor,
+        }
+
+    def payloads(self) -> List[Dict[str, Any]]:
+        return [self.payload(i) for i in range(len(self))]
+
+
+class FusedInference:
+    """Cluster label/weight, transition probability and clarity in one pass.
+
+    Centroids and TVTP weights are packed into a single ``(k + 1, d)`` model matrix
+    over the union of feature columns, so one matrix product yields both the
+    centroid dot products and the TVTP logit, laid out as contiguous per-centroid
+    rows. The nearest centroid minimises ``||c||^2 - 2 x.c``; ``||x||^2`` is added
+    for the winning centroid only. Features and centroids are centred on the
+    centroid mean first (in place on the batch copy), which keeps the expansion
+    accurate for large, uncentred features. Work buffers are reused across calls.
+
+    ``clarity`` is the cluster ``label_weight`` times the TVTP entropy clarity, and
+    ``abstain`` compares that product with ``min_clarity``. ``state_inference.run``
+    compares the entropy clarity alone, so since ``label_weight <= 1`` the fused
+    path abstains on every row the separate path does, and also on rows far from
+    their centroid and rows with non-finite features.
+    """
+
+    def __init__(
+        self,
+        config: FusedConfig,
+        centroids: np.ndarray,
+        coefficients: Mapping[str, float],
+        intercept: float,
+    ) -> None:
+        centroids = np.asarray(centroids, dtype=float)
+        if centroids.ndim != 2 or centroids.shape[1] != len(config.cluster_columns):
+            raise ValueError(
+                "centroids must be (k, len(cluster_columns)); "
+                f"got {centroids.shape} for {len(config.cluster_columns)} columns"
+            )
+        if len(config.cluster_labels) < centroids.shape[0]:
+            raise ValueError("cluster_labels must name every centroid")
+
+        self.config = config
+        self.columns: List[str] = list(
+            dict.fromkeys(list(config.cluster_columns) + list(config.tvtp_columns))
+        )
+        position = {col: i for i, col in enumerate(self.columns)}
+        cluster_idx = [position[col] for col in config.cluster_columns]
+        k = centroids.shape[0]
+
+        # distances are shift-invariant; the TVTP logit gets the shift back below
+        self._center = np.zeros(len(self.columns), dtype=float)
+        self._center[cluster_idx] = centroids.mean(axis=0)
+        centred = centroids - centroids.mean(axis=0)
+
+        model = np.zeros((k + 1, len(self.columns)), dtype=float)
+        model[:k, cluster_idx] = centred
+        for col in config.tvtp_columns:
+            model[k, position[col]] = float(coefficients[col])
+        self._model = model
+        # cluster columns lead self.columns, so they are the first n_cluster columns
+        self._n_cluster = len(cluster_idx)
+        self._centroid_sq = np.einsum("kd,kd->k", centred, centred)
+        self._intercept = float(intercept) + float(model[k] @ self._center)
+        self._k = k
+        self._buffer = np.empty(0, dtype=float)
+
+    @classmethod
+    def load(cls, config: FusedConfig) -> "FusedInference":
+        payload = json.loads(Path(config.cluster_artifacts).read_text())
+        artifacts = _load_artifacts(Path(config.tvtp_artifacts))
+        return cls(
+            config,
+            np.asarray(payload["centroids"], dtype=float),
+            artifacts.coefficients,
+            artifacts.intercept,
+        )
+
+    def _work_buffer(self, rows: int) -> np.ndarray:
+        size = rows * (self._k + 1)
+        if self._buffer.size < size:
+            self._buffer = np.empty(size, dtype=float)
+        return self._buffer[:size].reshape(self._k + 1, rows)
+
+    def infer_batch(self, features: pd.DataFrame | np.ndarray) -> FusedBatch:
+        """Score a batch; arrays must already be ordered like ``self.columns``."""
+
+        if isinstance(features, pd.DataFrame):
+            missing = [col for col in self.columns if col not in features.columns]
+            if missing:
+                raise KeyError(f"Missing required feature columns: {missing}")
+            data = features[self.columns].to_numpy(dtype=float)
+            if not data.flags.writeable:
+                data = data.copy()
+        else:
+            # copied: the batch is centred in place below
+            data = np.array(features, dtype=float, ndmin=2)
+        if data.shape[1] != len(self.columns):
+            raise ValueError(
+                f"expected {len(self.columns)} feature columns, got {data.shape[1]}"
+            )
+
+        k = self._k
+        rows = data.shape[0]
+        data -= self._center
+        work = self._work_buffer(rows)
+        np.matmul(self._model, data.T, out=work)
+
+        # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2; ||x||^2 is constant per row, so
+        # the running minimum over k contiguous rows only needs the other terms.
+        partial = work[:k]
+        partial *= -2.0
+        partial += self._centroid_sq[:, None]
+        label = np.zeros(rows, dtype=np.intp)
+        best = partial[0].copy()
+        for j in range(1, k):
+            closer = partial[j] < best
+            np.copyto(best, partial[j], where=closer)
+            label[closer] = j
+        cluster = data[:, : self._n_cluster]
+        best += np.einsum("ij,ij->i", cluster, cluster)
+        np.maximum(best, 0.0, out=best)
+        np.sqrt(best, out=best)
+        label_weight = np.exp(-best, out=best)
+
+        probs = _sigmoid(work[k] + self._intercept)
+        # derived.clarity: cluster weight scaled by the TVTP entropy clarity.
+        clarity = label_weight * _clarity_from_probs(probs)
+        # negated comparisons so NaN rows abstain
+        abstain = ~(probs >= self.config.transition_gate) | ~(
+            clarity >= self.config.min_clarity
+        )
+        reason = np.where(
+            abstain,
+            REASON_CODES["low_confidence"],
+            REASON_CODES["transition_prob_above_threshold"],
+        ).astype(np.int8)
+        return FusedBatch(
+            label=label,
+            label_weight=label_weight,
+            transition_prob=probs,
+            clarity=clarity,
+            abstain=abstain,
+            reason=reason,
+            config=self.config,
+        )
+
+    def infer_row(self, features: Mapping[str, float]) -> Dict[str, Any]:
+        row = np.array([float(features[col]) for col in self.columns], dtype=float)
+        return self.infer_batch(row).payload(0)
+
+
+__all__ = ["FusedConfig", "FusedBatch", "FusedInference"]
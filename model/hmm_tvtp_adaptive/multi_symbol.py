@@ -0,0 +1,148 @@
+"""Multi-symbol TVTP inference over a stacked weight matrix.
+
+Every symbol's ``model_params.json`` occupies one row of a shared weight matrix, so a
+mixed batch tagged by symbol id is scored with one gather plus a row-wise dot product
+instead of a Python loop per symbol.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .state_inference import _load_artifacts, _sigmoid
+from .train import TrainingArtifacts
+
+
+class MultiSymbolModel:
+    """Stacked TVTP weights for many symbols sharing one feature layout.
+
+    Symbols map to stable slot ids; removing a symbol frees its slot for reuse
+    without renumbering the others.
+    """
+
+    def __init__(self, feature_columns: Sequence[str], capacity: int = 16) -> None:
+        if not feature_columns:
+            raise ValueError("feature_columns must not be empty")
+        self.feature_columns: List[str] = list(feature_columns)
+        capacity = max(1, int(capacity))
+        self._weights = np.zeros((capacity, len(self.feature_columns)), dtype=float)
+        self._intercepts = np.zeros(capacity, dtype=float)
+        self._active = np.zeros(capacity, dtype=bool)
+        self._row_counts = np.zeros(capacity, dtype=np.int64)
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = list(range(capacity - 1, -1, -1))
+
+    @classmethod
+    def from_paths(
+        cls, feature_columns: Sequence[str], paths: Mapping[str, Path]
+    ) -> "MultiSymbolModel":
+        model = cls(feature_columns, capacity=len(paths))
+        for symbol, path in paths.items():
+            model.add_from_path(symbol, Path(path))
+        return model
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._slots)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._slots
+
+    def _grow(self) -> None:
+        old = self._weights.shape[0]
+        new = old * 2
+        self._weights = np.vstack([self._weights, np.zeros_like(self._weights)])
+        self._intercepts = np.concatenate([self._intercepts, np.zeros(old)])
+        self._active = np.concatenate([self._active, np.zeros(old, dtype=bool)])
+        self._row_counts = np.concatenate(
+            [self._row_counts, np.zeros(old, dtype=np.int64)]
+        )
+        self._free.extend(range(new - 1, old - 1, -1))
+
+    def add_symbol(self, symbol: str, artifacts: TrainingArtifacts) -> int:
+        """Register or replace ``symbol``; returns its slot id."""
+
+        missing = [c for c in self.feature_columns if c not in artifacts.coefficients]
+        if missing:
+            raise KeyError(f"Artifacts for {symbol} missing coefficients: {missing}")
+        slot = self._slots.get(symbol)
+        if slot is None:
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+            self._slots[symbol] = slot
+            self._row_counts[slot] = 0
+        self._weights[slot] = [artifacts.coefficients[c] for c in self.feature_columns]
+        self._intercepts[slot] = float(artifacts.intercept)
+        self._active[slot] = True
+        return slot
+
+    def add_from_path(self, symbol: str, path: Path) -> int:
+        return self.add_symbol(symbol, _load_artifacts(Path(path)))
+
+    def remove_symbol(self, symbol: str) -> None:
+        slot = self._slots.pop(symbol)
+        self._weights[slot] = 0.0
+        self._intercepts[slot] = 0.0
+        self._active[slot] = False
+        self._row_counts[slot] = 0
+        self._free.append(slot)
+
+    def symbol_ids(self, symbols: Sequence[str] | np.ndarray | pd.Series) -> np.ndarray:
+        """Vectorised symbol -> slot id lookup; unknown symbols raise ``KeyError``."""
+
+        names = pd.Index(list(self._slots))
+        positions = names.get_indexer(pd.Index(symbols))
+        if (positions < 0).any():
+            unknown = sorted(set(pd.Index(symbols)[positions < 0]))
+            raise KeyError(f"Unknown symbols: {unknown}")
+        slots = np.fromiter(self._slots.values(), dtype=np.int64, count=len(names))
+        return slots[positions]
+
+    def score(self, features: np.ndarray, symbol_ids: np.ndarray) -> np.ndarray:
+        """Transition probabilities for a mixed batch of ``(rows, features)``."""
+
+        data = np.asarray(features, dtype=float)
+        ids = np.asarray(symbol_ids, dtype=np.int64)
+        if data.ndim != 2 or data.shape[1] != len(self.feature_columns):
+            raise ValueError(
+                f"features must be (rows, {len(self.feature_columns)}); got {data.shape}"
+            )
+        if ids.shape != (data.shape[0],):
+            raise ValueError("symbol_ids must hold one id per feature row")
+        if ids.size and (
+            ids.min() < 0
+            or ids.max() >= self._active.shape[0]
+            or not self._active[ids].all()
+        ):
+            raise KeyError("symbol_ids reference unregistered slots")
+
+        logits = np.einsum("nd,nd->n", data, self._weights[ids])
+        logits += self._intercepts[ids]
+        self._row_counts += np.bincount(ids, minlength=self._row_counts.shape[0])
+        return _sigmoid(logits)
+
+    def score_frame(
+        self, frame: pd.DataFrame, symbol_column: str = "symbol"
+    ) -> np.ndarray:
+        ids = self.symbol_ids(frame[symbol_column])
+        return self.score(frame[self.feature_columns].to_numpy(dtype=float), ids)
+
+    def counts(self) -> Dict[str, int]:
+        """Rows scored per symbol since registration or the last reset."""
+
+        return {
+            symbol: int(self._row_counts[slot]) for symbol, slot in self._slots.items()
+        }
+
+    def reset_counts(self) -> None:
+        self._row_counts[:] = 0
+
+
+__all__ = ["MultiSymbolModel"]
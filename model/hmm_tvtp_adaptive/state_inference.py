@@ -5,11 +5,14 @@ import json
 import math
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Mapping, Sequence
+from typing import Mapping, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 
+import perf
+from data_contract.compaction import feature_matrix
+
 from .train import TrainingArtifacts
 
 
@@ -19,6 +22,7 @@ class InferenceConfig:
     transition_gate: float = 0.65
     min_clarity: float = 0.4
     artifacts_path: Path = Path("model/hmm_tvtp_adaptive/artifacts/model_params.json")
+    legacy_output: bool = False
 
 
 @dataclass
@@ -29,6 +33,77 @@ class InferenceOutput:
     reason: str
 
 
+# Lookup table for the int8 ``reason`` codes of the compact output; the index of a
+# label is its code. Append new labels only, never reorder.
+REASON_LABELS: Tuple[str, ...] = ("low_confidence", "transition_prob_above_threshold")
+REASON_CODES: Mapping[str, int] = {
+    label: code for code, label in enumerate(REASON_LABELS)
+}
+
+
+@dataclass
+class CompactInferenceOutput:
+    """Columnar inference output with Arrow-compatible buffers.
+
+    ``abstain_bits`` is a packed bitmask in Arrow's LSB bit order, so all four
+    columns can be handed to Arrow without copying.
+    """
+
+    transition_prob: np.ndarray
+    clarity: np.ndarray
+    abstain_bits: np.ndarray
+    reason: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.transition_prob.shape[0])
+
+    @property
+    def abstain(self) -> np.ndarray:
+        bits = np.unpackbits(self.abstain_bits, count=len(self), bitorder="little")
+        return bits.view(bool)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "transition_prob": self.transition_prob,
+                "clarity": self.clarity,
+                "abstain": self.abstain,
+                "reason": pd.Categorical.from_codes(
+                    self.reason, categories=list(REASON_LABELS)
+                ),
+            }
+        )
+
+    def to_legacy_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "transition_prob": self.transition_prob.astype(float),
+                "clarity": self.clarity.astype(float),
+                "abstain": self.abstain,
+                "reason": np.asarray(REASON_LABELS, dtype=object)[self.reason],
+            }
+        )
+
+    def to_arrow(self):
+        import pyarrow as pa
+
+        length = len(self)
+        abstain = pa.Array.from_buffers(
+            pa.bool_(), length, [None, pa.py_buffer(self.abstain_bits)]
+        )
+        reason = pa.DictionaryArray.from_arrays(
+            pa.array(self.reason, type=pa.int8()), pa.array(REASON_LABELS)
+        )
+        return pa.table(
+            {
+                "transition_prob": pa.array(self.transition_prob),
+                "clarity": pa.array(self.clarity),
+                "abstain": abstain,
+                "reason": reason,
+            }
+        )
+
+
 def _sigmoid(x: np.ndarray) -> np.ndarray:
     return 1.0 / (1.0 + np.exp(-x))
 
@@ -49,6 +124,13 @@ def _clarity_from_prob(prob: float) -> float:
     return 1.0 - entropy / max_entropy
 
 
+def _clarity_from_probs(probs: np.ndarray) -> np.ndarray:
+    entropy = -(
+        probs * np.log(probs + 1e-8) + (1.0 - probs) * np.log(1.0 - probs + 1e-8)
+    )
+    return 1.0 - entropy / math.log(2.0)
+
+
 def infer_row(
     features: Mapping[str, float], config: InferenceConfig, artifacts: TrainingArtifacts
 ) -> InferenceOutput:
@@ -70,8 +152,51 @@ def infer_row(
     )
 
 
+def infer_compact(
+    frame: pd.DataFrame, config: InferenceConfig, artifacts: TrainingArtifacts
+) -> CompactInferenceOutput:
+    with perf.timer("inference.to_numpy"):
+        features = feature_matrix(frame, config.feature_columns)
+    weights = np.array(
+        [artifacts.coefficients[col] for col in config.feature_columns],
+        dtype=features.dtype,
+    )
+    with perf.timer("inference.score"):
+        probs = _sigmoid(features @ weights + artifacts.intercept)
+        clarity = _clarity_from_probs(probs)
+    abstain = (probs < config.transition_gate) | (clarity < config.min_clarity)
+    reason = np.where(
+        abstain,
+        REASON_CODES["low_confidence"],
+        REASON_CODES["transition_prob_above_threshold"],
+    ).astype(np.int8)
+    return CompactInferenceOutput(
+        transition_prob=probs.astype(np.float32),
+        clarity=clarity.astype(np.float32),
+        abstain_bits=np.packbits(abstain, bitorder="little"),
+        reason=reason,
+    )
+
+
+def run_compact(frame: pd.DataFrame, config: InferenceConfig) -> CompactInferenceOutput:
+    with perf.timer("inference.load_artifacts"):
+        artifacts = _load_artifacts(config.artifacts_path)
+    perf.count("inference.rows", len(frame))
+    return infer_compact(frame, config, artifacts)
+
+
+@perf.timed("inference.run")
 def run(frame: pd.DataFrame, config: InferenceConfig) -> pd.DataFrame:
-    artifacts = _load_artifacts(config.artifacts_path)
+    """Score ``frame``; returns the compact frame unless ``legacy_output`` is set."""
+
+    if not config.legacy_output:
+        compact = run_compact(frame, config)
+        with perf.timer("inference.to_frame"):
+            return compact.to_frame()
+
+    with perf.timer("inference.load_artifacts"):
+        artifacts = _load_artifacts(config.artifacts_path)
+    perf.count("inference.rows", len(frame))
     outputs = []
     for _, row in frame.iterrows():
         outputs.append(infer_row(row, config, artifacts))
@@ -89,4 +214,14 @@ def run(frame: pd.DataFrame, config: InferenceConfig) -> pd.DataFrame:
     return result
 
 
-__all__ = ["InferenceConfig", "InferenceOutput", "infer_row", "run"]
+__all__ = [
+    "InferenceConfig",
+    "InferenceOutput",
+    "CompactInferenceOutput",
+    "REASON_LABELS",
+    "REASON_CODES",
+    "infer_row",
+    "infer_compact",
+    "run",
+    "run_compact",
+]
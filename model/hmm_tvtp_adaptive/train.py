@@ -10,6 +10,9 @@ from typing import Dict, Iterable, Sequence, Tuple
 import numpy as np
 import pandas as pd
 
+import perf
+from data_contract.compaction import feature_matrix
+from features.core import backend as frame_backend
 from model.clusterer_dynamic.fit import ClustererConfig
 from model.clusterer_dynamic.fit import load_default_config as load_cluster_config
 from model.clusterer_dynamic.fit import run as run_clusterer
@@ -29,6 +32,7 @@ class TrainingConfig:
     artifacts_dir: Path = Path("model/hmm_tvtp_adaptive/artifacts")
     transition_output: Path = Path("output/tvtp/transition_prob.parquet")
     calibration_output: Path = Path("output/tvtp/calibration_report.json")
+    backend: str | None = None
 
 
 @dataclass
@@ -38,6 +42,11 @@ class TrainingArtifacts:
 
 
 def _prepare_dataset(frame: pd.DataFrame, config: TrainingConfig) -> pd.DataFrame:
+    if frame_backend.resolve_backend(config.backend) == "polars":
+        return frame_backend.prepare_transitions(
+            frame, config.label_column, config.feature_columns
+        )
+
     missing = [
         col
         for col in list(config.feature_columns) + [config.label_column]
@@ -54,6 +63,12 @@ def _prepare_dataset(frame: pd.DataFrame, config: TrainingConfig) -> pd.DataFram
 
 def _encode_states(values: Iterable[str], state_a: str, state_b: str) -> np.ndarray:
     mapping = {state_a: 0, state_b: 1}
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        # one lookup per category; code -1 (missing) reads the trailing 0
+        lookup = np.array(
+            [mapping.get(c, 0) for c in values.cat.categories] + [0], dtype=float
+        )
+        return lookup[values.cat.codes.to_numpy()]
     return np.array([mapping.get(v, 0) for v in values], dtype=float)
 
 
@@ -64,6 +79,8 @@ def _sigmoid(x: np.ndarray) -> np.ndarray:
 def _fit_logistic(
     features: np.ndarray, targets: np.ndarray, config: TrainingConfig
 ) -> Tuple[np.ndarray, float]:
+    # compact float32 inputs still train in float64
+    features = features.astype(np.float64, copy=False)
     weights = np.zeros(features.shape[1], dtype=float)
     bias = 0.0
     for _ in range(config.max_iter):
@@ -119,6 +136,7 @@ def _save_artifacts(artifacts: TrainingArtifacts, config: TrainingConfig) -> Non
     )
 
 
+@perf.timed("writer.tvtp_outputs")
 def _write_outputs(
     frame: pd.DataFrame,
     probs: np.ndarray,
@@ -147,22 +165,29 @@ def _write_outputs(
     config.calibration_output.write_text(json.dumps(report, indent=2, sort_keys=True))
 
 
+@perf.timed("tvtp.train")
 def train(frame: pd.DataFrame, config: TrainingConfig) -> TrainingArtifacts:
-    dataset = _prepare_dataset(frame, config)
-    features = dataset[list(config.feature_columns)].to_numpy(dtype=float)
-    states = _encode_states(
-        dataset[config.label_column], config.state_a, config.state_b
-    )
-    next_states = _encode_states(dataset["next_state"], config.state_a, config.state_b)
+    with perf.timer("tvtp.prepare_dataset"):
+        dataset = _prepare_dataset(frame, config)
+        features = feature_matrix(dataset, config.feature_columns)
+        states = _encode_states(
+            dataset[config.label_column], config.state_a, config.state_b
+        )
+        next_states = _encode_states(
+            dataset["next_state"], config.state_a, config.state_b
+        )
+    perf.count("tvtp.rows", features.shape[0])
 
     transition_mask = states == 0  # focus on A->B switches
     features_subset = features[transition_mask]
     targets_subset = next_states[transition_mask]
 
-    weights, bias = _fit_logistic(features_subset, targets_subset, config)
-    probs = _predict_transition(features_subset, weights, bias)
-    ece = _expected_calibration_error(probs, targets_subset)
-    brier = _brier_score(probs, targets_subset)
+    with perf.timer("tvtp.fit_logistic"):
+        weights, bias = _fit_logistic(features_subset, targets_subset, config)
+    with perf.timer("tvtp.calibration"):
+        probs = _predict_transition(features_subset, weights, bias)
+        ece = _expected_calibration_error(probs, targets_subset)
+        brier = _brier_score(probs, targets_subset)
 
     _write_outputs(
         dataset.loc[transition_mask, list(config.feature_columns)],
@@ -176,7 +201,8 @@ def train(frame: pd.DataFrame, config: TrainingConfig) -> TrainingArtifacts:
         coefficients={col: float(w) for col, w in zip(config.feature_columns, weights)},
         intercept=float(bias),
     )
-    _save_artifacts(artifacts, config)
+    with perf.timer("tvtp.save_artifacts"):
+        _save_artifacts(artifacts, config)
     LOGGER.info("TVTP training complete: ece=%.4f brier=%.4f", ece, brier)
     return artifacts
 
@@ -236,6 +262,9 @@ def run_training_pipeline(
 
 def main() -> None:
     run_training_pipeline()
+    if perf.is_enabled():
+        json_path, prom_path = perf.export()
+        LOGGER.info("perf metrics written to %s and %s", json_path, prom_path)
 
 
 __all__ = [
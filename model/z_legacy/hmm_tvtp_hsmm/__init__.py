@@ -1,5 +1,15 @@
 """Two-state TVTP-HSMM training and inference utilities."""
+from .hamilton import FilterParams, FilterResult, HamiltonFilter
 from .state_inference import InferenceError, InferenceOutput, predict_proba
 from .train_tvtp import TrainConfig, train
 
-__all__ = ["TrainConfig", "train", "InferenceOutput", "InferenceError", "predict_proba"]
+__all__ = [
+    "TrainConfig",
+    "train",
+    "InferenceOutput",
+    "InferenceError",
+    "predict_proba",
+    "FilterParams",
+    "FilterResult",
+    "HamiltonFilter",
+]
@@ -0,0 +1,250 @@
+"""Log-space Hamilton (forward) filter for the two-state TVTP-HMM.
+WHY: Replace the deterministic ``score`` stub with filtered regime probabilities whose
+transition matrix is driven by the TVTP logit.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+
+from .state_inference import InferenceError, InferenceOutput
+
+STATES = ("balance", "trend")
+_LOG_2PI = math.log(2.0 * math.pi)
+
+
+@dataclass
+class FilterParams:
+    """Gaussian emissions per state plus TVTP switch logits.
+
+    ``P(leave state i | z) = sigmoid(switch_intercept[i] + switch_coef[i] . z)`` where
+    ``z`` holds the drivers observed on the previous bar.
+    """
+
+    emission_mean: Sequence[float] = (0.0, 0.0)
+    emission_std: Sequence[float] = (1.0, 1.0)
+    switch_intercept: Sequence[float] = (-2.0, -2.0)
+    switch_coef: Sequence[Sequence[float]] = ((0.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+    initial: Sequence[float] = (0.5, 0.5)
+    drivers: Sequence[str] = field(default_factory=lambda: ["MFI", "CVD", "MA_ratio"])
+
+    @classmethod
+    def from_mapping(cls, payload: Mapping[str, Any]) -> "FilterParams":
+        known = {k: payload[k] for k in cls.__dataclass_fields__ if k in payload}
+        return cls(**known)
+
+
+@dataclass
+class FilterResult:
+    """Whole-series filter output; row ``t`` matches ``HamiltonFilter.update``."""
+
+    posterior: np.ndarray
+    transition_prob: np.ndarray
+
+    @property
+    def state(self) -> np.ndarray:
+        return np.argmax(self.posterior, axis=1)
+
+    @property
+    def confidence(self) -> np.ndarray:
+        return 2.0 * self.posterior.max(axis=1) - 1.0
+
+    def output(self, index: int) -> InferenceOutput:
+        return InferenceOutput(
+            state=STATES[int(self.state[index])],
+            confidence=float(self.confidence[index]),
+            transition_prob=float(self.transition_prob[index]),
+        )
+
+
+def _logaddexp(a: float, b: float) -> float:
+    if a < b:
+        a, b = b, a
+    if b == -math.inf:
+        return a
+    return a + math.log1p(math.exp(b - a))
+
+
+def _log_sigmoid(x: float) -> float:
+    if x >= 0.0:
+        return -math.log1p(math.exp(-x))
+    return x - math.log1p(math.exp(x))
+
+
+def _log_sigmoid_array(x: np.ndarray) -> np.ndarray:
+    return -np.logaddexp(0.0, -x)
+
+
+def _log_matmul(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Batched 2x2 product in the log semiring, rescaled to keep entries bounded."""
+
+    out = np.empty(np.broadcast_shapes(a.shape, b.shape))
+    for i in range(2):
+        for j in range(2):
+            out[..., i, j] = np.logaddexp(
+                a[..., i, 0] + b[..., 0, j], a[..., i, 1] + b[..., 1, j]
+            )
+    out -= out.max(axis=(-2, -1), keepdims=True)
+    return out
+
+
+class HamiltonFilter:
+    """Two-state forward filter with an O(1) ``update`` and a vectorised backfill."""
+
+    def __init__(self, params: FilterParams | None = None) -> None:
+        self.params = params or FilterParams()
+        p = self.params
+        self._mean = [float(v) for v in p.emission_mean]
+        self._std = [float(v) for v in p.emission_std]
+        self._intercept = [float(v) for v in p.switch_intercept]
+        self._coef = [[float(v) for v in row] for row in p.switch_coef]
+        if len(self._mean) != 2 or len(self._std) != 2 or len(self._intercept) != 2:
+            raise InferenceError("FilterParams must describe exactly two states")
+        if min(self._std) <= 0.0:
+            raise InferenceError("emission_std must be positive")
+        if any(len(row) != len(p.drivers) for row in self._coef):
+            raise InferenceError("switch_coef rows must match the driver count")
+        total = float(sum(p.initial))
+        if total <= 0.0:
+            raise InferenceError("initial distribution must have positive mass")
+        self._log_initial = tuple(
+            math.log(v / total) if v > 0 else -math.inf for v in p.initial
+        )
+        self.reset()
+
+    def reset(self) -> None:
+        self._log_prior = self._log_initial
+
+    def _driver_vector(self, drivers: Mapping[str, float] | Sequence[float]) -> list:
+        if isinstance(drivers, Mapping):
+            try:
+                return [float(drivers[name]) for name in self.params.drivers]
+            except KeyError as exc:
+                raise InferenceError(f"missing TVTP driver {exc}") from exc
+        values = [float(v) for v in drivers]
+        if len(values) != len(self.params.drivers):
+            raise InferenceError(
+                f"expected {len(self.params.drivers)} drivers, got {len(values)}"
+            )
+        return values
+
+    def _log_emission(self, obs: float, state: int) -> float:
+        z = (obs - self._mean[state]) / self._std[state]
+        return -0.5 * (z * z + _LOG_2PI) - math.log(self._std[state])
+
+    def update(
+        self, obs: float, drivers: Mapping[str, float] | Sequence[float]
+    ) -> InferenceOutput:
+        """Absorb one bar and return the filtered regime for it."""
+
+        z = self._driver_vector(drivers)
+        a0 = self._log_prior[0] + self._log_emission(float(obs), 0)
+        a1 = self._log_prior[1] + self._log_emission(float(obs), 1)
+        norm = _logaddexp(a0, a1)
+        a0 -= norm
+        a1 -= norm
+
+        eta0 = self._intercept[0] + sum(c * v for c, v in zip(self._coef[0], z))
+        eta1 = self._intercept[1] + sum(c * v for c, v in zip(self._coef[1], z))
+        leave0, stay0 = _log_sigmoid(eta0), _log_sigmoid(-eta0)
+        leave1, stay1 = _log_sigmoid(eta1), _log_sigmoid(-eta1)
+        self._log_prior = (
+            _logaddexp(a0 + stay0, a1 + leave1),
+            _logaddexp(a0 + leave0, a1 + stay1),
+        )
+
+        p0, p1 = math.exp(a0), math.exp(a1)
+        state = 0 if p0 >= p1 else 1
+        return InferenceOutput(
+            state=STATES[state],
+            confidence=2.0 * max(p0, p1) - 1.0,
+            transition_prob=p0 * math.exp(leave0) + p1 * math.exp(leave1),
+        )
+
+    def filter_series(
+        self, obs: np.ndarray, drivers: np.ndarray, block_size: int | None = None
+    ) -> FilterResult:
+        """Filter a whole series from the current prior.
+
+        The forward recursion is an associative product of per-bar 2x2 log-space
+        operators, evaluated as a blocked scan: a Python loop of ``block_size`` steps
+        vectorised across blocks, then a short loop over block totals. The filter
+        state afterwards matches having called :meth:`update` on every bar.
+        """
+
+        obs = np.asarray(obs, dtype=float)
+        drivers = np.asarray(drivers, dtype=float)
+        n = obs.shape[0]
+        if drivers.ndim == 1:
+            drivers = drivers[:, None]
+        if drivers.shape != (n, len(self.params.drivers)):
+            raise InferenceError(
+                f"drivers must be ({n}, {len(self.params.drivers)}); got {drivers.shape}"
+            )
+        if n == 0:
+            return FilterResult(np.empty((0, 2)), np.empty(0))
+
+        mean = np.asarray(self._mean)
+        std = np.asarray(self._std)
+        zscore = (obs[:, None] - mean) / std
+        log_em = -0.5 * (zscore**2 + _LOG_2PI) - np.log(std)
+
+        eta = drivers @ np.asarray(self._coef).T + np.asarray(self._intercept)
+        log_leave = _log_sigmoid_array(eta)
+        log_stay = _log_sigmoid_array(-eta)
+        # trans[t] moves bar t -> t + 1 and depends on the drivers of bar t.
+        trans = np.empty((n, 2, 2))
+        trans[:, 0, 0] = log_stay[:, 0]
+        trans[:, 0, 1] = log_leave[:, 0]
+        trans[:, 1, 0] = log_leave[:, 1]
+        trans[:, 1, 1] = log_stay[:, 1]
+
+        # ops[t - 1] maps the log posterior of bar t - 1 to the unnormalised bar t.
+        ops = trans[:-1] + log_em[1:, None, :]
+        alpha0 = np.asarray(self._log_prior) + log_em[0]
+        alpha0 -= np.logaddexp(alpha0[0], alpha0[1])
+
+        steps = ops.shape[0]
+        log_alpha = np.empty((n, 2))
+        log_alpha[0] = alpha0
+        if steps:
+            block = block_size or max(1, int(math.ceil(math.sqrt(steps))))
+            n_blocks = -(-steps // block)
+            padded = np.full((n_blocks * block, 2, 2), -np.inf)
+            padded[:, 0, 0] = 0.0
+            padded[:, 1, 1] = 0.0
+            padded[:steps] = ops
+            prefix = padded.reshape(n_blocks, block, 2, 2).copy()
+            for j in range(1, block):
+                prefix[:, j] = _log_matmul(prefix[:, j - 1], prefix[:, j])
+
+            starts = np.empty((n_blocks, 2))
+            carry = alpha0
+            for b in range(n_blocks):
+                starts[b] = carry
+                total = prefix[b, -1]
+                carry = np.logaddexp(carry[0] + total[0], carry[1] + total[1])
+                carry = carry - np.logaddexp(carry[0], carry[1])
+
+            inner = np.logaddexp(
+                starts[:, None, 0, None] + prefix[:, :, 0, :],
+                starts[:, None, 1, None] + prefix[:, :, 1, :],
+            ).reshape(-1, 2)[:steps]
+            inner -= np.logaddexp(inner[:, 0], inner[:, 1])[:, None]
+            log_alpha[1:] = inner
+
+        posterior = np.exp(log_alpha)
+        transition_prob = (posterior * np.exp(log_leave)).sum(axis=1)
+
+        last = log_alpha[-1]
+        self._log_prior = (
+            float(np.logaddexp(last[0] + trans[-1, 0, 0], last[1] + trans[-1, 1, 0])),
+            float(np.logaddexp(last[0] + trans[-1, 0, 1], last[1] + trans[-1, 1, 1])),
+        )
+        return FilterResult(posterior=posterior, transition_prob=transition_prob)
+
+
+__all__ = ["STATES", "FilterParams", "FilterResult", "HamiltonFilter"]
@@ -0,0 +1,32 @@
+"""Lightweight instrumentation for training and inference hot paths."""
+from __future__ import annotations
+
+from .instrument import (
+    Histogram,
+    count,
+    disable,
+    enable,
+    export,
+    is_enabled,
+    observe,
+    reset,
+    snapshot,
+    timed,
+    timer,
+    to_prometheus,
+)
+
+__all__ = [
+    "Histogram",
+    "count",
+    "disable",
+    "enable",
+    "export",
+    "is_enabled",
+    "observe",
+    "reset",
+    "snapshot",
+    "timed",
+    "timer",
+    "to_prometheus",
+]
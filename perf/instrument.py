@@ -0,0 +1,222 @@
+"""Hot-path timers, counters and histograms with JSON/Prometheus export.
+
+Instrumentation is disabled unless ``ORDERFLOW_PERF`` is truthy or :func:`enable` is
+called. While disabled, :func:`timer` hands back a shared no-op context manager and
+:func:`timed` wrappers fall straight through to the wrapped function, so the cost is a
+single flag check.
+"""
+from __future__ import annotations
+
+import bisect
+import functools
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+    30.0,
+)
+DEFAULT_OUTPUT_DIR = Path("output/perf")
+PROMETHEUS_PREFIX = "orderflow_"
+
+
+@dataclass
+class Histogram:
+    buckets: Sequence[float] = DEFAULT_BUCKETS
+    counts: List[int] = field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+    minimum: float = float("inf")
+    maximum: float = float("-inf")
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "min": self.minimum if self.count else 0.0,
+            "max": self.maximum if self.count else 0.0,
+            "buckets": {
+                **{str(b): c for b, c in zip(self.buckets, self.counts)},
+                "+Inf": self.counts[-1],
+            },
+        }
+
+
+class _State:
+    def __init__(self) -> None:
+        self.enabled = os.getenv("ORDERFLOW_PERF", "").lower() in {"1", "true", "yes"}
+        self.lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+
+_STATE = _State()
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        observe(self.name, time.perf_counter() - self.start)
+
+
+def enable(flag: bool = True) -> None:
+    _STATE.enabled = bool(flag)
+
+
+def disable() -> None:
+    _STATE.enabled = False
+
+
+def is_enabled() -> bool:
+    return _STATE.enabled
+
+
+def reset() -> None:
+    with _STATE.lock:
+        _STATE.counters.clear()
+        _STATE.histograms.clear()
+
+
+def count(name: str, value: float = 1) -> None:
+    if not _STATE.enabled:
+        return
+    with _STATE.lock:
+        _STATE.counters[name] = _STATE.counters.get(name, 0) + value
+
+
+def observe(name: str, value: float) -> None:
+    """Record ``value`` (seconds for timers) into the histogram ``name``."""
+
+    if not _STATE.enabled:
+        return
+    with _STATE.lock:
+        hist = _STATE.histograms.get(name)
+        if hist is None:
+            hist = _STATE.histograms[name] = Histogram()
+        hist.observe(float(value))
+
+
+def timer(name: str) -> Any:
+    """Context manager timing its block into the histogram ``name``."""
+
+    if not _STATE.enabled:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def timed(name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator variant of :func:`timer`; defaults to ``module.qualname``."""
+
+    def decorator(fn: F) -> F:
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _STATE.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(label, time.perf_counter() - start)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def snapshot() -> Dict[str, Any]:
+    with _STATE.lock:
+        return {
+            "enabled": _STATE.enabled,
+            "counters": dict(_STATE.counters),
+            "histograms": {k: h.to_dict() for k, h in _STATE.histograms.items()},
+        }
+
+
+def _metric_name(name: str) -> str:
+    return PROMETHEUS_PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def to_prometheus(snap: Optional[Dict[str, Any]] = None) -> str:
+    snap = snap or snapshot()
+    lines: List[str] = []
+    for name, value in sorted(snap["counters"].items()):
+        metric = _metric_name(name) + "_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    for name, hist in sorted(snap["histograms"].items()):
+        metric = _metric_name(name) + "_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, bucket_count in hist["buckets"].items():
+            cumulative += bucket_count
+            lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f"{metric}_sum {hist['sum']}")
+        lines.append(f"{metric}_count {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def export(out_dir: Path = DEFAULT_OUTPUT_DIR) -> Tuple[Path, Path]:
+    """Write ``metrics.json`` and Prometheus text ``metrics.prom`` under ``out_dir``."""
+
+    snap = snapshot()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    json_path = out_dir / "metrics.json"
+    prom_path = out_dir / "metrics.prom"
+    json_path.write_text(json.dumps(snap, indent=2, sort_keys=True), encoding="utf-8")
+    prom_path.write_text(to_prometheus(snap), encoding="utf-8")
+    return json_path, prom_path
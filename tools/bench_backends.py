@@ -0,0 +1,98 @@
+"""Benchmark the pandas and polars backends of macro_factor, TVTP dataset prep and
+clusterer windowing.
+
+Each operation runs from an in-memory pandas frame and from a parquet file (where
+polars can scan lazily) and reports the best wall time over ``--repeats`` runs.
+Outputs are checked for equality before timing.
+"""
+# ruff: noqa: E402  # allow sys.path mutation before importing project modules
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from features.core import backend
+from features.core.macro_factor import MacroFactorConfig
+from features.core.macro_factor import build as build_macro
+from model.clusterer_dynamic.fit import _load_window
+from model.hmm_tvtp_adaptive.train import TrainingConfig, _prepare_dataset
+
+FEATURES = ["macro_regime", "volatility_slope", "cvd_rolling", "bar_vpo_imbalance"]
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    frame = pd.DataFrame(rng.normal(size=(rows, len(FEATURES))), columns=FEATURES)
+    frame["close"] = 60_000 * np.exp(np.cumsum(rng.normal(0, 1e-3, rows)))
+    frame["state"] = rng.choice(["A", "B"], rows)
+    frame.loc[frame.index[::97], "cvd_rolling"] = np.nan
+    return frame
+
+
+def _best(fn: Callable[[], pd.DataFrame], repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _operations(source, name: str):
+    def macro(engine):
+        return build_macro(source, MacroFactorConfig(backend=engine))
+
+    def prepare(engine):
+        frame = backend.to_pandas(source) if engine == "pandas" else source
+        config = TrainingConfig(feature_columns=FEATURES, backend=engine)
+        return _prepare_dataset(frame, config)
+
+    def window(engine):
+        frame = backend.to_pandas(source) if engine == "pandas" else source
+        return _load_window(frame, FEATURES, 240, engine)
+
+    return [(f"macro_factor[{name}]", macro), (f"prepare_dataset[{name}]", prepare)] + [
+        (f"load_window[{name}]", window)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 2_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if not backend.polars_available():
+        print("[bench] polars is not installed (pip install '.[analytics]')")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'operation':<28} {'rows':>10} {'pandas_s':>10} {'polars_s':>10}")
+        for rows in args.rows:
+            frame = _frame(rows)
+            path = Path(tmp) / f"bench_{rows}.parquet"
+            frame.to_parquet(path, index=False)
+            for source, name in ((frame, "frame"), (path, "parquet")):
+                for label, op in _operations(source, name):
+                    expected, actual = op("pandas"), op("polars")
+                    pd.testing.assert_frame_equal(
+                        expected, actual, check_exact=False, rtol=1e-12
+                    )
+                    pandas_s = _best(lambda: op("pandas"), args.repeats)
+                    polars_s = _best(lambda: op("polars"), args.repeats)
+                    print(f"{label:<28} {rows:>10} {pandas_s:>10.4f} {polars_s:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Benchmark fused cluster+TVTP inference against the two separate stages.
+
+Features and centroids sit around ``--offset`` so the fused distance expansion is
+exercised on uncentred inputs. Labels, weights, probabilities and clarity of both
+paths are checked for agreement before any timing is reported.
+"""
+# ruff: noqa: E402  # allow sys.path mutation before importing project modules
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from model.clusterer_dynamic.fit import _assign_labels
+from model.hmm_tvtp_adaptive.fused_inference import (
+    FusedBatch,
+    FusedConfig,
+    FusedInference,
+)
+from model.hmm_tvtp_adaptive.state_inference import InferenceConfig
+from model.hmm_tvtp_adaptive.state_inference import run as run_tvtp
+
+CLUSTER_COLUMNS = [
+    "bar_vpo_imbalance",
+    "bar_vpo_absorption",
+    "cvd_rolling",
+    "volprofile_skew",
+]
+TVTP_COLUMNS = ["macro_regime", "volatility_slope"]
+
+
+def _write_artifacts(
+    root: Path, rng: np.random.Generator, offset: float
+) -> tuple[Path, Path]:
+    centroids = offset + rng.normal(size=(2, len(CLUSTER_COLUMNS)))
+    cluster_path = root / "cluster_artifacts.json"
+    cluster_path.write_text(json.dumps({"centroids": centroids.tolist()}))
+    tvtp_path = root / "model_params.json"
+    tvtp_path.write_text(
+        json.dumps(
+            {
+                "coefficients": {col: float(rng.normal()) for col in TVTP_COLUMNS},
+                "intercept": 0.1,
+            }
+        )
+    )
+    return cluster_path, tvtp_path
+
+
+def _separate(frame: pd.DataFrame, cluster_path: Path, tvtp_path: Path) -> pd.DataFrame:
+    centroids = np.asarray(json.loads(cluster_path.read_text())["centroids"])
+    labels, weights = _assign_labels(
+        frame[CLUSTER_COLUMNS].to_numpy(dtype=float), centroids
+    )
+    tvtp = run_tvtp(
+        frame, InferenceConfig(feature_columns=TVTP_COLUMNS, artifacts_path=tvtp_path)
+    )
+    joined = tvtp.assign(label=labels, label_weight=weights)
+    joined["clarity"] = joined["clarity"] * joined["label_weight"]
+    return joined
+
+
+def _check_parity(fused: FusedBatch, separate: pd.DataFrame) -> None:
+    """Fail loudly if the fused path disagrees with the separate stages."""
+
+    # state_inference.run emits float32 probabilities and clarity
+    checks = {
+        "label": np.array_equal(fused.label, separate["label"].to_numpy()),
+        "label_weight": np.allclose(
+            fused.label_weight, separate["label_weight"].to_numpy()
+        ),
+        "transition_prob": np.allclose(
+            fused.transition_prob, separate["transition_prob"].to_numpy()
+        ),
+        "clarity": np.allclose(fused.clarity, separate["clarity"].to_numpy()),
+    }
+    failed = [name for name, ok in checks.items() if not ok]
+    if failed:
+        raise AssertionError(f"fused and separate paths disagree on {failed}")
+
+
+def _best_of(repeats: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1, 1_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--offset", type=float, default=1e6)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        cluster_path, tvtp_path = _write_artifacts(Path(tmp), rng, args.offset)
+        fused = FusedInference.load(
+            FusedConfig(
+                cluster_columns=CLUSTER_COLUMNS,
+                tvtp_columns=TVTP_COLUMNS,
+                cluster_artifacts=cluster_path,
+                tvtp_artifacts=tvtp_path,
+            )
+        )
+        print(f"{'rows':>10} {'separate_s':>12} {'fused_s':>12} {'speedup':>8}")
+        for rows in args.rows:
+            columns = CLUSTER_COLUMNS + TVTP_COLUMNS
+            frame = pd.DataFrame(rng.normal(size=(rows, len(columns))), columns=columns)
+            frame[CLUSTER_COLUMNS] += args.offset
+            _check_parity(
+                fused.infer_batch(frame), _separate(frame, cluster_path, tvtp_path)
+            )
+            separate = _best_of(
+                args.repeats, lambda: _separate(frame, cluster_path, tvtp_path)
+            )
+            fused_s = _best_of(args.repeats, lambda: fused.infer_batch(frame))
+            print(
+                f"{rows:>10} {separate:>12.6f} {fused_s:>12.6f} "
+                f"{separate / fused_s:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark bars/sec of the two-state Hamilton filter (streaming vs. backfill)."""
+# ruff: noqa: E402  # allow sys.path mutation before importing project modules
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from model.z_legacy.hmm_tvtp_hsmm.hamilton import FilterParams, HamiltonFilter
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bars", type=int, nargs="+", default=[10_000, 1_000_000])
+    args = parser.parse_args()
+
+    params = FilterParams(
+        emission_mean=(-0.5, 0.8),
+        emission_std=(0.7, 1.3),
+        switch_intercept=(-2.0, -1.5),
+        switch_coef=((0.5, -0.3, 0.2), (-0.4, 0.1, 0.3)),
+    )
+    rng = np.random.default_rng(7)
+    print(
+        f"{'bars':>10} {'stream_bars_s':>14} {'series_bars_s':>14} {'max_abs_diff':>13}"
+    )
+    for bars in args.bars:
+        obs = rng.normal(size=bars)
+        drivers = rng.normal(size=(bars, 3))
+        obs_list = obs.tolist()
+        driver_rows = drivers.tolist()
+
+        stream = HamiltonFilter(params)
+        start = time.perf_counter()
+        confidence = [
+            stream.update(o, d).confidence for o, d in zip(obs_list, driver_rows)
+        ]
+        stream_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = HamiltonFilter(params).filter_series(obs, drivers)
+        series_s = time.perf_counter() - start
+
+        diff = float(np.abs(np.asarray(confidence) - result.confidence).max())
+        print(
+            f"{bars:>10} {bars / stream_s:>14,.0f} {bars / series_s:>14,.0f} {diff:>13.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark the memory-mapped snapshot reader against plain pandas reads.
+
+Each measurement runs in a fresh subprocess so peak RSS (VmHWM, Linux only) is
+per-strategy. "cold" evicts the file from the page cache with
+``posix_fadvise(DONTNEED)`` first; "warm" repeats the read with the file cached.
+"""
+# ruff: noqa: E402  # allow sys.path mutation before importing project modules
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+STRATEGIES = ("pandas_full", "pandas_columns", "snapshot_columns", "snapshot_range")
+
+_WORKER = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+import pandas as pd
+from data_contract.loader import read_snapshot, table_to_numpy
+path, strategy, columns, start, end = {args!r}
+begin = time.perf_counter()
+if strategy == "pandas_full":
+    frame = pd.read_parquet(path)
+    rows = len(frame)
+elif strategy == "pandas_columns":
+    frame = pd.read_parquet(path, columns=columns)
+    frame = frame[(frame["open_time_ms"] >= start) & (frame["open_time_ms"] < end)]
+    rows = len(frame)
+else:
+    if strategy == "snapshot_columns":
+        table = read_snapshot(path, columns)
+    else:
+        table = read_snapshot(path, columns, start=start, end=end)
+    arrays = table_to_numpy(table)
+    rows = table.num_rows
+elapsed = time.perf_counter() - begin
+# VmHWM belongs to this exec'd image; ru_maxrss would include the parent's peak.
+with open("/proc/self/status") as status:
+    hwm = next(line for line in status if line.startswith("VmHWM:"))
+rss_mb = int(hwm.split()[1]) / 1024
+print(json.dumps({{"seconds": elapsed, "rss_mb": rss_mb, "rows": rows}}))
+"""
+
+
+def _write_snapshot(path: Path, rows: int, features: int, row_group: int) -> None:
+    rng = np.random.default_rng(7)
+    start_ms = 1_729_728_000_000
+    data: dict[str, np.ndarray] = {
+        "open_time_ms": start_ms + 60_000 * np.arange(rows, dtype=np.int64)
+    }
+    for i in range(features):
+        data[f"f{i:02d}"] = rng.standard_normal(rows)
+    pq.write_table(pa.table(data), path, row_group_size=row_group)
+
+
+def _evict(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def _run(path: Path, strategy: str, columns, start: int, end: int) -> dict:
+    code = _WORKER.format(
+        root=str(PROJECT_ROOT), args=(str(path), strategy, columns, start, end)
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--features", type=int, default=40)
+    parser.add_argument("--columns", type=int, default=6)
+    parser.add_argument("--row-group", type=int, default=65_536)
+    parser.add_argument("--range-fraction", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "X_train.parquet"
+        _write_snapshot(path, args.rows, args.features, args.row_group)
+        columns = ["open_time_ms"] + [f"f{i:02d}" for i in range(args.columns - 1)]
+        first = 1_729_728_000_000
+        start = first + int(60_000 * args.rows * 0.5)
+        end = start + int(60_000 * args.rows * args.range_fraction)
+        size_mb = path.stat().st_size / 2**20
+        print(
+            f"file={size_mb:.1f} MiB rows={args.rows} features={args.features} "
+            f"projected={len(columns)} range={args.range_fraction:.0%}"
+        )
+        print(
+            f"{'strategy':<18} {'cold_s':>8} {'warm_s':>8} {'rss_mb':>8} {'rows':>10}"
+        )
+        for strategy in STRATEGIES:
+            _evict(path)
+            cold = _run(path, strategy, columns, start, end)
+            warm = _run(path, strategy, columns, start, end)
+            print(
+                f"{strategy:<18} {cold['seconds']:>8.3f} {warm['seconds']:>8.3f} "
+                f"{warm['rss_mb']:>8.1f} {warm['rows']:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
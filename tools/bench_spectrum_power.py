@@ -0,0 +1,82 @@
+"""Benchmark batched/rolling clarity spectrum power against the scalar function."""
+# ruff: noqa: E402  # allow sys.path mutation before importing project modules
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from validation.core.compute_clarity_spectrum_power import (
+    compute_clarity_spectrum_power,
+    compute_clarity_spectrum_power_batch,
+    rolling_clarity_spectrum_power,
+)
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--series", type=int, default=500)
+    parser.add_argument("--length", type=int, default=2_880)
+    parser.add_argument("--window", type=int, default=1_024)
+    parser.add_argument("--nperseg", type=int, default=128)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    clarity = 0.7 + 0.05 * rng.standard_normal((args.series, args.length))
+
+    looped, loop_s = _timed(
+        lambda: [compute_clarity_spectrum_power(row) for row in clarity]
+    )
+    batched, batch_s = _timed(lambda: compute_clarity_spectrum_power_batch(clarity))
+    assert np.allclose(looped, batched)
+    print(
+        f"batch   series={args.series} length={args.length}: "
+        f"looped={loop_s:.4f}s batched={batch_s:.4f}s speedup={loop_s / batch_s:.1f}x"
+    )
+
+    series = clarity[0]
+    (ends, rolling), roll_s = _timed(
+        lambda: rolling_clarity_spectrum_power(
+            series, window=args.window, nperseg=args.nperseg
+        )
+    )
+    scalar, scalar_s = _timed(
+        lambda: [
+            compute_clarity_spectrum_power(
+                series[end - args.window : end], nperseg=args.nperseg
+            )
+            for end in ends
+        ]
+    )
+    assert np.allclose(scalar, rolling)
+    print(
+        f"rolling windows={len(ends)} window={args.window}: "
+        f"looped={scalar_s:.4f}s rolling={roll_s:.4f}s speedup={scalar_s / roll_s:.1f}x"
+    )
+
+    (_, rolling_all), roll_all_s = _timed(
+        lambda: rolling_clarity_spectrum_power(
+            clarity, window=args.window, nperseg=args.nperseg
+        )
+    )
+    print(
+        f"rolling all series: {rolling_all.size} windows in {roll_all_s:.4f}s "
+        f"({rolling_all.size / roll_all_s:,.0f} windows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
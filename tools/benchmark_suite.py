@@ -0,0 +1,270 @@
+"""Benchmark validation metrics and model hot paths against a checked-in baseline.
+
+Every benchmark runs on synthetic inputs at each requested size (capped per
+benchmark so Python-loop paths stay tractable) and records the best wall time over
+``--repeats`` runs plus the peak traced allocation of one extra run. Results are
+compared with ``tools/benchmark_baseline.json``; the script exits non-zero when a
+benchmark is slower or allocates more than the baseline by more than the given
+percentage. Everything runs offline; ``--update-baseline`` rewrites the baseline.
+"""
+# ruff: noqa: E402  # allow sys.path mutation before importing project modules
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from model.clusterer_dynamic.fit import _assign_labels, _online_update
+from model.hmm_tvtp_adaptive.state_inference import InferenceConfig
+from model.hmm_tvtp_adaptive.state_inference import run as run_inference
+from model.hmm_tvtp_adaptive.train import (
+    TrainingConfig,
+    _brier_score,
+    _expected_calibration_error,
+    _fit_logistic,
+)
+from validation.core.compute_adversarial_gap import compute_adversarial_gap
+from validation.core.compute_clarity_spectrum_power import (
+    compute_clarity_spectrum_power,
+)
+from validation.core.compute_drift_bandwidth import compute_drift_bandwidth
+from validation.core.compute_noise_energy import compute_noise_energy
+
+DEFAULT_BASELINE = PROJECT_ROOT / "tools" / "benchmark_baseline.json"
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+N_FEATURES = 8
+TVTP_COLUMNS = ["macro_regime", "volatility_slope", "cvd_rolling", "bar_vpo_imbalance"]
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[int, np.random.Generator], Callable[[], object]]
+    max_size: int
+
+
+def _noise_energy(n: int, rng: np.random.Generator):
+    clarity = rng.uniform(size=n)
+    predictions = rng.uniform(size=n)
+    return lambda: compute_noise_energy(clarity, predictions)
+
+
+def _drift_bandwidth(n: int, rng: np.random.Generator):
+    prototypes = rng.normal(size=(n, N_FEATURES)).cumsum(axis=0)
+    return lambda: compute_drift_bandwidth(prototypes)
+
+
+def _spectrum_power(n: int, rng: np.random.Generator):
+    clarity = 0.7 + 0.05 * rng.standard_normal(n)
+    return lambda: compute_clarity_spectrum_power(clarity)
+
+
+def _adversarial_gap(n: int, rng: np.random.Generator):
+    embeddings = rng.normal(size=(n, N_FEATURES))
+    return lambda: compute_adversarial_gap(embeddings, seed=7)
+
+
+def _ece_brier(n: int, rng: np.random.Generator):
+    probs = rng.uniform(size=n)
+    targets = (rng.uniform(size=n) < probs).astype(float)
+    return lambda: (
+        _expected_calibration_error(probs, targets),
+        _brier_score(probs, targets),
+    )
+
+
+def _assign(n: int, rng: np.random.Generator):
+    data = rng.normal(size=(n, N_FEATURES))
+    centroids = rng.normal(size=(2, N_FEATURES))
+    return lambda: _assign_labels(data, centroids)
+
+
+def _online(n: int, rng: np.random.Generator):
+    data = rng.normal(size=(n, N_FEATURES))
+    centroids = data[[0, -1]].copy()
+    return lambda: _online_update(data, centroids, 0.97)
+
+
+def _logistic(n: int, rng: np.random.Generator):
+    features = rng.normal(size=(n, len(TVTP_COLUMNS)))
+    targets = (rng.uniform(size=n) < 0.3).astype(float)
+    config = TrainingConfig(feature_columns=TVTP_COLUMNS, max_iter=100)
+    return lambda: _fit_logistic(features, targets, config)
+
+
+_ARTIFACTS_DIR = tempfile.TemporaryDirectory(prefix="orderflow-bench-")
+
+
+def _inference(n: int, rng: np.random.Generator):
+    artifacts = Path(_ARTIFACTS_DIR.name) / "model_params.json"
+    artifacts.write_text(
+        json.dumps(
+            {
+                "coefficients": {c: float(rng.normal()) for c in TVTP_COLUMNS},
+                "intercept": 0.1,
+            }
+        )
+    )
+    frame = pd.DataFrame(rng.normal(size=(n, len(TVTP_COLUMNS))), columns=TVTP_COLUMNS)
+    config = InferenceConfig(feature_columns=TVTP_COLUMNS, artifacts_path=artifacts)
+    return lambda: run_inference(frame, config)
+
+
+BENCHMARKS: List[Benchmark] = [
+    Benchmark("noise_energy", _noise_energy, 10_000_000),
+    Benchmark("drift_bandwidth", _drift_bandwidth, 1_000_000),
+    Benchmark("clarity_spectrum_power", _spectrum_power, 10_000_000),
+    Benchmark("adversarial_gap", _adversarial_gap, 1_000_000),
+    Benchmark("ece_brier", _ece_brier, 10_000_000),
+    Benchmark("assign_labels", _assign, 1_000_000),
+    Benchmark("online_update", _online, 100_000),
+    Benchmark("fit_logistic", _logistic, 100_000),
+    Benchmark("state_inference_run", _inference, 1_000_000),
+]
+
+
+def _measure(fn: Callable[[], object], repeats: int) -> Dict[str, float]:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": int(peak)}
+
+
+def run_suite(
+    sizes: List[int], repeats: int, only: List[str] | None = None
+) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for bench in BENCHMARKS:
+        if only and bench.name not in only:
+            continue
+        for size in sizes:
+            if size > bench.max_size:
+                continue
+            fn = bench.setup(size, np.random.default_rng(7))
+            key = f"{bench.name}@{size}"
+            results[key] = _measure(fn, repeats)
+            print(
+                f"{key:<36} {results[key]['seconds'] * 1e3:>11.3f} ms "
+                f"{results[key]['peak_bytes'] / 2**20:>10.2f} MiB",
+                flush=True,
+            )
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+    memory_threshold: float,
+    min_delta_ms: float,
+) -> List[str]:
+    """Regression messages for results exceeding the baseline by the thresholds."""
+
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        slower = current["seconds"] - base["seconds"]
+        if (
+            current["seconds"] > base["seconds"] * (1 + threshold / 100)
+            and slower * 1e3 > min_delta_ms
+        ):
+            regressions.append(
+                f"{key}: time {base['seconds'] * 1e3:.3f} ms -> "
+                f"{current['seconds'] * 1e3:.3f} ms "
+                f"(+{slower / base['seconds'] * 100:.0f}%)"
+            )
+        if current["peak_bytes"] > base["peak_bytes"] * (1 + memory_threshold / 100):
+            regressions.append(
+                f"{key}: peak memory {base['peak_bytes']} -> "
+                f"{current['peak_bytes']} bytes"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--only", nargs="+", default=None)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--threshold", type=float, default=50.0, help="allowed slowdown in percent"
+    )
+    parser.add_argument(
+        "--memory-threshold",
+        type=float,
+        default=10.0,
+        help="allowed peak-memory growth in percent",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=2.0,
+        help="ignore slowdowns smaller than this absolute amount (timer noise)",
+    )
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.repeats, args.only)
+
+    if args.update_baseline:
+        existing = {}
+        if args.baseline.exists():
+            existing = json.loads(args.baseline.read_text()).get("results", {})
+        existing.update(results)
+        payload = {
+            "meta": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+                "machine": platform.machine(),
+                "system": platform.system(),
+                "repeats": args.repeats,
+            },
+            "results": dict(sorted(existing.items())),
+        }
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n")
+        print(f"[bench] wrote {len(existing)} entries to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"[bench] no baseline at {args.baseline}; run with --update-baseline")
+        return
+    baseline = json.loads(args.baseline.read_text()).get("results", {})
+    regressions = compare(
+        results, baseline, args.threshold, args.memory_threshold, args.min_delta_ms
+    )
+    if regressions:
+        print("[bench] regressions:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"[bench] {len(results)} benchmarks within thresholds")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,66 @@
 """Core validation metrics and utilities."""
 from __future__ import annotations
 
-from .compute_adversarial_gap import compute_adversarial_gap
-from .compute_clarity_spectrum_power import compute_clarity_spectrum_power
-from .compute_drift_bandwidth import compute_drift_bandwidth
-from .compute_noise_energy import compute_noise_energy
+from .bootstrap import (
+    BootstrapResult,
+    block_bootstrap_indices,
+    bootstrap_clarity_spectrum_power,
+    bootstrap_drift_bandwidth,
+    bootstrap_ece,
+    bootstrap_noise_energy,
+)
+from .compute_adversarial_gap import (
+    AdversarialGapResult,
+    compute_adversarial_gap,
+    compute_model_adversarial_gap,
+)
+from .compute_clarity_spectrum_power import (
+    RollingSpectrumPower,
+    compute_clarity_spectrum_power,
+    compute_clarity_spectrum_power_batch,
+    rolling_clarity_spectrum_power,
+)
+from .compute_drift_bandwidth import (
+    DriftBandwidthTracker,
+    compute_drift_bandwidth,
+    rolling_drift_bandwidth,
+)
+from .compute_noise_energy import (
+    NoiseEnergyAccumulator,
+    RollingNoiseEnergy,
+    compute_noise_energy,
+    rolling_noise_energy,
+)
+from .rules import RuleSet, compile_condition, load_rules
+from .run_store import RunStore
+from .whatif import compile_gate, evaluate_whatif, threshold_grid
 
 __all__ = [
     "compute_noise_energy",
     "compute_drift_bandwidth",
     "compute_clarity_spectrum_power",
     "compute_adversarial_gap",
+    "NoiseEnergyAccumulator",
+    "RollingNoiseEnergy",
+    "rolling_noise_energy",
+    "DriftBandwidthTracker",
+    "rolling_drift_bandwidth",
+    "compute_clarity_spectrum_power_batch",
+    "rolling_clarity_spectrum_power",
+    "RollingSpectrumPower",
+    "AdversarialGapResult",
+    "compute_model_adversarial_gap",
+    "RunStore",
+    "compile_gate",
+    "evaluate_whatif",
+    "threshold_grid",
+    "RuleSet",
+    "compile_condition",
+    "load_rules",
+    "BootstrapResult",
+    "block_bootstrap_indices",
+    "bootstrap_noise_energy",
+    "bootstrap_drift_bandwidth",
+    "bootstrap_clarity_spectrum_power",
+    "bootstrap_ece",
 ]
@@ -6,6 +6,7 @@ import sys
 from datetime import datetime, timezone
 from pathlib import Path
 
+from .run_store import AGGREGATIONS, METRIC_COLUMNS, RunStore
 from .thresholds_loader import load_policy
 
 
@@ -16,17 +17,21 @@ def _safe_float(value, default: float = float("nan")) -> float:
         return default
 
 
-def collect_runs(runs_dir: Path) -> dict:
-    """
-    Aggregate raw metrics in validation/runs/**/*.json
-    If no runs found, use a conservative placeholder to allow pipeline to complete.
-    """
-    metrics = {
+def _placeholder_metrics() -> dict:
+    return {
         "clarity": {"spectrum_power": 0.70},
         "noise": {"energy": 0.35},
         "drift": {"bandwidth": 0.22},
         "adversarial": {"gap": 0.15},
     }
+
+
+def collect_runs(runs_dir: Path) -> dict:
+    """
+    Aggregate raw metrics in validation/runs/**/*.json
+    If no runs found, use a conservative placeholder to allow pipeline to complete.
+    """
+    metrics = _placeholder_metrics()
     if runs_dir.exists():
         for path in runs_dir.rglob("*.json"):
             try:
@@ -46,7 +51,53 @@ def collect_runs(runs_dir: Path) -> dict:
     return metrics
 
 
-def eval_gate(policy: dict, metrics: dict) -> dict:
+def collect_runs_indexed(
+    runs_dir: Path, store_path: Path, aggregation: str = "latest"
+) -> dict:
+    """
+    Like collect_runs, but ingests incrementally into a RunStore and aggregates
+    each metric with an explicit policy (latest/mean/worst) instead of letting
+    later files overwrite earlier ones.
+    """
+    metrics = _placeholder_metrics()
+    with RunStore(store_path) as store:
+        store.ingest(runs_dir)
+        aggregated = store.aggregate(aggregation)
+    for column, (key, subkey) in METRIC_COLUMNS.items():
+        value = aggregated.get(column)
+        if value is not None:
+            # groups outside the placeholder set (calibration) appear once reported
+            metrics.setdefault(key, {})[subkey] = float(value)
+    return metrics
+
+
+def collect_bounds_indexed(
+    runs_dir: Path, store_path: Path, aggregation: str = "latest"
+) -> dict:
+    """
+    Build the ``bounds`` dict for eval_gate from the bootstrap intervals the
+    runner stores next to each metric, aggregated with the same policy as the
+    point metrics. Metrics whose runs carry no interval are left out, so their
+    rules fall back to the point estimate.
+    """
+    with RunStore(store_path) as store:
+        store.ingest(runs_dir)
+        aggregated = store.aggregate_bounds(aggregation)
+    return {
+        f"{key}.{subkey}": aggregated[column]
+        for column, (key, subkey) in METRIC_COLUMNS.items()
+        if column in aggregated
+    }
+
+
+def eval_gate(policy: dict, metrics: dict, bounds: dict | None = None) -> dict:
+    """
+    Evaluate gate rules against point metrics.
+    ``bounds`` optionally maps a rule metric (e.g. "noise.energy") to a
+    (lower, upper) confidence interval; the gate then compares the conservative
+    side: the lower bound for >=/> rules and the upper bound for <=/< rules.
+    """
+    bounds = bounds or {}
     mode = policy.get("gate", {}).get("mode", "strict")
     checks = []
     fails = warns = 0
@@ -61,6 +112,11 @@ def eval_gate(policy: dict, metrics: dict) -> dict:
             actual = float(metrics[top][sub])
         except Exception:
             actual = float("nan")
+        bound = None
+        if metric_key in bounds and op in (">=", ">", "<=", "<"):
+            lower, upper = bounds[metric_key]
+            bound = "lower" if op in (">=", ">") else "upper"
+            actual = _safe_float(lower if bound == "lower" else upper)
         ok = (
             (op == ">=" and actual >= value)
             or (op == "<=" and actual <= value)
@@ -80,6 +136,7 @@ def eval_gate(policy: dict, metrics: dict) -> dict:
                 "op": op,
                 "value": value,
                 "severity": severity,
+                **({"bound": bound} if bound else {}),
             }
         )
     result = "fail" if fails > 0 else "pass"
@@ -97,7 +154,11 @@ def write_validation(out_dir: Path, summary: dict) -> None:
     (out_dir / "metrics_summary.json").write_text(
         json.dumps(summary, indent=2), encoding="utf-8"
     )
-    lines = ["<!-- Generated by aggregator. Do not edit. -->", "# Validation Summary", ""]
+    lines = [
+        "<!-- Generated by aggregator. Do not edit. -->",
+        "# Validation Summary",
+        "",
+    ]
     lines.append(f"- Policy version: `{summary.get('policy_version')}`")
     gate = summary["gate"]
     lines.append(
@@ -129,14 +190,35 @@ def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--runs-dir", default="validation/runs")
     parser.add_argument("--out-dir", default="validation")
+    parser.add_argument("--store", default=None, help="SQLite run index path")
+    parser.add_argument("--aggregation", default="latest", choices=AGGREGATIONS)
+    parser.add_argument(
+        "--bounds",
+        action="store_true",
+        help="gate on the conservative side of the runs' bootstrap intervals "
+        "(requires --store)",
+    )
     args = parser.parse_args()
+    if args.bounds and not args.store:
+        parser.error("--bounds requires --store")
 
     policy = load_policy()
-    metrics = collect_runs(Path(args.runs_dir))
-    gate = eval_gate(policy, metrics)
+    bounds = None
+    if args.store:
+        metrics = collect_runs_indexed(
+            Path(args.runs_dir), Path(args.store), args.aggregation
+        )
+        if args.bounds:
+            bounds = collect_bounds_indexed(
+                Path(args.runs_dir), Path(args.store), args.aggregation
+            )
+    else:
+        metrics = collect_runs(Path(args.runs_dir))
+    gate = eval_gate(policy, metrics, bounds=bounds)
     summary = {
         "policy_version": policy.get("policy_version", "unknown"),
         "metrics": metrics,
+        "bounds": {name: list(pair) for name, pair in (bounds or {}).items()},
         "gate": gate,
         "timestamp_utc": datetime.now(timezone.utc).isoformat(),
     }
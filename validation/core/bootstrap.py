@@ -0,0 +1,407 @@
+"""
+Block-bootstrap confidence intervals for the stability gate metrics.
+
+A (B, n) matrix of circular moving-block resample indices is drawn once per series
+length and every metric is evaluated across all B resamples with batched array
+operations (masked moments for noise energy, resampled step norms for drift
+bandwidth, resampled Welch segment powers for spectrum power and flat bincounts for
+ECE) instead of B calls to the scalar functions. Resamples are processed in chunks
+so at most ``max_cells`` gathered values are alive at once.
+"""
+
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+from .compute_clarity_spectrum_power import (
+    _resolve_nperseg,
+    _segment_band_power,
+    compute_clarity_spectrum_power,
+    compute_clarity_spectrum_power_batch,
+)
+from .compute_drift_bandwidth import _scale, compute_drift_bandwidth
+from .compute_noise_energy import compute_noise_energy
+
+SeedLike = Union[int, np.random.SeedSequence, np.random.Generator, None]
+DEFAULT_MAX_CELLS = 1 << 24
+
+
+@dataclass
+class BootstrapResult:
+    """Point estimate plus its bootstrap distribution."""
+
+    estimate: float
+    samples: np.ndarray
+
+    def interval(self, confidence: float = 0.95) -> Tuple[float, float]:
+        """Two-sided percentile interval."""
+        alpha = (1.0 - confidence) / 2.0
+        lo, hi = np.quantile(self.samples, [alpha, 1.0 - alpha])
+        return float(lo), float(hi)
+
+    def lower(self, confidence: float = 0.95) -> float:
+        """One-sided lower confidence bound."""
+        return float(np.quantile(self.samples, 1.0 - confidence))
+
+    def upper(self, confidence: float = 0.95) -> float:
+        """One-sided upper confidence bound."""
+        return float(np.quantile(self.samples, confidence))
+
+    @property
+    def std(self) -> float:
+        return float(np.std(self.samples, ddof=1)) if self.samples.size > 1 else 0.0
+
+
+def default_block_size(n: int) -> int:
+    """n^(1/3) rule of thumb for moving-block bootstraps."""
+    return max(1, int(round(n ** (1.0 / 3.0))))
+
+
+def block_bootstrap_indices(
+    n: int,
+    n_resamples: int = 1000,
+    block_size: Optional[int] = None,
+    seed: SeedLike = None,
+) -> np.ndarray:
+    """
+    Circular moving-block resample indices.
+
+    Args:
+        n: Series length
+        n_resamples: Number of bootstrap resamples (B)
+        block_size: Block length; defaults to ``default_block_size(n)``
+        seed: Seed, SeedSequence or Generator for the block starts
+
+    Returns:
+        Integer array of shape (n_resamples, n)
+
+    Raises:
+        ValueError: If n, n_resamples or block_size is not positive
+    """
+    if n < 1 or n_resamples < 1:
+        raise ValueError("Series length and resample count must be positive")
+    block_size = block_size or default_block_size(n)
+    if block_size < 1:
+        raise ValueError("Block size must be positive")
+    block_size = min(block_size, n)
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n, size=(n_resamples, n_blocks))
+    offsets = np.arange(block_size)
+    indices = (starts[:, :, None] + offsets) % n
+    return indices.reshape(n_resamples, n_blocks * block_size)[:, :n]
+
+
+def _row_chunks(indices: np.ndarray, max_cells: int) -> Iterator[slice]:
+    step = max(1, max_cells // max(indices.shape[1], 1))
+    for start in range(0, indices.shape[0], step):
+        yield slice(start, start + step)
+
+
+def _resolve_indices(indices, n, n_resamples, block_size, seed) -> np.ndarray:
+    if indices is None:
+        return block_bootstrap_indices(n, n_resamples, block_size, seed)
+    indices = np.asarray(indices)
+    if indices.ndim != 2:
+        raise ValueError("Resample indices must be 2D (resamples × samples)")
+    return indices
+
+
+def _batched_noise_energy(
+    clarity: np.ndarray, predictions: np.ndarray, clarity_threshold: float
+) -> np.ndarray:
+    """Row-wise ``compute_noise_energy`` for (B, n) arrays."""
+    n = predictions.shape[1]
+    low = clarity < clarity_threshold
+    low_n = low.sum(axis=1)
+    low_mean = np.where(low, predictions, 0.0).sum(axis=1) / np.maximum(low_n, 1)
+    low_m2 = np.where(low, (predictions - low_mean[:, None]) ** 2, 0.0).sum(axis=1)
+    low_var = np.where(low_n > 1, low_m2 / np.maximum(low_n - 1, 1), 0.0)
+    total_var = np.var(predictions, axis=1, ddof=1) if n > 1 else np.ones(len(low_n))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.clip(low_var / total_var, 0.0, 1.0)
+    return np.where((low_n == 0) | (total_var < 1e-10), 0.0, ratio)
+
+
+def bootstrap_noise_energy(
+    clarity: np.ndarray,
+    predictions: np.ndarray,
+    clarity_threshold: float = 0.55,
+    n_resamples: int = 1000,
+    block_size: Optional[int] = None,
+    seed: SeedLike = None,
+    indices: Optional[np.ndarray] = None,
+    max_cells: int = DEFAULT_MAX_CELLS,
+) -> BootstrapResult:
+    """
+    Block-bootstrap distribution of :func:`compute_noise_energy`.
+
+    Args:
+        clarity: Array of clarity scores
+        predictions: Array of prediction values, same length as clarity
+        clarity_threshold: Threshold below which clarity is considered low
+        n_resamples: Number of resamples when ``indices`` is not given
+        block_size: Block length when ``indices`` is not given
+        seed: Seed for the resample indices
+        indices: Precomputed (B, n) resample indices to share across metrics
+        max_cells: Upper bound on gathered values per chunk
+
+    Returns:
+        BootstrapResult with the point estimate and B resampled values
+    """
+    clarity = np.asarray(clarity, dtype=float)
+    predictions = np.asarray(predictions, dtype=float)
+    estimate = compute_noise_energy(clarity, predictions, clarity_threshold)
+    indices = _resolve_indices(indices, len(clarity), n_resamples, block_size, seed)
+    samples = np.empty(indices.shape[0])
+    for rows in _row_chunks(indices, max_cells):
+        idx = indices[rows]
+        samples[rows] = _batched_noise_energy(
+            clarity[idx], predictions[idx], clarity_threshold
+        )
+    return BootstrapResult(estimate, samples)
+
+
+def bootstrap_drift_bandwidth(
+    prototypes: np.ndarray,
+    sampling_rate: Optional[float] = None,
+    n_resamples: int = 1000,
+    block_size: Optional[int] = None,
+    seed: SeedLike = None,
+    indices: Optional[np.ndarray] = None,
+    max_cells: int = DEFAULT_MAX_CELLS,
+) -> BootstrapResult:
+    """
+    Block-bootstrap distribution of :func:`compute_drift_bandwidth`.
+
+    The T-1 squared step norms are resampled (indices of shape (B, T-1)), since the
+    bandwidth is the root mean of those norms.
+
+    Args:
+        prototypes: Prototype history, shape (n_timepoints, n_features)
+        sampling_rate: Optional sampling rate for scaling
+        n_resamples: Number of resamples when ``indices`` is not given
+        block_size: Block length when ``indices`` is not given
+        seed: Seed for the resample indices
+        indices: Precomputed (B, T-1) resample indices
+        max_cells: Upper bound on gathered values per chunk
+
+    Returns:
+        BootstrapResult with the point estimate and B resampled values
+    """
+    prototypes = np.asarray(prototypes, dtype=float)
+    estimate = compute_drift_bandwidth(prototypes, sampling_rate)
+    step_sq = np.sum(np.diff(prototypes, axis=0) ** 2, axis=1)
+    indices = _resolve_indices(indices, len(step_sq), n_resamples, block_size, seed)
+    samples = np.empty(indices.shape[0])
+    for rows in _row_chunks(indices, max_cells):
+        samples[rows] = np.sqrt(step_sq[indices[rows]].mean(axis=1))
+    return BootstrapResult(estimate, _scale(samples, sampling_rate))
+
+
+def bootstrap_clarity_spectrum_power(
+    clarity: np.ndarray,
+    sampling_rate: float = 1.0,
+    frequency_band: Optional[tuple] = None,
+    nperseg: Optional[int] = None,
+    n_resamples: int = 1000,
+    block_size: Optional[int] = None,
+    seed: SeedLike = None,
+    indices: Optional[np.ndarray] = None,
+    max_cells: int = DEFAULT_MAX_CELLS,
+) -> BootstrapResult:
+    """
+    Block-bootstrap distribution of :func:`compute_clarity_spectrum_power`.
+
+    The Welch estimate is the mean of the band powers of its half-overlapping
+    segments, so by default whole segments are block-resampled and each resample
+    is their mean. Joining short sample blocks instead injects high-frequency power
+    at every join and biases the distribution upwards; that sample-level path is
+    only taken when ``indices`` are passed explicitly (to share resamples across
+    metrics), and then the blocks should be several segments long.
+
+    Args:
+        clarity: Clarity time series
+        sampling_rate: Sampling rate of the clarity signal
+        frequency_band: Optional (low_freq, high_freq) band
+        nperseg: Welch segment length
+        n_resamples: Number of resamples when ``indices`` is not given
+        block_size: Block length in samples, rounded to whole segment hops;
+            defaults to ``default_block_size`` of the segment count
+        seed: Seed for the resample indices
+        indices: Precomputed (B, n) sample resample indices
+        max_cells: Upper bound on gathered values per chunk
+
+    Returns:
+        BootstrapResult with the point estimate and B resampled values
+    """
+    clarity = np.asarray(clarity, dtype=float)
+    estimate = compute_clarity_spectrum_power(
+        clarity, sampling_rate, frequency_band, nperseg
+    )
+    if indices is None:
+        nperseg = _resolve_nperseg(nperseg, len(clarity))
+        segments = _segment_band_power(clarity, sampling_rate, frequency_band, nperseg)
+        hop = nperseg - nperseg // 2
+        segment_block = -(-block_size // hop) if block_size else None
+        seg_idx = block_bootstrap_indices(
+            len(segments), n_resamples, segment_block, seed
+        )
+        samples = np.empty(seg_idx.shape[0])
+        for rows in _row_chunks(seg_idx, max_cells):
+            samples[rows] = segments[seg_idx[rows]].mean(axis=1)
+        return BootstrapResult(estimate, samples)
+    indices = _resolve_indices(indices, len(clarity), n_resamples, block_size, seed)
+    samples = np.empty(indices.shape[0])
+    for rows in _row_chunks(indices, max_cells):
+        samples[rows] = compute_clarity_spectrum_power_batch(
+            clarity[indices[rows]], sampling_rate, frequency_band, nperseg
+        )
+    return BootstrapResult(estimate, samples)
+
+
+def _batched_ece(probs: np.ndarray, targets: np.ndarray, bins: int) -> np.ndarray:
+    """Row-wise ``_expected_calibration_error`` for (B, n) arrays."""
+    n_rows, n = probs.shape
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    index = np.searchsorted(edges, probs, side="right") - 1
+    valid = (index >= 0) & (index < bins)
+    keys = (np.arange(n_rows)[:, None] * bins + index)[valid]
+    size = n_rows * bins
+    count = np.bincount(keys, minlength=size).reshape(n_rows, bins)
+    conf = np.bincount(keys, probs[valid], minlength=size).reshape(n_rows, bins)
+    acc = np.bincount(keys, targets[valid], minlength=size).reshape(n_rows, bins)
+    safe = np.maximum(count, 1)
+    gap = np.abs(conf / safe - acc / safe)
+    return (count / n * gap).sum(axis=1)
+
+
+def bootstrap_ece(
+    probs: np.ndarray,
+    targets: np.ndarray,
+    bins: int = 10,
+    n_resamples: int = 1000,
+    block_size: Optional[int] = None,
+    seed: SeedLike = None,
+    indices: Optional[np.ndarray] = None,
+    max_cells: int = DEFAULT_MAX_CELLS,
+) -> BootstrapResult:
+    """
+    Block-bootstrap distribution of the expected calibration error.
+
+    Uses the same ``[lower, upper)`` bins as
+    ``model.hmm_tvtp_adaptive.train._expected_calibration_error``.
+
+    Args:
+        probs: Predicted probabilities
+        targets: Observed outcomes (0/1), same length as probs
+        bins: Number of equal-width bins
+        n_resamples: Number of resamples when ``indices`` is not given
+        block_size: Block length when ``indices`` is not given
+        seed: Seed for the resample indices
+        indices: Precomputed (B, n) resample indices
+        max_cells: Upper bound on gathered values per chunk
+
+    Returns:
+        BootstrapResult with the point estimate and B resampled values
+    """
+    probs = np.asarray(probs, dtype=float)
+    targets = np.asarray(targets, dtype=float)
+    if probs.shape != targets.shape or probs.ndim != 1 or probs.size == 0:
+        raise ValueError(
+            "probs and targets must be non-empty 1D arrays of equal length"
+        )
+    estimate = float(_batched_ece(probs[None, :], targets[None, :], bins)[0])
+    indices = _resolve_indices(indices, len(probs), n_resamples, block_size, seed)
+    samples = np.empty(indices.shape[0])
+    for rows in _row_chunks(indices, max_cells):
+        idx = indices[rows]
+        samples[rows] = _batched_ece(probs[idx], targets[idx], bins)
+    return BootstrapResult(estimate, samples)
+
+
+def _self_test():
+    """Minimal self-test for block-bootstrap intervals."""
+    from model.hmm_tvtp_adaptive.train import _expected_calibration_error
+
+    rng = np.random.default_rng(0)
+    n = 600
+    clarity = np.clip(
+        0.6 + 0.1 * np.sin(np.arange(n) / 20) + 0.05 * rng.standard_normal(n), 0, 1
+    )
+    predictions = 0.5 + 0.3 * (clarity - 0.6) + 0.1 * rng.standard_normal(n)
+    indices = block_bootstrap_indices(n, n_resamples=200, seed=1)
+
+    # Test case 1: Index matrix shape and block structure
+    assert indices.shape == (200, n) and indices.min() >= 0 and indices.max() < n
+    block = default_block_size(n)
+    assert np.all((indices[:, 1:block] - indices[:, : block - 1]) % n == 1)
+    print(f"Test 1 - Indices {indices.shape}, block_size={block}")
+
+    # Test case 2: Batched noise energy matches the scalar function per resample
+    result = bootstrap_noise_energy(clarity, predictions, indices=indices)
+    looped = [compute_noise_energy(clarity[i], predictions[i]) for i in indices[:20]]
+    assert np.allclose(result.samples[:20], looped)
+    lo, hi = result.interval(0.9)
+    assert lo <= hi
+    print(f"Test 2 - Noise energy {result.estimate:.4f} CI90=({lo:.4f}, {hi:.4f})")
+
+    # Test case 3: Drift bandwidth, spectrum power and ECE match scalar calls
+    prototypes = np.cumsum(0.01 * rng.standard_normal((120, 4)), axis=0)
+    drift = bootstrap_drift_bandwidth(prototypes, n_resamples=50, seed=2)
+    step_idx = block_bootstrap_indices(119, 50, seed=2)
+    steps = np.diff(prototypes, axis=0)
+    expected = [np.sqrt(np.mean(np.sum(steps[i] ** 2, axis=1))) for i in step_idx[:5]]
+    assert np.allclose(drift.samples[:5], expected)
+
+    spectrum = bootstrap_clarity_spectrum_power(clarity, indices=indices[:10])
+    looped = [compute_clarity_spectrum_power(clarity[i]) for i in indices[:10]]
+    assert np.allclose(spectrum.samples, looped)
+
+    probs = rng.uniform(size=n)
+    probs[:3] = 1.0
+    targets = (rng.uniform(size=n) < probs).astype(float)
+    ece = bootstrap_ece(probs, targets, indices=indices)
+    assert np.isclose(ece.estimate, _expected_calibration_error(probs, targets))
+    looped = [_expected_calibration_error(probs[i], targets[i]) for i in indices[:20]]
+    assert np.allclose(ece.samples[:20], looped)
+    print(
+        f"Test 3 - drift={drift.estimate:.4f}±{drift.std:.4f} "
+        f"spectrum={spectrum.estimate:.6f} ece={ece.estimate:.4f}±{ece.std:.4f}"
+    )
+
+    # Test case 4: Chunking and seeding are reproducible
+    chunked = bootstrap_noise_energy(
+        clarity, predictions, indices=indices, max_cells=n * 7
+    )
+    assert np.array_equal(chunked.samples, result.samples)
+    again = bootstrap_noise_energy(clarity, predictions, n_resamples=200, seed=1)
+    assert np.array_equal(again.samples, result.samples)
+    print("Test 4 - Chunked and reseeded runs identical")
+
+    # Test case 5: Segment-resampled spectrum CI brackets its own estimate
+    smooth = np.convolve(rng.standard_normal(4096 + 49), np.ones(50) / 50, "valid")
+    spectrum = bootstrap_clarity_spectrum_power(smooth, n_resamples=500, seed=3)
+    lo, hi = spectrum.interval()
+    assert lo <= spectrum.estimate <= hi, (spectrum.estimate, lo, hi)
+    segments = _segment_band_power(smooth, 1.0, None, 256)
+    assert np.isclose(segments.mean(), spectrum.estimate), "Welch = segment mean"
+    print(f"Test 5 - Spectrum {spectrum.estimate:.3g} CI95=({lo:.3g}, {hi:.3g})")
+
+    print("\n✓ All self-tests passed")
+
+
+__all__ = [
+    "BootstrapResult",
+    "block_bootstrap_indices",
+    "bootstrap_clarity_spectrum_power",
+    "bootstrap_drift_bandwidth",
+    "bootstrap_ece",
+    "bootstrap_noise_energy",
+    "default_block_size",
+]
+
+
+if __name__ == "__main__":
+    _self_test()
@@ -3,9 +3,12 @@ Compute adversarial gap metric for stability gate validation.
 
 This metric measures the mean squared distance between real embeddings and
 noisy/perturbed embeddings to assess model robustness to input perturbations.
+The model-in-the-loop variant pushes the perturbations through a predictor and
+measures the gap in output space instead.
 """
 
-from typing import Optional
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple, Union
 
 import numpy as np
 
@@ -46,9 +49,9 @@ def compute_adversarial_gap(
     if noise_scale < 0:
         raise ValueError("Noise scale must be non-negative")
 
-    # Set random seed if provided
-    if seed is not None:
-        np.random.seed(seed)
+    # Seeded calls draw from a private RandomState (same stream as the former
+    # np.random.seed + np.random.* calls) so the global state is left untouched
+    random = np.random.RandomState(seed) if seed is not None else np.random
 
     # Compute embedding standard deviation for scaling
     embedding_std = np.std(embeddings)
@@ -58,12 +61,10 @@ def compute_adversarial_gap(
 
     # Generate noise based on type
     if noise_type == "gaussian":
-        noise = np.random.randn(n_samples, n_features) * noise_scale * embedding_std
+        noise = random.randn(n_samples, n_features) * noise_scale * embedding_std
     elif noise_type == "uniform":
         noise = (
-            np.random.uniform(-1, 1, (n_samples, n_features))
-            * noise_scale
-            * embedding_std
+            random.uniform(-1, 1, (n_samples, n_features)) * noise_scale * embedding_std
         )
     else:
         raise ValueError(
@@ -80,6 +81,160 @@ def compute_adversarial_gap(
     return float(mean_squared_distance)
 
 
+@dataclass
+class AdversarialGapResult:
+    """Distribution of output-space gaps, one entry per perturbation draw."""
+
+    gaps: np.ndarray
+
+    @property
+    def mean(self) -> float:
+        return float(np.mean(self.gaps))
+
+    @property
+    def std(self) -> float:
+        return float(np.std(self.gaps))
+
+    def quantile(self, q: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        value = np.quantile(self.gaps, q)
+        return float(value) if np.ndim(value) == 0 else value
+
+    def summary(self) -> dict:
+        return {
+            "mean": self.mean,
+            "std": self.std,
+            "p05": self.quantile(0.05),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "n_draws": int(self.gaps.size),
+        }
+
+
+def _draw_noise(
+    rng: np.random.Generator, noise_type: str, shape: Tuple[int, ...]
+) -> np.ndarray:
+    if noise_type == "gaussian":
+        return rng.standard_normal(shape)
+    return rng.uniform(-1.0, 1.0, shape)
+
+
+def _output_distance(
+    outputs: np.ndarray, baseline: np.ndarray, distance: str
+) -> np.ndarray:
+    """Per-sample distance between outputs and baseline over the last axis."""
+    if distance == "squared":
+        diff = outputs.astype(float) - baseline
+        return np.sum(diff**2, axis=-1)
+    return np.any(outputs != baseline, axis=-1)
+
+
+def compute_model_adversarial_gap(
+    embeddings: np.ndarray,
+    predictor: Callable[[np.ndarray], np.ndarray],
+    n_draws: int = 32,
+    noise_scale: float = 0.1,
+    noise_type: str = "gaussian",
+    seed: Union[int, np.random.SeedSequence, np.random.Generator, None] = None,
+    distance: str = "squared",
+    max_rows_per_call: int = 1_000_000,
+) -> AdversarialGapResult:
+    """
+    Measure how far model outputs move under input perturbations.
+
+    ``n_draws`` noisy copies of the embeddings are stacked into one batch and the
+    predictor outputs are compared with its outputs on the clean embeddings. At
+    most ``max_rows_per_call`` rows reach the predictor at once: whole draws are
+    grouped while they fit, and a draw larger than the bound is split by rows.
+    Typical predictors are the clusterer assignment, e.g.
+    ``lambda x: _assign_labels(x, centroids)[0]`` with ``distance="mismatch"``,
+    or the TVTP transition probability with ``distance="squared"``.
+
+    Noise comes from a per-call ``np.random.Generator`` consumed in draw/row order;
+    chunking does not change the draws, and workers seeded from ``np.random.SeedSequence(seed).spawn(n)``
+    produce reproducible, independent results.
+
+    Args:
+        embeddings: Model inputs, shape (n_samples, n_features)
+        predictor: Callable mapping (rows, n_features) to (rows,) or (rows, k)
+        n_draws: Number of perturbation draws (M)
+        noise_scale: Scale of noise to add (relative to embedding std)
+        noise_type: Type of noise - "gaussian" or "uniform"
+        seed: Seed, SeedSequence or Generator for the noise draws
+        distance: "squared" (mean squared output distance) or "mismatch"
+                  (share of samples whose output changed, for labels)
+        max_rows_per_call: Upper bound on rows passed to one predictor call
+
+    Returns:
+        AdversarialGapResult holding one gap per draw
+
+    Raises:
+        ValueError: If inputs are invalid or noise_type/distance is unknown
+    """
+    if embeddings.ndim != 2:
+        raise ValueError("Embeddings must be 2D array (samples × features)")
+    n_samples, n_features = embeddings.shape
+    if n_samples == 0 or n_features == 0:
+        raise ValueError("Embeddings cannot be empty")
+    if noise_scale < 0:
+        raise ValueError("Noise scale must be non-negative")
+    if n_draws < 1:
+        raise ValueError("Need at least one perturbation draw")
+    if max_rows_per_call < 1:
+        raise ValueError("max_rows_per_call must be positive")
+    if noise_type not in ("gaussian", "uniform"):
+        raise ValueError(
+            f"Unknown noise_type: {noise_type}. Use 'gaussian' or 'uniform'"
+        )
+    if distance not in ("squared", "mismatch"):
+        raise ValueError(f"Unknown distance: {distance}. Use 'squared' or 'mismatch'")
+
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    embeddings = np.asarray(embeddings, dtype=float)
+    embedding_std = np.std(embeddings)
+    if embedding_std < 1e-10:
+        embedding_std = 1.0
+    amplitude = noise_scale * embedding_std
+
+    row_blocks = [
+        (lo, min(lo + max_rows_per_call, n_samples))
+        for lo in range(0, n_samples, max_rows_per_call)
+    ]
+    baseline = np.concatenate(
+        [
+            np.asarray(predictor(embeddings[lo:hi])).reshape(hi - lo, -1)
+            for lo, hi in row_blocks
+        ]
+    )
+    gaps = np.empty(n_draws)
+    if n_samples > max_rows_per_call:
+        # one draw does not fit: accumulate it over row blocks
+        for draw in range(n_draws):
+            total = 0.0
+            for lo, hi in row_blocks:
+                noise = _draw_noise(rng, noise_type, (hi - lo, n_features))
+                noise *= amplitude
+                noise += embeddings[lo:hi]
+                outputs = np.asarray(predictor(noise)).reshape(hi - lo, -1)
+                total += float(
+                    _output_distance(outputs, baseline[lo:hi], distance).sum()
+                )
+            gaps[draw] = total / n_samples
+        return AdversarialGapResult(gaps=gaps)
+
+    draws_per_chunk = max_rows_per_call // n_samples
+    for start in range(0, n_draws, draws_per_chunk):
+        m = min(draws_per_chunk, n_draws - start)
+        noise = _draw_noise(rng, noise_type, (m, n_samples, n_features))
+        noise *= amplitude
+        noise += embeddings[None, :, :]
+        outputs = np.asarray(predictor(noise.reshape(m * n_samples, n_features)))
+        outputs = outputs.reshape(m, n_samples, -1)
+        gaps[start : start + m] = _output_distance(
+            outputs, baseline[None, :, :], distance
+        ).mean(axis=1)
+    return AdversarialGapResult(gaps=gaps)
+
+
 def _self_test():
     """Minimal self-test for adversarial gap computation."""
     # Test case 1: Small noise on random embeddings
@@ -138,6 +293,54 @@ def _self_test():
     except ValueError as e:
         print(f"Test 8 - Error handling (noise type): {e}")
 
+    # Test case 9: Seeded calls leave the global RNG untouched
+    np.random.seed(7)
+    expected_next = np.random.rand()
+    np.random.seed(7)
+    compute_adversarial_gap(embeddings, noise_scale=0.1, seed=123)
+    assert np.random.rand() == expected_next, "Global RNG must not be reseeded"
+    print("Test 9 - Global RNG untouched")
+
+    # Test case 10: Model-in-the-loop gap is reproducible and chunk-invariant
+    weights = np.linspace(-1.0, 1.0, embeddings.shape[1])
+
+    def predictor(x):
+        return 1.0 / (1.0 + np.exp(-(x @ weights)))
+
+    full = compute_model_adversarial_gap(embeddings, predictor, n_draws=16, seed=5)
+    chunked = compute_model_adversarial_gap(
+        embeddings, predictor, n_draws=16, seed=5, max_rows_per_call=250
+    )
+    assert np.allclose(full.gaps, chunked.gaps), "Chunking must not change draws"
+    calls = []
+
+    def bounded(x):
+        calls.append(len(x))
+        return predictor(x)
+
+    split = compute_model_adversarial_gap(
+        embeddings, bounded, n_draws=16, seed=5, max_rows_per_call=30
+    )
+    assert max(calls) <= 30, "A single draw must be split to respect the bound"
+    assert np.allclose(full.gaps, split.gaps), "Row splitting must not change draws"
+    larger = compute_model_adversarial_gap(
+        embeddings, predictor, n_draws=16, noise_scale=0.5, seed=5
+    )
+    assert larger.mean > full.mean, "Larger noise should move outputs further"
+    print(f"Test 10 - Model gap: mean={full.mean:.6f}, p95={full.quantile(0.95):.6f}")
+
+    # Test case 11: Label predictor with mismatch distance
+    centroids = np.stack([embeddings.mean(axis=0) - 1.0, embeddings.mean(axis=0) + 1.0])
+
+    def assign(x):
+        return np.argmin(((x[:, None, :] - centroids[None]) ** 2).sum(axis=2), axis=1)
+
+    flips = compute_model_adversarial_gap(
+        embeddings, assign, n_draws=8, seed=1, distance="mismatch"
+    )
+    assert np.all((flips.gaps >= 0) & (flips.gaps <= 1)), "Flip rate is a share"
+    print(f"Test 11 - Label flip rate: mean={flips.mean:.4f}")
+
     print("✓ All self-tests passed")
 
 
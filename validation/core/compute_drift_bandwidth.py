@@ -58,6 +58,145 @@ def compute_drift_bandwidth(
     return float(bandwidth)
 
 
+def _scale(bandwidth, sampling_rate: Optional[float]):
+    if sampling_rate is not None and sampling_rate > 0:
+        return bandwidth * sampling_rate
+    return bandwidth
+
+
+def _as_clusters(prototypes: np.ndarray) -> np.ndarray:
+    """View (T, d) histories as (T, 1, d) so both layouts share one code path."""
+    if prototypes.ndim == 2:
+        return prototypes[:, None, :]
+    if prototypes.ndim == 3:
+        return prototypes
+    raise ValueError(
+        "Prototypes must be 2D (timepoints × features) or 3D (timepoints × k × d)"
+    )
+
+
+class DriftBandwidthTracker:
+    """
+    Incremental drift bandwidth over a stream of prototype snapshots.
+
+    Keeps the previous prototype and a running sum of squared first differences,
+    so each new prototype costs O(k·d) regardless of history length. With
+    ``window`` set, only the trailing ``window`` prototypes contribute and a
+    ring buffer of per-step squared norms supplies the values to evict.
+
+    Args:
+        window: Optional number of trailing prototypes (>= 2) in the window
+        per_cluster: Report one bandwidth per cluster instead of a scalar
+        sampling_rate: Optional sampling rate for scaling (default: 1.0)
+    """
+
+    def __init__(
+        self,
+        window: Optional[int] = None,
+        per_cluster: bool = False,
+        sampling_rate: Optional[float] = None,
+    ):
+        if window is not None and window < 2:
+            raise ValueError("Window must span at least 2 timepoints")
+        self.window = window
+        self.per_cluster = per_cluster
+        self.sampling_rate = sampling_rate
+        self._last: Optional[np.ndarray] = None
+        self._sum: Optional[np.ndarray] = None
+        self._steps = 0
+        self._ring: Optional[np.ndarray] = None
+        self._head = 0
+        self._since_resum = 0
+
+    @property
+    def steps(self) -> int:
+        """Number of first differences currently in the window."""
+        return self._steps
+
+    def update(self, prototype: np.ndarray):
+        """Add the next (d,) or (k, d) prototype and return the current value."""
+        current = np.asarray(prototype, dtype=float)
+        current = current[None, :] if current.ndim == 1 else current
+        if current.ndim != 2 or current.shape[1] == 0:
+            raise ValueError("Prototype must be (features,) or (k, features)")
+        if self._last is None:
+            self._last = current.copy()
+            self._sum = np.zeros(current.shape[0])
+            if self.window is not None:
+                self._ring = np.zeros((self.window - 1, current.shape[0]))
+            return None
+        if current.shape != self._last.shape:
+            raise ValueError("Prototype shape changed between updates")
+
+        step = np.sum((current - self._last) ** 2, axis=1)
+        self._last = current.copy()
+        if self._ring is None:
+            self._sum += step
+            self._steps += 1
+        else:
+            if self._steps == self._ring.shape[0]:
+                self._sum -= self._ring[self._head]
+            else:
+                self._steps += 1
+            self._ring[self._head] = step
+            self._sum += step
+            self._head = (self._head + 1) % self._ring.shape[0]
+            self._since_resum += 1
+            if self._since_resum >= self._ring.shape[0]:
+                # Re-sum periodically so add/evict rounding cannot accumulate.
+                self._sum = self._ring.sum(axis=0)
+                self._since_resum = 0
+        return self.value()
+
+    def value(self):
+        if self._steps == 0 or self._sum is None:
+            raise ValueError("Need at least 2 timepoints to compute drift")
+        mean_sq = np.maximum(self._sum, 0.0) / self._steps
+        if self.per_cluster:
+            return _scale(np.sqrt(mean_sq), self.sampling_rate)
+        return float(_scale(np.sqrt(mean_sq.sum()), self.sampling_rate))
+
+
+def rolling_drift_bandwidth(
+    prototypes: np.ndarray,
+    window: int,
+    per_cluster: bool = False,
+    sampling_rate: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Vectorized trailing-window drift bandwidth series for backfills.
+
+    Element ``t - 1`` equals :func:`compute_drift_bandwidth` on prototypes
+    ``max(0, t - window + 1) .. t`` (flattened over clusters), computed from
+    cumulative sums of squared first differences.
+
+    Args:
+        prototypes: Array of shape (n_timepoints, n_features) or
+                   (n_timepoints, k, n_features)
+        window: Number of trailing prototypes (>= 2) in each window
+        per_cluster: Return shape (n_timepoints - 1, k) instead of a series
+        sampling_rate: Optional sampling rate for scaling (default: 1.0)
+
+    Returns:
+        Bandwidth after each new prototype, starting from the second one
+    """
+    history = _as_clusters(np.asarray(prototypes, dtype=float))
+    if history.shape[0] < 2:
+        raise ValueError("Need at least 2 timepoints to compute drift")
+    if window < 2:
+        raise ValueError("Window must span at least 2 timepoints")
+
+    steps = np.sum(np.diff(history, axis=0) ** 2, axis=2)
+    csum = np.concatenate([np.zeros((1, steps.shape[1])), np.cumsum(steps, axis=0)])
+    upper = np.arange(1, steps.shape[0] + 1)
+    lower = np.maximum(upper - (window - 1), 0)
+    window_sum = np.maximum(csum[upper] - csum[lower], 0.0)
+    counts = (upper - lower)[:, None]
+    if per_cluster:
+        return _scale(np.sqrt(window_sum / counts), sampling_rate)
+    return _scale(np.sqrt(window_sum.sum(axis=1) / counts[:, 0]), sampling_rate)
+
+
 def _self_test():
     """Minimal self-test for drift bandwidth computation."""
     # Test case 1: Stable prototypes (no drift)
@@ -105,6 +244,34 @@ def _self_test():
     except ValueError as e:
         print(f"Test 5 - Error handling (single): {e}")
 
+    # Test case 6: Incremental tracker over k × d prototypes matches batch
+    history = np.cumsum(np.random.randn(60, 3, 4), axis=0)
+    tracker = DriftBandwidthTracker()
+    for prototype in history:
+        value = tracker.update(prototype)
+    expected = compute_drift_bandwidth(history.reshape(len(history), -1))
+    assert abs(value - expected) < 1e-9, "Tracker must match batch bandwidth"
+    per_cluster = DriftBandwidthTracker(per_cluster=True)
+    for prototype in history:
+        per_value = per_cluster.update(prototype)
+    assert per_value.shape == (3,), "Per-cluster output has one value per cluster"
+    assert abs(per_value[1] - compute_drift_bandwidth(history[:, 1, :])) < 1e-9
+    print(f"Test 6 - Incremental k×d tracker: bandwidth = {value:.6f}")
+
+    # Test case 7: Windowed tracker and rolling series match batch windows
+    window = 10
+    windowed = DriftBandwidthTracker(window=window)
+    streamed = [windowed.update(prototype) for prototype in history][1:]
+    series = rolling_drift_bandwidth(history, window)
+    flat = history.reshape(len(history), -1)
+    batch = [
+        compute_drift_bandwidth(flat[max(0, t - window + 1) : t + 1])
+        for t in range(1, len(flat))
+    ]
+    assert np.allclose(streamed, batch), "Windowed tracker must match batch"
+    assert np.allclose(series, batch), "Rolling series must match batch"
+    print(f"Test 7 - Rolling window: last = {series[-1]:.6f}")
+
     print("✓ All self-tests passed")
 
 
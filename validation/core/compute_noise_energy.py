@@ -5,6 +5,8 @@ This metric calculates a normalized variance-energy metric for low clarity inter
 used to assess stability of model predictions during uncertain states.
 """
 
+from typing import Tuple
+
 import numpy as np
 
 
@@ -63,6 +65,216 @@ def compute_noise_energy(
     return float(np.clip(noise_energy, 0.0, 1.0))
 
 
+def _noise_energy_from_moments(
+    low_n: float, low_m2: float, total_n: float, total_m2: float
+) -> float:
+    """Apply the batch normalisation rules to (count, M2) moments."""
+    if low_n == 0:
+        return 0.0
+    low_clarity_variance = low_m2 / (low_n - 1) if low_n > 1 else 0.0
+    total_variance = total_m2 / (total_n - 1) if total_n > 1 else 1.0
+    if total_variance < 1e-10:
+        return 0.0
+    return float(np.clip(low_clarity_variance / total_variance, 0.0, 1.0))
+
+
+def _combine_moments(
+    a: Tuple[float, float, float], b: Tuple[float, float, float]
+) -> Tuple[float, float, float]:
+    """Merge (count, mean, M2) moments with Chan's parallel update."""
+    n_a, mean_a, m2_a = a
+    n_b, mean_b, m2_b = b
+    if n_b == 0:
+        return a
+    if n_a == 0:
+        return b
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta * delta * n_a * n_b / n
+    return n, mean, m2
+
+
+def _chunk_moments(values: np.ndarray) -> Tuple[float, float, float]:
+    if values.size == 0:
+        return 0.0, 0.0, 0.0
+    mean = float(values.mean())
+    return float(values.size), mean, float(np.sum((values - mean) ** 2))
+
+
+class NoiseEnergyAccumulator:
+    """
+    Single-pass, mergeable noise energy over arbitrarily many chunks.
+
+    Tracks Welford moments of the low-clarity predictions and of all predictions
+    in one pass per chunk. Accumulators built on different shards can be combined
+    with :meth:`merge`; :meth:`value` matches :func:`compute_noise_energy` on the
+    concatenated inputs up to floating-point rounding.
+
+    Args:
+        clarity_threshold: Threshold below which clarity is considered low
+    """
+
+    def __init__(self, clarity_threshold: float = 0.55):
+        self.clarity_threshold = clarity_threshold
+        self._low = (0.0, 0.0, 0.0)
+        self._total = (0.0, 0.0, 0.0)
+
+    @property
+    def count(self) -> int:
+        return int(self._total[0])
+
+    def update(
+        self, clarity_chunk: np.ndarray, pred_chunk: np.ndarray
+    ) -> "NoiseEnergyAccumulator":
+        clarity_chunk = np.asarray(clarity_chunk)
+        pred_chunk = np.asarray(pred_chunk, dtype=float)
+        if len(clarity_chunk) != len(pred_chunk):
+            raise ValueError("Clarity and predictions must have same length")
+        low_mask = clarity_chunk < self.clarity_threshold
+        self._low = _combine_moments(self._low, _chunk_moments(pred_chunk[low_mask]))
+        self._total = _combine_moments(self._total, _chunk_moments(pred_chunk))
+        return self
+
+    def merge(self, other: "NoiseEnergyAccumulator") -> "NoiseEnergyAccumulator":
+        if other.clarity_threshold != self.clarity_threshold:
+            raise ValueError("Cannot merge accumulators with different thresholds")
+        self._low = _combine_moments(self._low, other._low)
+        self._total = _combine_moments(self._total, other._total)
+        return self
+
+    def value(self) -> float:
+        if self._total[0] == 0:
+            raise ValueError("Input arrays cannot be empty")
+        return _noise_energy_from_moments(
+            self._low[0], self._low[2], self._total[0], self._total[2]
+        )
+
+
+class RollingNoiseEnergy:
+    """
+    Noise energy over the trailing ``window`` samples with O(1) updates.
+
+    Samples enter and leave the low-clarity and total moments through add/remove
+    Welford steps; a ring buffer remembers what has to be removed.
+
+    Args:
+        window: Number of trailing samples in the evaluation window
+        clarity_threshold: Threshold below which clarity is considered low
+    """
+
+    def __init__(self, window: int, clarity_threshold: float = 0.55):
+        if window < 1:
+            raise ValueError("Window must be at least 1")
+        self.window = window
+        self.clarity_threshold = clarity_threshold
+        self._clarity = np.zeros(window)
+        self._pred = np.zeros(window)
+        self._head = 0
+        self._filled = 0
+        self._low = [0, 0.0, 0.0]
+        self._total = [0, 0.0, 0.0]
+
+    @staticmethod
+    def _add(moments: list, x: float) -> None:
+        moments[0] += 1
+        delta = x - moments[1]
+        moments[1] += delta / moments[0]
+        moments[2] += delta * (x - moments[1])
+
+    @staticmethod
+    def _remove(moments: list, x: float) -> None:
+        if moments[0] <= 1:
+            moments[:] = [0, 0.0, 0.0]
+            return
+        delta = x - moments[1]
+        moments[1] -= delta / (moments[0] - 1)
+        moments[2] = max(moments[2] - delta * (x - moments[1]), 0.0)
+        moments[0] -= 1
+
+    def update(self, clarity: float, prediction: float) -> float:
+        """Add one sample, evict the oldest if the window is full, return value."""
+        if self._filled == self.window:
+            old_c = self._clarity[self._head]
+            old_p = self._pred[self._head]
+            if old_c < self.clarity_threshold:
+                self._remove(self._low, old_p)
+            self._remove(self._total, old_p)
+        else:
+            self._filled += 1
+        self._clarity[self._head] = clarity
+        self._pred[self._head] = prediction
+        self._head = (self._head + 1) % self.window
+        if clarity < self.clarity_threshold:
+            self._add(self._low, prediction)
+        self._add(self._total, prediction)
+        return self.value()
+
+    def value(self) -> float:
+        if self._total[0] == 0:
+            raise ValueError("Input arrays cannot be empty")
+        return _noise_energy_from_moments(
+            self._low[0], self._low[2], self._total[0], self._total[2]
+        )
+
+
+def rolling_noise_energy(
+    clarity: np.ndarray,
+    predictions: np.ndarray,
+    window: int,
+    clarity_threshold: float = 0.55,
+) -> np.ndarray:
+    """
+    Vectorized trailing-window noise energy for backfills.
+
+    Element ``t`` equals :func:`compute_noise_energy` on the samples
+    ``max(0, t - window + 1) .. t``, computed from windowed cumulative sums of
+    mean-centred predictions instead of one call per window.
+
+    Args:
+        clarity: Array of clarity scores (0 to 1 scale)
+        predictions: Array of prediction values
+        window: Number of trailing samples in the evaluation window
+        clarity_threshold: Threshold below which clarity is considered low
+
+    Returns:
+        Array of noise energy scores, one per input sample
+    """
+    clarity = np.asarray(clarity)
+    predictions = np.asarray(predictions, dtype=float)
+    if len(clarity) != len(predictions):
+        raise ValueError("Clarity and predictions must have same length")
+    if window < 1:
+        raise ValueError("Window must be at least 1")
+    if len(predictions) == 0:
+        return np.zeros(0)
+
+    centred = predictions - predictions.mean()
+    low = (clarity < clarity_threshold).astype(float)
+
+    def windowed(values: np.ndarray) -> np.ndarray:
+        csum = np.concatenate([[0.0], np.cumsum(values)])
+        upper = np.arange(1, len(values) + 1)
+        lower = np.maximum(upper - window, 0)
+        return csum[upper] - csum[lower]
+
+    total_n = windowed(np.ones_like(centred))
+    total_s1 = windowed(centred)
+    total_s2 = windowed(centred**2)
+    low_n = windowed(low)
+    low_s1 = windowed(low * centred)
+    low_s2 = windowed(low * centred**2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_m2 = np.maximum(total_s2 - total_s1**2 / total_n, 0.0)
+        low_m2 = np.maximum(low_s2 - np.where(low_n > 0, low_s1**2 / low_n, 0.0), 0.0)
+        low_var = np.where(low_n > 1, low_m2 / (low_n - 1), 0.0)
+        total_var = np.where(total_n > 1, total_m2 / (total_n - 1), 1.0)
+        energy = np.where(total_var < 1e-10, 0.0, low_var / total_var)
+    energy = np.where(np.rint(low_n) == 0, 0.0, energy)
+    return np.clip(energy, 0.0, 1.0)
+
+
 def _self_test():
     """Minimal self-test for noise energy computation."""
     # Test case 1: Stable predictions with low clarity
@@ -94,6 +306,38 @@ def _self_test():
     except ValueError as e:
         print(f"Test 4 - Error handling: {e}")
 
+    # Test case 5: Chunked + merged accumulators match the batch function
+    np.random.seed(42)
+    clarity = np.random.rand(1000)
+    predictions = 0.8 * clarity + 0.2 * np.random.rand(1000)
+    expected = compute_noise_energy(clarity, predictions)
+    left = NoiseEnergyAccumulator()
+    for start in range(0, 600, 128):
+        stop = min(start + 128, 600)
+        left.update(clarity[start:stop], predictions[start:stop])
+    right = NoiseEnergyAccumulator().update(clarity[600:], predictions[600:])
+    merged = left.merge(right).value()
+    assert abs(merged - expected) < 1e-12, "Merged accumulator must match batch"
+    print(f"Test 5 - Accumulator merge: {merged:.6f} vs batch {expected:.6f}")
+
+    # Test case 6: Rolling window (O(1) updates and vectorized) match batch
+    window = 50
+    rolling = RollingNoiseEnergy(window)
+    streamed = np.array([rolling.update(c, p) for c, p in zip(clarity, predictions)])
+    vectorized = rolling_noise_energy(clarity, predictions, window)
+    batch = np.array(
+        [
+            compute_noise_energy(
+                clarity[max(0, t - window + 1) : t + 1],
+                predictions[max(0, t - window + 1) : t + 1],
+            )
+            for t in range(len(clarity))
+        ]
+    )
+    assert np.allclose(streamed, batch, atol=1e-9), "Rolling updates must match"
+    assert np.allclose(vectorized, batch, atol=1e-9), "Rolling series must match"
+    print(f"Test 6 - Rolling window: last = {streamed[-1]:.6f}")
+
     print("✓ All self-tests passed")
 
 
@@ -0,0 +1,509 @@
+"""
+Compiled evaluator for governance/RULES_validation.yaml.
+
+Condition strings such as ``"prototype_drift <= 0.12"`` are parsed once with
+``ast`` and checked against a whitelist (metric names, numeric literals,
+comparisons, ``and``/``or``/``not`` and arithmetic); anything else is rejected.
+Each accepted condition is compiled twice: a scalar callable over a metrics
+mapping and a vectorised callable over a table of metric arrays, where boolean
+operators become ``np.logical_and``/``logical_or``/``logical_not`` and chained
+comparisons are split. Compiled rule sets are cached by the SHA-256 of the rules
+file; every ``load_rules`` call gets its own copy with a fresh handler table.
+"""
+
+import ast
+import copy
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional
+
+import numpy as np
+import yaml
+
+from .run_store import METRIC_COLUMNS
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_RULES = Path("governance/RULES_validation.yaml")
+# Most to least disruptive; the report's next_action is the first one triggered.
+NEXT_ACTION_PRIORITY = ("halt", "await_approval", "continue_with_warning", "continue")
+
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.UnaryOp,
+    ast.Not,
+    ast.USub,
+    ast.UAdd,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.Compare,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+    ast.Eq,
+    ast.NotEq,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+)
+# Names starting with "_" are never metrics (see _parse_condition), so the
+# vectorised code can call these without colliding with a metric lookup.
+_GLOBALS: Dict[str, Any] = {
+    "__builtins__": {},
+    "_and": np.logical_and,
+    "_or": np.logical_or,
+    "_not": np.logical_not,
+}
+_CACHE: Dict[str, "RuleSet"] = {}
+
+
+class RuleSyntaxError(ValueError):
+    """Raised when a condition uses syntax outside the rule whitelist."""
+
+
+def _parse_condition(expression: str) -> ast.Expression:
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as exc:
+        raise RuleSyntaxError(f"Invalid condition {expression!r}: {exc.msg}") from exc
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise RuleSyntaxError(
+                f"Disallowed syntax {type(node).__name__} in {expression!r}"
+            )
+        if isinstance(node, ast.Constant) and (
+            isinstance(node.value, bool) or not isinstance(node.value, (int, float))
+        ):
+            raise RuleSyntaxError(f"Only numeric literals allowed in {expression!r}")
+        if isinstance(node, ast.Name) and node.id.startswith("_"):
+            raise RuleSyntaxError(f"Invalid metric name {node.id!r} in {expression!r}")
+    return tree
+
+
+def _call(func: str, *args: ast.expr) -> ast.Call:
+    return ast.Call(
+        func=ast.Name(id=func, ctx=ast.Load()), args=list(args), keywords=[]
+    )
+
+
+class _Vectorise(ast.NodeTransformer):
+    """Rewrite boolean logic into elementwise NumPy logical functions."""
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.AST:
+        self.generic_visit(node)
+        func = "_and" if isinstance(node.op, ast.And) else "_or"
+        result = node.values[0]
+        for value in node.values[1:]:
+            result = _call(func, result, value)
+        return result
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return _call("_not", node.operand)
+        return node
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        self.generic_visit(node)
+        if len(node.ops) == 1:
+            return node
+        left = node.left
+        parts = []
+        for op, right in zip(node.ops, node.comparators):
+            parts.append(ast.Compare(left=left, ops=[op], comparators=[right]))
+            left = right
+        result: ast.expr = parts[0]
+        for part in parts[1:]:
+            result = _call("_and", result, part)
+        return result
+
+
+class _BindMetrics(ast.NodeTransformer):
+    """Turn metric names into lookups on the ``m`` argument."""
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in _GLOBALS:
+            return node
+        return ast.Subscript(
+            value=ast.Name(id="m", ctx=ast.Load()),
+            slice=ast.Constant(value=node.id),
+            ctx=ast.Load(),
+        )
+
+
+def _to_callable(body: ast.expr, label: str) -> Callable[[Mapping[str, Any]], Any]:
+    body = _BindMetrics().visit(body)
+    func = ast.Expression(
+        body=ast.Lambda(
+            args=ast.arguments(
+                posonlyargs=[],
+                args=[ast.arg(arg="m")],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            ),
+            body=body,
+        )
+    )
+    ast.fix_missing_locations(func)
+    return eval(compile(func, f"<rule {label}>", "eval"), dict(_GLOBALS))
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    """A validated condition with scalar and vectorised callables."""
+
+    expression: str
+    names: FrozenSet[str]
+    scalar: Callable[[Mapping[str, Any]], Any]
+    vector: Callable[[Mapping[str, Any]], Any]
+
+
+def compile_condition(expression: str, label: str = "condition") -> CompiledCondition:
+    """
+    Parse and compile a rule condition.
+
+    Args:
+        expression: Condition string, e.g. ``"ece <= 0.08"``
+        label: Name used in tracebacks from the compiled code
+
+    Returns:
+        CompiledCondition with the referenced metric names and both callables
+
+    Raises:
+        RuleSyntaxError: If the expression is not valid whitelisted syntax
+    """
+    tree = _parse_condition(expression)
+    names = frozenset(n.id for n in ast.walk(tree) if isinstance(n, ast.Name))
+    vector_tree = _Vectorise().visit(_parse_condition(expression))
+    return CompiledCondition(
+        expression=expression,
+        names=names,
+        scalar=_to_callable(tree.body, label),
+        vector=_to_callable(vector_tree.body, label),
+    )
+
+
+@dataclass(frozen=True)
+class Rule:
+    rule_id: str
+    group: str
+    name: str
+    condition: CompiledCondition
+    action: str
+    failure_action: str
+    severity: str
+    message: str
+
+
+@dataclass
+class RuleResult:
+    rule_id: str
+    status: str  # "pass" | "fail" | "skipped"
+    action: Optional[str]
+    severity: str
+    message: str
+    missing: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RuleReport:
+    results: List[RuleResult]
+    next_action: str
+
+    @property
+    def failed(self) -> List[RuleResult]:
+        return [r for r in self.results if r.status == "fail"]
+
+    @property
+    def skipped(self) -> List[RuleResult]:
+        return [r for r in self.results if r.status == "skipped"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "next_action": self.next_action,
+            "results": [vars(r) for r in self.results],
+        }
+
+
+def _log_warning(rule: Rule, metrics: Mapping[str, Any]) -> None:
+    LOGGER.warning("%s %s: %s", rule.rule_id, rule.name, rule.message)
+
+
+def _log_error(rule: Rule, metrics: Mapping[str, Any]) -> None:
+    LOGGER.error(
+        "%s %s (%s): %s", rule.rule_id, rule.name, rule.failure_action, rule.message
+    )
+
+
+class RuleSet:
+    """Compiled rules in ``execution_order`` plus failure-action dispatch."""
+
+    def __init__(self, payload: Mapping[str, Any], digest: str = "") -> None:
+        self.digest = digest
+        self.actions: Dict[str, Mapping[str, Any]] = dict(payload.get("actions") or {})
+        self.rules: List[Rule] = []
+        order = payload.get("execution_order") or [
+            key for key, value in payload.items() if key.endswith(("_gates", "_rules"))
+        ]
+        for group in order:
+            for rule_id, spec in (payload.get(group) or {}).items():
+                self.rules.append(self._compile_rule(group, rule_id, spec))
+        self.handlers: Dict[str, Callable[[Rule, Mapping[str, Any]], None]] = {
+            "log_warning": _log_warning,
+            "require_review": _log_error,
+            "block_release": _log_error,
+        }
+
+    @staticmethod
+    def _compile_rule(group: str, rule_id: str, spec: Mapping[str, Any]) -> Rule:
+        if "conditions" in spec:
+            operator = str(spec.get("operator", "AND")).upper()
+            if operator not in ("AND", "OR"):
+                raise RuleSyntaxError(f"{rule_id}: unknown operator {operator!r}")
+            joiner = " and " if operator == "AND" else " or "
+            expression = joiner.join(f"({c})" for c in spec["conditions"])
+        else:
+            expression = spec["condition"]
+        return Rule(
+            rule_id=rule_id,
+            group=group,
+            name=spec.get("name", rule_id),
+            condition=compile_condition(expression, rule_id),
+            action=spec.get("action", "pass"),
+            failure_action=spec.get("failure_action", "log_warning"),
+            severity=spec.get("severity", "warning"),
+            message=spec.get("message", ""),
+        )
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def copy(self) -> "RuleSet":
+        """The same compiled rules with independent actions and handlers."""
+
+        clone = copy.copy(self)
+        clone.actions = dict(self.actions)
+        clone.rules = list(self.rules)
+        clone.handlers = dict(self.handlers)
+        return clone
+
+    def register_handler(
+        self, action: str, handler: Callable[[Rule, Mapping[str, Any]], None]
+    ) -> None:
+        """Dispatch failed rules with ``action`` to ``handler`` on this instance."""
+
+        self.handlers[action] = handler
+
+    def _next_action(self, action: str) -> str:
+        return self.actions.get(action, {}).get("next_action", "continue")
+
+    def evaluate(self, metrics: Mapping[str, Any], dispatch: bool = True) -> RuleReport:
+        """
+        Evaluate every rule against one metrics mapping.
+
+        Args:
+            metrics: Flat metric name -> value mapping (see ``flatten_metrics``)
+            dispatch: Call the registered handler for each failed rule's action
+
+        Returns:
+            RuleReport with per-rule status and the most disruptive next action
+        """
+        results = []
+        triggered = set()
+        for rule in self.rules:
+            missing = rule.condition.names.difference(metrics)
+            if missing:
+                results.append(
+                    RuleResult(
+                        rule.rule_id,
+                        "skipped",
+                        None,
+                        rule.severity,
+                        rule.message,
+                        sorted(missing),
+                    )
+                )
+                continue
+            if rule.condition.scalar(metrics):
+                results.append(
+                    RuleResult(rule.rule_id, "pass", rule.action, rule.severity, "")
+                )
+                triggered.add(self._next_action(rule.action))
+                continue
+            results.append(
+                RuleResult(
+                    rule.rule_id,
+                    "fail",
+                    rule.failure_action,
+                    rule.severity,
+                    rule.message,
+                )
+            )
+            triggered.add(self._next_action(rule.failure_action))
+            if dispatch:
+                handler = self.handlers.get(rule.failure_action)
+                if handler is not None:
+                    handler(rule, metrics)
+        next_action = next(
+            (a for a in NEXT_ACTION_PRIORITY if a in triggered), "continue"
+        )
+        return RuleReport(results=results, next_action=next_action)
+
+    def evaluate_table(self, table: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Evaluate every rule over columns of metrics.
+
+        Args:
+            table: Metric name -> array of per-run values (e.g. RunStore.columns())
+
+        Returns:
+            Rule id -> boolean pass mask; rules with missing metrics are omitted
+        """
+        lengths = {len(np.asarray(v)) for v in table.values()}
+        if len(lengths) > 1:
+            raise ValueError("All metric columns must have the same length")
+        n_rows = lengths.pop() if lengths else 0
+        columns = {k: np.asarray(v, dtype=float) for k, v in table.items()}
+        masks: Dict[str, np.ndarray] = {}
+        for rule in self.rules:
+            if rule.condition.names.difference(columns):
+                continue
+            mask = np.asarray(rule.condition.vector(columns), dtype=bool)
+            masks[rule.rule_id] = np.broadcast_to(mask, (n_rows,))
+        return masks
+
+
+def flatten_metrics(metrics: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Flatten an aggregator/run-record metrics dict to rule metric names.
+
+    Nested sections map through ``run_store.METRIC_COLUMNS`` (``noise.energy`` ->
+    ``noise_energy``); top-level scalars pass through unchanged.
+    """
+    flat = {k: v for k, v in metrics.items() if isinstance(v, (int, float, np.number))}
+    for column, (section, key) in METRIC_COLUMNS.items():
+        block = metrics.get(section)
+        if isinstance(block, Mapping) and block.get(key) is not None:
+            flat[column] = float(block[key])
+    return flat
+
+
+def load_rules(path: Path = DEFAULT_RULES) -> RuleSet:
+    """
+    Load and compile a rules file, reusing the compiled set while its hash matches.
+
+    Args:
+        path: Rules YAML path
+
+    Returns:
+        Compiled RuleSet; a copy of the cached one, so handlers registered on it
+        do not leak to other callers
+
+    Raises:
+        FileNotFoundError: If the rules file does not exist
+    """
+    raw = Path(path).read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    rules = _CACHE.get(digest)
+    if rules is None:
+        rules = RuleSet(yaml.safe_load(raw) or {}, digest)
+        _CACHE[digest] = rules
+    return rules.copy()
+
+
+def _self_test():
+    """Minimal self-test for the rule engine."""
+    import timeit
+
+    # Test case 1: Scalar and vectorised callables agree, chained compares split
+    cond = compile_condition("0.1 <= abstain_rate <= 0.25 and not ece > 0.08")
+    rows = {
+        "abstain_rate": np.array([0.05, 0.15, 0.2, 0.3]),
+        "ece": np.array([0.01, 0.09, 0.05, 0.01]),
+    }
+    vector = cond.vector(rows)
+    scalar = [cond.scalar({k: float(v[i]) for k, v in rows.items()}) for i in range(4)]
+    assert vector.tolist() == scalar == [False, False, True, False]
+    negated = compile_condition("not ece").vector({"ece": rows["ece"]})
+    assert negated.tolist() == [False] * 4, "not on float operands"
+    print(f"Test 1 - Scalar/vector agree: {vector.tolist()}")
+
+    # Test case 2: Unsafe syntax is rejected
+    for bad in ("__import__('os')", "ece.real > 0", "ece[0] > 1", "'a' == ece"):
+        try:
+            compile_condition(bad)
+            assert False, f"Should reject {bad!r}"
+        except RuleSyntaxError:
+            pass
+    print("Test 2 - Unsafe expressions rejected")
+
+    # Test case 3: Governance rules evaluate, skip missing metrics, dispatch
+    rules = load_rules()
+    assert load_rules().rules[0] is rules.rules[0], "Compiled rules cached by hash"
+    fired = []
+    rules.register_handler("block_release", lambda rule, m: fired.append(rule.rule_id))
+    rules.register_handler("log_warning", lambda rule, m: None)
+    rules.register_handler("require_review", lambda rule, m: None)
+    metrics = flatten_metrics(
+        {"noise": {"energy": 0.35}, "calibration": {"ece": 0.05, "brier": 0.2}}
+    )
+    report = rules.evaluate(metrics)
+    statuses = {r.rule_id: r.status for r in report.results}
+    assert statuses["STAB-002"] == "fail" and statuses["STAB-001"] == "skipped"
+    assert statuses["CAL-001"] == "pass" and statuses["COMP-002"] == "fail"
+    assert report.next_action == "halt" and "CAL-004" in fired
+    assert load_rules().handlers["block_release"] is _log_error, "Handlers leaked"
+    print(f"Test 3 - next_action={report.next_action}, fired={fired}")
+
+    # Test case 4: Table evaluation matches per-row evaluation
+    rng = np.random.default_rng(0)
+    table = {
+        "noise_energy": rng.uniform(0.2, 0.4, 50),
+        "ece": rng.uniform(0.0, 0.1, 50),
+        "brier": rng.uniform(0.1, 0.2, 50),
+    }
+    masks = rules.evaluate_table(table)
+    for i in (0, 17, 49):
+        row = {k: float(v[i]) for k, v in table.items()}
+        per_row = rules.evaluate(row, dispatch=False).results
+        for result in per_row:
+            if result.status != "skipped":
+                assert masks[result.rule_id][i] == (result.status == "pass")
+    print(f"Test 4 - Table masks for {len(masks)} rules match scalar evaluation")
+
+    # Test case 5: Live tick latency
+    tick = {c: 0.05 for c in METRIC_COLUMNS}
+    tick.update(stability_index=0.7, prototype_drift=0.1, abstain_rate=0.15)
+    tick.update(transition_hit_ratio=0.7)
+    n = 2000
+    seconds = timeit.timeit(lambda: rules.evaluate(tick, dispatch=False), number=n)
+    print(f"Test 5 - {len(rules)} rules per tick: {seconds / n * 1e6:.1f} us")
+
+    print("\n✓ All self-tests passed")
+
+
+__all__ = [
+    "CompiledCondition",
+    "Rule",
+    "RuleReport",
+    "RuleResult",
+    "RuleSet",
+    "RuleSyntaxError",
+    "compile_condition",
+    "flatten_metrics",
+    "load_rules",
+]
+
+
+if __name__ == "__main__":
+    _self_test()
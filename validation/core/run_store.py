@@ -0,0 +1,358 @@
+"""Indexed local store for validation run records.
+
+Run files under ``validation/runs/**/*.json`` are ingested incrementally into SQLite:
+only files whose size or mtime changed since the last ingest are parsed. Metrics are
+stored as typed columns and queried by time range, symbol and model version with an
+explicit aggregation policy instead of "last file wins". Bootstrap intervals written
+by the runner (``<key>_ci`` = [lower, upper]) are stored as ``<column>_lo``/``_hi``
+and aggregated with the same policies by ``aggregate_bounds``.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# column -> (section, key) inside a run record
+METRIC_COLUMNS: Dict[str, Tuple[str, str]] = {
+    "clarity_spectrum_power": ("clarity", "spectrum_power"),
+    "noise_energy": ("noise", "energy"),
+    "drift_bandwidth": ("drift", "bandwidth"),
+    "adversarial_gap": ("adversarial", "gap"),
+    "adversarial_flip_rate": ("adversarial", "flip_rate"),
+    "ece": ("calibration", "ece"),
+    "brier": ("calibration", "brier"),
+}
+# Direction of "worse" per metric, matching the gate operators in
+# governance/CONTROL_switch_policy.yaml (>= gates worsen downwards).
+WORST_CASE: Dict[str, str] = {
+    "clarity_spectrum_power": "MIN",
+    "noise_energy": "MAX",
+    "drift_bandwidth": "MAX",
+    "adversarial_gap": "MAX",
+    "adversarial_flip_rate": "MAX",
+    "ece": "MAX",
+    "brier": "MAX",
+}
+# column -> (lower, upper) interval columns, filled from "<key>_ci" in a run record
+INTERVAL_COLUMNS: Dict[str, Tuple[str, str]] = {
+    column: (f"{column}_lo", f"{column}_hi") for column in METRIC_COLUMNS
+}
+_VALUE_COLUMNS = list(METRIC_COLUMNS) + [
+    col for pair in INTERVAL_COLUMNS.values() for col in pair
+]
+AGGREGATIONS = ("latest", "mean", "worst")
+DEFAULT_STORE = Path("validation/.runs_index.sqlite")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    valid INTEGER NOT NULL,
+    symbol TEXT,
+    model_version TEXT,
+    ts TEXT,
+    {", ".join(f"{col} REAL" for col in _VALUE_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS idx_runs_ts ON runs(ts);
+CREATE INDEX IF NOT EXISTS idx_runs_symbol_ts ON runs(symbol, ts);
+CREATE INDEX IF NOT EXISTS idx_runs_model_ts ON runs(model_version, ts);
+"""
+
+
+@dataclass
+class IngestStats:
+    scanned: int = 0
+    parsed: int = 0
+    unchanged: int = 0
+    invalid: int = 0
+    removed: int = 0
+
+
+def _normalise_ts(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    if not text:
+        return None
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+def _safe_float(value: Any) -> Optional[float]:
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if result != result else result
+
+
+def _parse_record(path: Path, mtime_ns: int) -> Optional[Dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if not isinstance(data, dict):
+        return None
+    row: Dict[str, Any] = {
+        "symbol": data.get("symbol"),
+        "model_version": data.get("model_version"),
+        "ts": _normalise_ts(data.get("timestamp_utc") or data.get("date"))
+        or datetime.fromtimestamp(mtime_ns / 1e9, timezone.utc).isoformat(),
+    }
+    for column, (section, key) in METRIC_COLUMNS.items():
+        block = data.get(section)
+        if not isinstance(block, dict):
+            block = {}
+        row[column] = _safe_float(block.get(key))
+        interval = block.get(f"{key}_ci")
+        if not (isinstance(interval, (list, tuple)) and len(interval) == 2):
+            interval = (None, None)
+        lower, upper = INTERVAL_COLUMNS[column]
+        row[lower], row[upper] = _safe_float(interval[0]), _safe_float(interval[1])
+    return row
+
+
+class RunStore:
+    """SQLite-backed index of validation run records."""
+
+    def __init__(self, path: Path = DEFAULT_STORE) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.executescript(_SCHEMA)
+        self._add_metric_columns()
+
+    def _add_metric_columns(self) -> None:
+        """Add metric columns missing from an older index and force a re-ingest."""
+
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(runs)")}
+        missing = [col for col in _VALUE_COLUMNS if col not in existing]
+        if not missing:
+            return
+        with self._conn:
+            for column in missing:
+                self._conn.execute(f"ALTER TABLE runs ADD COLUMN {column} REAL")
+            # stored rows predate the new columns; re-parse them on the next ingest
+            self._conn.execute("UPDATE runs SET mtime_ns = -1")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "RunStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @staticmethod
+    def _scan(runs_dir: Path) -> Iterator[Tuple[str, int, int]]:
+        stack = [str(runs_dir)]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".json") and entry.is_file():
+                        stat = entry.stat()
+                        yield entry.path, stat.st_size, stat.st_mtime_ns
+
+    def ingest(self, runs_dir: Path) -> IngestStats:
+        """Parse new or modified run files and drop rows for deleted ones."""
+
+        stats = IngestStats()
+        known = {
+            path: (size, mtime)
+            for path, size, mtime in self._conn.execute(
+                "SELECT path, size, mtime_ns FROM runs"
+            )
+        }
+        seen = set()
+        columns = ["path", "size", "mtime_ns", "valid", "symbol", "model_version", "ts"]
+        columns += _VALUE_COLUMNS
+        upsert = (
+            f"INSERT OR REPLACE INTO runs ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})"
+        )
+        batch: List[Tuple[Any, ...]] = []
+        if Path(runs_dir).exists():
+            for path, size, mtime_ns in self._scan(Path(runs_dir)):
+                stats.scanned += 1
+                seen.add(path)
+                if known.get(path) == (size, mtime_ns):
+                    stats.unchanged += 1
+                    continue
+                record = _parse_record(Path(path), mtime_ns)
+                if record is None:
+                    stats.invalid += 1
+                    record = {col: None for col in columns[4:]}
+                    valid = 0
+                else:
+                    stats.parsed += 1
+                    valid = 1
+                batch.append(
+                    (path, size, mtime_ns, valid)
+                    + tuple(record[c] for c in columns[4:])
+                )
+        removed = [(path,) for path in known if path not in seen]
+        stats.removed = len(removed)
+        with self._conn:
+            self._conn.executemany(upsert, batch)
+            self._conn.executemany("DELETE FROM runs WHERE path = ?", removed)
+        return stats
+
+    @staticmethod
+    def _where(
+        start: Optional[str],
+        end: Optional[str],
+        symbol: Optional[str],
+        model_version: Optional[str],
+    ) -> Tuple[str, List[Any]]:
+        clauses = ["valid = 1"]
+        params: List[Any] = []
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(_normalise_ts(start))
+        if end is not None:
+            clauses.append("ts <= ?")
+            params.append(_normalise_ts(end))
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if model_version is not None:
+            clauses.append("model_version = ?")
+            params.append(model_version)
+        return " AND ".join(clauses), params
+
+    def query(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        symbol: Optional[str] = None,
+        model_version: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        where, params = self._where(start, end, symbol, model_version)
+        cursor = self._conn.execute(
+            f"SELECT path, symbol, model_version, ts, {', '.join(METRIC_COLUMNS)} "
+            f"FROM runs WHERE {where} ORDER BY ts, mtime_ns, path",
+            params,
+        )
+        names = [d[0] for d in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+
+    def columns(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        symbol: Optional[str] = None,
+        model_version: Optional[str] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Metric columns as float arrays (NaN where missing), oldest run first."""
+
+        rows = self.query(start, end, symbol, model_version)
+        return {
+            column: np.array(
+                [np.nan if r[column] is None else r[column] for r in rows], dtype=float
+            )
+            for column in METRIC_COLUMNS
+        }
+
+    def aggregate(
+        self,
+        policy: str = "latest",
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        symbol: Optional[str] = None,
+        model_version: Optional[str] = None,
+    ) -> Dict[str, Optional[float]]:
+        """Aggregate each metric column with ``latest``, ``mean`` or ``worst``."""
+
+        if policy not in AGGREGATIONS:
+            raise ValueError(
+                f"Unknown aggregation {policy!r}; use one of {AGGREGATIONS}"
+            )
+        where, params = self._where(start, end, symbol, model_version)
+        result: Dict[str, Optional[float]] = {}
+        if policy == "latest":
+            for column in METRIC_COLUMNS:
+                row = self._conn.execute(
+                    f"SELECT {column} FROM runs WHERE {where} AND {column} IS NOT NULL "
+                    "ORDER BY ts DESC, mtime_ns DESC, path DESC LIMIT 1",
+                    params,
+                ).fetchone()
+                result[column] = row[0] if row else None
+            return result
+        exprs = [
+            f"AVG({col})" if policy == "mean" else f"{WORST_CASE[col]}({col})"
+            for col in METRIC_COLUMNS
+        ]
+        row = self._conn.execute(
+            f"SELECT {', '.join(exprs)} FROM runs WHERE {where}", params
+        ).fetchone()
+        return dict(zip(METRIC_COLUMNS, row))
+
+    def aggregate_bounds(
+        self,
+        policy: str = "latest",
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        symbol: Optional[str] = None,
+        model_version: Optional[str] = None,
+    ) -> Dict[str, Tuple[float, float]]:
+        """Aggregate each metric's (lower, upper) interval; metrics without one are
+        omitted. ``worst`` takes the lowest lower and highest upper bound."""
+
+        if policy not in AGGREGATIONS:
+            raise ValueError(
+                f"Unknown aggregation {policy!r}; use one of {AGGREGATIONS}"
+            )
+        where, params = self._where(start, end, symbol, model_version)
+        result: Dict[str, Tuple[float, float]] = {}
+        for column, (lower, upper) in INTERVAL_COLUMNS.items():
+            filled = f"{where} AND {lower} IS NOT NULL AND {upper} IS NOT NULL"
+            if policy == "latest":
+                row = self._conn.execute(
+                    f"SELECT {lower}, {upper} FROM runs WHERE {filled} "
+                    "ORDER BY ts DESC, mtime_ns DESC, path DESC LIMIT 1",
+                    params,
+                ).fetchone()
+            else:
+                lo_fn, hi_fn = ("AVG", "AVG") if policy == "mean" else ("MIN", "MAX")
+                row = self._conn.execute(
+                    f"SELECT {lo_fn}({lower}), {hi_fn}({upper}) FROM runs "
+                    f"WHERE {filled}",
+                    params,
+                ).fetchone()
+            if row is not None and row[0] is not None:
+                result[column] = (float(row[0]), float(row[1]))
+        return result
+
+    def count(self) -> int:
+        return int(
+            self._conn.execute("SELECT COUNT(*) FROM runs WHERE valid = 1").fetchone()[
+                0
+            ]
+        )
+
+
+__all__ = [
+    "AGGREGATIONS",
+    "DEFAULT_STORE",
+    "INTERVAL_COLUMNS",
+    "METRIC_COLUMNS",
+    "WORST_CASE",
+    "IngestStats",
+    "RunStore",
+]
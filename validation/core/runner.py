@@ -0,0 +1,443 @@
+"""Compute per-(symbol, date) validation run records in a process pool.
+
+For every partition the runner loads the inference output and the prototype history,
+evaluates noise energy, drift bandwidth, clarity spectrum power, adversarial gap, the
+cluster label flip rate (when centroids match the feature columns) and (when
+``actual_transition`` is present) ECE/Brier, plus block-bootstrap intervals
+(``<metric>_ci``) for the gate metrics, and writes one JSON record to
+``validation/runs/{symbol}/{date}.json``. Records are written atomically as partitions
+finish, so an interrupted run keeps everything completed so far and a re-run only
+recomputes partitions whose inputs are newer than their record.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+import perf
+from model.clusterer_dynamic.fit import _assign_labels
+from model.hmm_tvtp_adaptive.train import _brier_score, _expected_calibration_error
+
+from .bootstrap import (
+    bootstrap_clarity_spectrum_power,
+    bootstrap_drift_bandwidth,
+    bootstrap_ece,
+    bootstrap_noise_energy,
+)
+from .compute_adversarial_gap import (
+    compute_adversarial_gap,
+    compute_model_adversarial_gap,
+)
+from .compute_clarity_spectrum_power import compute_clarity_spectrum_power
+from .compute_drift_bandwidth import compute_drift_bandwidth
+from .compute_noise_energy import compute_noise_energy
+
+LOGGER = logging.getLogger(__name__)
+
+_INFERENCE_COLUMNS = ("transition_prob", "clarity", "actual_transition", "timestamp")
+
+
+@dataclass
+class RunnerConfig:
+    inference_template: str = "output/inference/{symbol}/{date}/inference.parquet"
+    prototypes_template: str = "output/clusterer_dynamic/{symbol}/{date}/prototypes.npy"
+    cluster_artifacts: Path = Path("model/clusterer_dynamic/cluster_artifacts.json")
+    runs_dir: Path = Path("validation/runs")
+    model_version: str = "unknown"
+    feature_columns: List[str] = field(default_factory=list)
+    clarity_threshold: float = 0.55
+    sampling_rate: float = 1.0
+    noise_scale: float = 0.1
+    n_draws: int = 32
+    bootstrap_resamples: int = 200  # 0 disables the ``*_ci`` intervals
+    confidence: float = 0.90  # two-sided, so each side is a 95% one-sided bound
+    seed: int = 0
+    workers: Optional[int] = None
+    overwrite: bool = False
+
+
+@dataclass
+class RunnerReport:
+    partitions: int = 0
+    written: int = 0
+    skipped: int = 0
+    failed: int = 0
+    rows: int = 0
+    elapsed_s: float = 0.0
+    metric_seconds: Dict[str, float] = field(default_factory=dict)
+    failures: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    @property
+    def partitions_per_second(self) -> float:
+        return self.written / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload = asdict(self)
+        payload["rows_per_second"] = self.rows_per_second
+        payload["partitions_per_second"] = self.partitions_per_second
+        return payload
+
+
+def _template_regex(template: str) -> re.Pattern:
+    pattern = re.escape(template)
+    pattern = pattern.replace(re.escape("{symbol}"), r"(?P<symbol>[^/]+)")
+    pattern = pattern.replace(re.escape("{date}"), r"(?P<date>[^/]+)")
+    return re.compile(pattern + "$")
+
+
+def discover_partitions(config: RunnerConfig) -> List[Tuple[str, str]]:
+    """(symbol, date) pairs for which an inference output exists, sorted."""
+
+    template = config.inference_template
+    prefix = template.split("{", 1)[0]
+    root = Path(prefix) if prefix.endswith("/") else Path(prefix).parent
+    matcher = _template_regex(template)
+    found = set()
+    if root.is_dir():
+        for path in root.rglob("*"):
+            match = matcher.search(path.as_posix())
+            if match and path.is_file():
+                found.add((match.group("symbol"), match.group("date")))
+    return sorted(found)
+
+
+def _record_path(config: RunnerConfig, symbol: str, date: str) -> Path:
+    return Path(config.runs_dir) / symbol / f"{date}.json"
+
+
+def _is_stale(config: RunnerConfig, symbol: str, date: str) -> bool:
+    record = _record_path(config, symbol, date)
+    if config.overwrite or not record.exists():
+        return True
+    inputs = [
+        Path(config.inference_template.format(symbol=symbol, date=date)),
+        Path(config.prototypes_template.format(symbol=symbol, date=date)),
+    ]
+    newest = max((p.stat().st_mtime_ns for p in inputs if p.exists()), default=0)
+    return newest > record.stat().st_mtime_ns
+
+
+def _write_json_atomic(path: Path, payload: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _load_inference(path: Path, feature_columns: Sequence[str]) -> pd.DataFrame:
+    available = set(pq.read_schema(path).names)
+    wanted = [c for c in (*_INFERENCE_COLUMNS, *feature_columns) if c in available]
+    missing = {"transition_prob", "clarity"} - available
+    if missing:
+        raise ValueError(f"{path} is missing columns {sorted(missing)}")
+    return pd.read_parquet(path, columns=wanted)
+
+
+def _load_centroids(path: Path) -> Optional[np.ndarray]:
+    if not path.exists():
+        return None
+    centroids = json.loads(path.read_text()).get("centroids")
+    return None if not centroids else np.asarray(centroids, dtype=float)
+
+
+def _partition_timestamp(frame: pd.DataFrame, date: str) -> str:
+    if "timestamp" in frame.columns and len(frame):
+        last = pd.Timestamp(frame["timestamp"].iloc[-1])
+        last = last.tz_localize("UTC") if last.tzinfo is None else last
+        return last.tz_convert("UTC").isoformat()
+    return pd.Timestamp(date, tz="UTC").isoformat()
+
+
+def _partition_seed(seed: int, symbol: str, date: str) -> np.random.SeedSequence:
+    # Keyed by partition rather than position so skipping or reordering partitions
+    # does not change anyone else's draws.
+    return np.random.SeedSequence([seed, zlib.crc32(f"{symbol}/{date}".encode())])
+
+
+def _add_intervals(
+    record: Dict[str, Any],
+    config: RunnerConfig,
+    clarity: np.ndarray,
+    probs: np.ndarray,
+    prototypes: np.ndarray,
+    actual: Optional[np.ndarray],
+    seed: np.random.SeedSequence,
+) -> None:
+    """Write ``<key>_ci`` = [lower, upper] next to each bootstrapped metric."""
+
+    rng = np.random.default_rng(seed)
+    b = config.bootstrap_resamples
+    results = {
+        ("noise", "energy"): bootstrap_noise_energy(
+            clarity, probs, config.clarity_threshold, n_resamples=b, seed=rng
+        ),
+        ("clarity", "spectrum_power"): bootstrap_clarity_spectrum_power(
+            clarity, config.sampling_rate, n_resamples=b, seed=rng
+        ),
+    }
+    if len(prototypes) > 2:
+        results[("drift", "bandwidth")] = bootstrap_drift_bandwidth(
+            prototypes, config.sampling_rate, n_resamples=b, seed=rng
+        )
+    if actual is not None and len(actual):
+        results[("calibration", "ece")] = bootstrap_ece(
+            probs, actual, n_resamples=b, seed=rng
+        )
+    for (section, key), result in results.items():
+        record[section][f"{key}_ci"] = list(result.interval(config.confidence))
+
+
+def evaluate_partition(
+    config: RunnerConfig, symbol: str, date: str
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Compute the run record for one partition plus per-metric wall times."""
+
+    timings: Dict[str, float] = {}
+
+    def timed(name: str, fn):
+        start = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            timings[name] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    frame = _load_inference(
+        Path(config.inference_template.format(symbol=symbol, date=date)),
+        config.feature_columns,
+    )
+    prototypes = np.load(
+        Path(config.prototypes_template.format(symbol=symbol, date=date))
+    )
+    prototypes = prototypes.reshape(prototypes.shape[0], -1)
+    timings["load"] = time.perf_counter() - start
+
+    clarity = frame["clarity"].to_numpy(dtype=float)
+    probs = frame["transition_prob"].to_numpy(dtype=float)
+    record: Dict[str, Any] = {
+        "symbol": symbol,
+        "date": date,
+        "model_version": config.model_version,
+        "timestamp_utc": _partition_timestamp(frame, date),
+        "generated_at_utc": datetime.now(timezone.utc).isoformat(),
+        "rows": int(len(frame)),
+    }
+
+    record["noise"] = {
+        "energy": timed(
+            "noise_energy",
+            lambda: compute_noise_energy(clarity, probs, config.clarity_threshold),
+        )
+    }
+    record["drift"] = {
+        "bandwidth": timed(
+            "drift_bandwidth",
+            lambda: compute_drift_bandwidth(prototypes, config.sampling_rate),
+        )
+    }
+    record["clarity"] = {
+        "spectrum_power": timed(
+            "clarity_spectrum_power",
+            lambda: compute_clarity_spectrum_power(clarity, config.sampling_rate),
+        )
+    }
+
+    seed = _partition_seed(config.seed, symbol, date)
+    # adversarial.gap is always the embedding MSE the gate threshold is set for;
+    # the label flip rate under feature noise is a different unit and key.
+    record["adversarial"] = {
+        "gap": timed(
+            "adversarial_gap",
+            lambda: compute_adversarial_gap(
+                prototypes,
+                noise_scale=config.noise_scale,
+                seed=int(seed.generate_state(1)[0]),
+            ),
+        )
+    }
+    features = [c for c in config.feature_columns if c in frame.columns]
+    centroids = _load_centroids(Path(config.cluster_artifacts))
+    if (
+        features
+        and len(features) == len(config.feature_columns)
+        and (centroids is not None and centroids.shape[1] == len(features))
+    ):
+        result = timed(
+            "adversarial_flip_rate",
+            lambda: compute_model_adversarial_gap(
+                frame[features].to_numpy(dtype=float),
+                lambda x: _assign_labels(x, centroids)[0],
+                n_draws=config.n_draws,
+                noise_scale=config.noise_scale,
+                seed=seed,
+                distance="mismatch",
+            ),
+        )
+        summary = result.summary()
+        record["adversarial"]["flip_rate"] = summary.pop("mean")
+        record["adversarial"]["flip_rate_stats"] = summary
+
+    actual = None
+    if "actual_transition" in frame.columns:
+        actual = frame["actual_transition"].to_numpy(dtype=float)
+        record["calibration"] = timed(
+            "calibration",
+            lambda: {
+                "ece": _expected_calibration_error(probs, actual),
+                "brier": _brier_score(probs, actual),
+                "count": int(probs.size),
+            },
+        )
+
+    if config.bootstrap_resamples > 0:
+        timed(
+            "bootstrap",
+            lambda: _add_intervals(
+                record,
+                config,
+                clarity,
+                probs,
+                prototypes,
+                actual,
+                _partition_seed(config.seed, symbol, f"{date}/bootstrap"),
+            ),
+        )
+    return record, timings
+
+
+def _evaluate_task(
+    config: RunnerConfig, symbol: str, date: str
+) -> Tuple[str, str, Dict[str, Any], Dict[str, float]]:
+    record, timings = evaluate_partition(config, symbol, date)
+    return symbol, date, record, timings
+
+
+def run(
+    config: RunnerConfig, partitions: Optional[Iterable[Tuple[str, str]]] = None
+) -> RunnerReport:
+    """Evaluate ``partitions`` (default: all discovered) and write run records."""
+
+    todo = list(partitions) if partitions is not None else discover_partitions(config)
+    report = RunnerReport(partitions=len(todo))
+    stale = [(s, d) for s, d in todo if _is_stale(config, s, d)]
+    report.skipped = len(todo) - len(stale)
+    started = time.perf_counter()
+
+    def collect(symbol: str, date: str, record, timings) -> None:
+        _write_json_atomic(_record_path(config, symbol, date), record)
+        report.written += 1
+        report.rows += record["rows"]
+        for name, seconds in timings.items():
+            report.metric_seconds[name] = report.metric_seconds.get(name, 0.0) + seconds
+            perf.observe(f"validation.{name}", seconds)
+        perf.count("validation.rows", record["rows"])
+
+    def fail(symbol: str, date: str, exc: BaseException) -> None:
+        report.failed += 1
+        report.failures[f"{symbol}/{date}"] = f"{type(exc).__name__}: {exc}"
+        LOGGER.warning("validation run failed for %s/%s: %s", symbol, date, exc)
+
+    workers = config.workers if config.workers is not None else os.cpu_count() or 1
+    if workers <= 1 or len(stale) <= 1:
+        for symbol, date in stale:
+            try:
+                collect(*_evaluate_task(config, symbol, date))
+            except Exception as exc:
+                fail(symbol, date, exc)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(stale))) as pool:
+            futures = {
+                pool.submit(_evaluate_task, config, symbol, date): (symbol, date)
+                for symbol, date in stale
+            }
+            for future in as_completed(futures):
+                try:
+                    collect(*future.result())
+                except Exception as exc:
+                    fail(*futures[future], exc)
+
+    report.elapsed_s = time.perf_counter() - started
+    LOGGER.info(
+        "validation runner: %d written, %d skipped, %d failed, %.0f rows/s",
+        report.written,
+        report.skipped,
+        report.failed,
+        report.rows_per_second,
+    )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--inference", default=RunnerConfig.inference_template)
+    parser.add_argument("--prototypes", default=RunnerConfig.prototypes_template)
+    parser.add_argument(
+        "--cluster-artifacts", default=str(RunnerConfig.cluster_artifacts)
+    )
+    parser.add_argument("--runs-dir", default=str(RunnerConfig.runs_dir))
+    parser.add_argument("--model-version", default=RunnerConfig.model_version)
+    parser.add_argument("--feature-columns", nargs="*", default=[])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=RunnerConfig.seed)
+    parser.add_argument(
+        "--bootstrap-resamples", type=int, default=RunnerConfig.bootstrap_resamples
+    )
+    parser.add_argument("--confidence", type=float, default=RunnerConfig.confidence)
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = RunnerConfig(
+        inference_template=args.inference,
+        prototypes_template=args.prototypes,
+        cluster_artifacts=Path(args.cluster_artifacts),
+        runs_dir=Path(args.runs_dir),
+        model_version=args.model_version,
+        feature_columns=args.feature_columns,
+        workers=args.workers,
+        seed=args.seed,
+        bootstrap_resamples=args.bootstrap_resamples,
+        confidence=args.confidence,
+        overwrite=args.overwrite,
+    )
+    report = run(config)
+    print(json.dumps(report.to_dict(), indent=2, sort_keys=True))
+    if perf.is_enabled():
+        perf.export()
+
+
+__all__ = [
+    "RunnerConfig",
+    "RunnerReport",
+    "discover_partitions",
+    "evaluate_partition",
+    "run",
+]
+
+
+if __name__ == "__main__":
+    main()
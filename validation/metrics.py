@@ -1,14 +1,17 @@
 import json
+import math
 import warnings
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional, Union
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
 
 from model.hmm_tvtp_adaptive.train import _brier_score as compute_brier
 from model.hmm_tvtp_adaptive.train import _expected_calibration_error as compute_ece
-from validation.core.aggregator import aggregate as aggregate_metrics
 from validation.core.thresholds_loader import load_policy
 
 
@@ -78,6 +81,172 @@ def summarise(frame: pd.DataFrame, config: MetricConfig) -> Dict[str, float]:
     return metrics
 
 
+ECE_BINS = 10
+SUMMARY_COLUMNS = ("transition_prob", "actual_transition", "abstain")
+
+
+@dataclass
+class SummaryAccumulator:
+    """Mergeable sufficient statistics for ``summarise``.
+
+    ECE keeps per-bin counts and sums over the same ``[lower, upper)`` bins as
+    ``_expected_calibration_error`` (so ``p == 1.0`` falls in no bin) and is weighted
+    by the total row count, exactly like the in-memory function.
+    """
+
+    transition_gate: float = 0.65
+    bins: int = ECE_BINS
+    count: int = 0
+    brier_sum: float = 0.0
+    abstain_n: int = 0
+    abstain_sum: float = 0.0
+    triggered: int = 0
+    hit_count: int = 0
+    hit_sum: float = 0.0
+    bin_count: np.ndarray = field(init=False, repr=False)
+    bin_prob: np.ndarray = field(init=False, repr=False)
+    bin_actual: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.edges = np.linspace(0.0, 1.0, self.bins + 1)
+        self.bin_count = np.zeros(self.bins, dtype=np.int64)
+        self.bin_prob = np.zeros(self.bins)
+        self.bin_actual = np.zeros(self.bins)
+
+    def update(
+        self, probs: np.ndarray, actual: np.ndarray, abstain: np.ndarray
+    ) -> "SummaryAccumulator":
+        """Absorb one chunk of rows."""
+
+        self.count += probs.size
+        self.brier_sum += float(np.sum((probs - actual) ** 2))
+        abstain = abstain[~np.isnan(abstain)]
+        self.abstain_n += abstain.size
+        self.abstain_sum += float(np.sum(abstain))
+
+        triggered = probs >= self.transition_gate
+        hits = actual[triggered]
+        hits = hits[~np.isnan(hits)]
+        self.triggered += int(np.count_nonzero(triggered))
+        self.hit_count += hits.size
+        self.hit_sum += float(np.sum(hits))
+
+        index = np.searchsorted(self.edges, probs, side="right") - 1
+        valid = (index >= 0) & (index < self.bins)
+        index = index[valid]
+        self.bin_count += np.bincount(index, minlength=self.bins)
+        self.bin_prob += np.bincount(index, probs[valid], minlength=self.bins)
+        self.bin_actual += np.bincount(index, actual[valid], minlength=self.bins)
+        return self
+
+    def merge(self, other: "SummaryAccumulator") -> "SummaryAccumulator":
+        if other.bins != self.bins or other.transition_gate != self.transition_gate:
+            raise ValueError("Cannot merge accumulators with different settings")
+        self.count += other.count
+        self.brier_sum += other.brier_sum
+        self.abstain_n += other.abstain_n
+        self.abstain_sum += other.abstain_sum
+        self.triggered += other.triggered
+        self.hit_count += other.hit_count
+        self.hit_sum += other.hit_sum
+        self.bin_count += other.bin_count
+        self.bin_prob += other.bin_prob
+        self.bin_actual += other.bin_actual
+        return self
+
+    @property
+    def brier(self) -> float:
+        return self.brier_sum / self.count if self.count else float("nan")
+
+    @property
+    def ece(self) -> float:
+        ece = 0.0
+        for n, conf, acc in zip(self.bin_count, self.bin_prob, self.bin_actual):
+            if n:
+                ece += n / self.count * abs(conf / n - acc / n)
+        return float(ece)
+
+    @property
+    def abstain_rate(self) -> float:
+        return self.abstain_sum / self.abstain_n if self.abstain_n else float("nan")
+
+    @property
+    def hit_ratio(self) -> float:
+        if not self.triggered:
+            return 0.0
+        return self.hit_sum / self.hit_count if self.hit_count else float("nan")
+
+
+def _batch_arrays(batch: Union[pa.RecordBatch, pd.DataFrame]):
+    names = list(batch.schema.names if isinstance(batch, pa.RecordBatch) else batch)
+    rows = batch.num_rows if isinstance(batch, pa.RecordBatch) else len(batch)
+
+    def column(name: str, default: float) -> np.ndarray:
+        if name not in names:
+            return np.full(rows, default)
+        values = (
+            batch.column(name) if isinstance(batch, pa.RecordBatch) else batch[name]
+        )
+        if isinstance(values, pa.Array):
+            values = values.to_numpy(zero_copy_only=False)
+        return np.asarray(values, dtype=float)
+
+    return (
+        column("transition_prob", 0.0),
+        column("actual_transition", 0.0),
+        column("abstain", 0.0),
+    )
+
+
+def accumulate_batches(
+    batches: Iterable[Union[pa.RecordBatch, pd.DataFrame]],
+    transition_gate: float = 0.65,
+) -> SummaryAccumulator:
+    """Fold record batches (or frame chunks) into a SummaryAccumulator."""
+
+    acc = SummaryAccumulator(transition_gate=transition_gate)
+    for batch in batches:
+        acc.update(*_batch_arrays(batch))
+    return acc
+
+
+def summarise_dataset(
+    source: Union[str, Path],
+    config: Optional[MetricConfig] = None,
+    batch_size: int = 1 << 18,
+) -> Dict[str, float]:
+    """Chunked equivalent of ``summarise`` over a parquet file or dataset directory.
+
+    Only the summary columns are read, one record batch at a time, so memory stays
+    bounded by ``batch_size`` rows regardless of the dataset size. Missing columns
+    take the same defaults as ``summarise``; results match it up to floating-point
+    summation order.
+    """
+
+    config = config or MetricConfig()
+    dataset = ds.dataset(str(source), format="parquet")
+    columns = [c for c in SUMMARY_COLUMNS if c in dataset.schema.names]
+    acc = accumulate_batches(
+        dataset.to_batches(columns=columns, batch_size=batch_size),
+        config.transition_gate,
+    )
+    return _summary_from_accumulator(acc, config)
+
+
+def _summary_from_accumulator(
+    acc: SummaryAccumulator, config: MetricConfig
+) -> Dict[str, float]:
+    ece = acc.ece
+    return {
+        "prototype_drift": float(_load_cluster_drift(config.cluster_artifacts)),
+        "ece": 0.0 if math.isnan(ece) else float(ece),
+        "brier": float(acc.brier),
+        "abstain_rate": float(acc.abstain_rate),
+        "transition_hit_ratio": float(acc.hit_ratio),
+        "count": int(acc.count),
+    }
+
+
 def _format_gate(metric: str, thresholds: Dict[str, Dict[str, Any]]) -> str:
     gate_info = thresholds.get(metric)
     if gate_info is None:
@@ -137,8 +306,17 @@ def write_reports(
         stacklevel=2,
     )
     _ = frame  # kept for backward compatibility
+    from validation.core.aggregator import aggregate as aggregate_metrics
+
     payload = aggregate_metrics()
     return payload.get("metrics", {})
 
 
-__all__ = ["MetricConfig", "summarise", "write_reports"]
+__all__ = [
+    "MetricConfig",
+    "SummaryAccumulator",
+    "accumulate_batches",
+    "summarise",
+    "summarise_dataset",
+    "write_reports",
+]